@@ -0,0 +1,328 @@
+"""
+Offline benchmarks of the search, model and API hot paths.
+
+Everything runs from the recorded samples in `tests/samples`, scaled up to realistic page counts,
+so no request leaves the machine. Results are printed as JSON, and can be compared to a previous run:
+
+    python benchmarks/bench.py --output before.json
+    python benchmarks/bench.py --compare before.json
+"""
+import argparse
+import atexit
+import copy
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional
+from unittest.mock import MagicMock, patch
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLES_PATH = os.path.join(ROOT_PATH, "tests", "samples")
+sys.path.insert(0, os.path.join(ROOT_PATH, "src"))
+sys.path.insert(0, ROOT_PATH)
+
+import logging  # noqa: E402
+
+# The library logs every request and the missing agents and proxies files, which would dominate the timings
+logging.disable(logging.CRITICAL)
+
+from vinted_scraper_moneybear import VintedWrapper  # noqa: E402
+from vinted_scraper_moneybear.models import VintedItem, VintedItemBatch, VintedUser, decode_many, pack, unpack  # noqa: E402
+
+PER_PAGE = 96
+PAGES = 10
+
+
+def read_sample(filename: str) -> Dict:
+    with open(os.path.join(SAMPLES_PATH, f"{filename}.json"), "r") as file:
+        return json.load(file)
+
+
+def build_pages(pages: int = PAGES, per_page: int = PER_PAGE) -> List[Dict[str, List[Dict]]]:
+    """Scale the search sample up to `pages` catalog responses of `per_page` items with unique ids."""
+    sample = read_sample("search_item_dummy")["items"][0]
+    # The catalog now returns the price as an object, and the item box read by the API
+    sample["price"] = {"amount": sample["price"], "currency_code": sample.pop("currency")}
+    sample["item_box"] = {"first_line": sample["brand_title"], "second_line": "Very good"}
+    result = []
+    for page in range(pages):
+        items = []
+        for index in range(per_page):
+            item = copy.deepcopy(sample)
+            item["id"] = page * per_page + index + 1
+            item["user"]["id"] = item["id"] % 500
+            item["photo"]["url"] = f"https://images.vinted.net/t/{item['id']}/f800/photo.jpeg"
+            items.append(item)
+        result.append({"items": items})
+    return result
+
+
+def measure(function: Callable[[], Any], repeat: int, operations: int = 1) -> Dict[str, float]:
+    """
+    Run the function `repeat` times.
+
+    :param function: The function to time.
+    :param repeat: Number of timed runs, after one warm up run.
+    :param operations: Number of operations done by a single run, to report a throughput.
+    :return: The timings of the runs in milliseconds, and the operations per second of the median run.
+    """
+    function()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    median = statistics.median(timings)
+    return {
+        "min_ms": round(min(timings), 4),
+        "median_ms": round(median, 4),
+        "max_ms": round(max(timings), 4),
+        "ops_per_second": round(operations / (median / 1000), 1) if median else None,
+    }
+
+
+def offline_wrapper(pages: List[Dict[str, List[Dict]]]) -> VintedWrapper:
+    """A VintedWrapper whose _curl serves the recorded pages, honouring the per_page parameter."""
+    wrapper = VintedWrapper("https://www.vinted.fr", session_cookie="cookie")
+    items = [item for page in pages for item in page["items"]]
+
+    def curl(endpoint, params=None, max_retries=None):
+        page = params["page"]
+        if "per_page" not in params:
+            return pages[page - 1] if page <= len(pages) else {"items": []}
+        per_page = params["per_page"]
+        return {"items": items[(page - 1) * per_page:page * per_page]}
+
+    wrapper._curl = curl
+    return wrapper
+
+
+def bench_search(repeat: int) -> Dict[str, float]:
+    """Pagination and validation overhead of VintedWrapper.search over PAGES pages."""
+    pages = build_pages()
+    wrapper = offline_wrapper(pages)
+    return measure(lambda: wrapper.search({"search_text": "game"}, page_limit=PAGES), repeat, PAGES * PER_PAGE)
+
+
+def bench_models(repeat: int) -> Dict[str, Dict[str, float]]:
+    """Construction throughput of VintedItem and VintedUser."""
+    items = [item for page in build_pages() for item in page["items"]]
+    users = [item["user"] for item in items]
+    detailed = read_sample("item_dummy")["item"]
+    return {
+        "search_item": measure(lambda: [VintedItem(item) for item in items], repeat, len(items)),
+        "detailed_item": measure(lambda: [VintedItem(detailed) for _ in range(1000)], repeat, 1000),
+        "user": measure(lambda: [VintedUser(user) for user in users], repeat, len(users)),
+    }
+
+
+def bench_decode(repeat: int) -> Dict[str, Dict[str, float]]:
+    """Decoding a catalog page body of PER_PAGE items into VintedItem objects."""
+    body = json.dumps(build_pages(pages=1)[0]).encode()
+    return {
+        "json_loads_then_models": measure(lambda: [VintedItem(item) for item in json.loads(body)["items"]],
+                                          repeat * 10, PER_PAGE),
+        "decode_many": measure(lambda: decode_many(VintedItem, body), repeat * 10, PER_PAGE),
+    }
+
+
+def bench_codec(repeat: int) -> Dict[str, Dict[str, float]]:
+    """Storing a catalog page of VintedItems, like a cache entry: JSON against the binary codec."""
+    raw = build_pages(pages=1)[0]["items"]
+    items = [VintedItem(item) for item in raw]
+    # asdict builds the nested models, so it gets its own items
+    read_items = [VintedItem(item) for item in raw]
+    body = json.dumps(raw).encode()
+    packed = pack(items)
+    return {
+        "json_dumps_raw": measure(lambda: json.dumps(raw).encode(), repeat * 10, PER_PAGE),
+        "json_dumps_models": measure(lambda: json.dumps([asdict(item) for item in read_items]).encode(), repeat,
+                                     PER_PAGE),
+        "json_loads_then_models": measure(lambda: [VintedItem(item) for item in json.loads(body)], repeat * 10, PER_PAGE),
+        "pack": measure(lambda: pack(items), repeat * 10, PER_PAGE),
+        "unpack": measure(lambda: unpack(packed), repeat * 10, PER_PAGE),
+        "bytes": {"json": len(body), "packed": len(packed)},
+    }
+
+
+def bench_batch(repeat: int) -> Dict[str, Dict[str, float]]:
+    """Filtering and ranking 50k listings: a loop over VintedItems against a VintedItemBatch."""
+    rows = []
+    for page in build_pages(pages=521):
+        for item in page["items"]:
+            item["price"] = {"amount": str(item["id"] % 97 + 0.5), "currency_code": "EUR"}
+            item["favourite_count"] = item["id"] % 31
+            rows.append(item)
+    items = [VintedItem(item) for item in rows]
+    batch = VintedItemBatch.from_items(rows)
+
+    def with_loop():
+        selected = [item for item in items if item.price < 20 and item.brand.title == "NO LABEL"]
+        return sorted(selected, key=lambda item: item.favourite_count, reverse=True)[:100]
+
+    def with_batch():
+        return batch.filter((batch["price"] < 20) & (batch["brand"] == "NO LABEL")).top_k("favourite_count", 100)
+
+    return {
+        "build_batch": measure(lambda: VintedItemBatch.from_items(rows), repeat, len(rows)),
+        "filter_top_k_loop": measure(with_loop, repeat, len(rows)),
+        "filter_top_k_batch": measure(with_batch, repeat, len(rows)),
+    }
+
+
+def bench_memory(repeat: int) -> Dict[str, int]:
+    """Memory held by the models, in bytes per item, on top of the decoded JSON they are built from."""
+    samples = {
+        "search_item": build_pages(pages=1)[0]["items"][0],
+        "detailed_item": read_sample("item_dummy")["item"],
+    }
+    result = {}
+    for name, sample in samples.items():
+        data = [copy.deepcopy(sample) for _ in range(5000)]
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        items = [VintedItem(item) for item in data]
+        result[f"{name}_bytes"] = round((tracemalloc.get_traced_memory()[0] - before) / len(items))
+        tracemalloc.stop()
+
+    # Held by the items decoded from response bodies, once the bodies and the parsed JSON are dropped
+    bodies = [json.dumps(page).encode() for page in build_pages()]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = [item for body in bodies for item in decode_many(VintedItem, body)]
+    result["decoded_search_item_bytes"] = round((tracemalloc.get_traced_memory()[0] - before) / len(items))
+    tracemalloc.stop()
+    return result
+
+
+def import_api():
+    """Import the Flask API with the image downloads mocked, and its caches in a temporary directory."""
+    if "scraper" not in sys.modules:
+        # Never the caches of the workers of the host: the benchmarks clear and fill them
+        directory = tempfile.mkdtemp(prefix="vinted_bench_")
+        atexit.register(shutil.rmtree, directory, True)
+        os.environ["VINTED_SCRAPER_CACHE_PATH"] = os.path.join(directory, "cache.sqlite3")
+        os.environ["VINTED_SCRAPER_IMAGE_DIRECTORY"] = os.path.join(directory, "images")
+    import scraper
+    owned = os.path.join(tempfile.gettempdir(), "vinted_bench_")
+    if not scraper.image_cache.directory.startswith(owned) or \
+            not getattr(scraper.result_cache, "path", owned).startswith(owned):
+        raise RuntimeError("scraper was imported before the benchmarks could give it its own caches")
+
+    image = MagicMock()
+    image.content = b"\x89PNG" + b"\x00" * 20000
+    image.status_code = 200
+    image.headers = {"Content-Type": "image/png"}
+    return scraper, image
+
+
+def bench_process_items(repeat: int) -> Dict[str, Dict[str, float]]:
+    """process_item and parallel_process_items of scraper.py, with the image downloads mocked."""
+    scraper, image = import_api()
+    items = build_pages(pages=1)[0]["items"]
+
+    def clear():
+        scraper.result_cache.clear()
+        scraper.image_cache.clear()
+
+    with patch("requests.get", return_value=image), patch("requests.Session.get", return_value=image):
+        return {
+            "process_item": measure(lambda: (clear(), [scraper.process_item(item) for item in items]),
+                                    repeat, len(items)),
+            "parallel_process_items": measure(lambda: (clear(), scraper.parallel_process_items(items, len(items))),
+                                              repeat, len(items)),
+            # The images already in the image cache
+            "parallel_process_items_warm": measure(lambda: scraper.parallel_process_items(items, len(items)),
+                                                   repeat, len(items)),
+        }
+
+
+def bench_api(repeat: int) -> Dict[str, float]:
+    """End to end latency of the Flask `/` endpoint on a cache miss, with a mocked upstream."""
+    scraper, image = import_api()
+    wrapper = offline_wrapper(build_pages())
+    client = scraper.app.test_client()
+
+    def request():
+        scraper.result_cache.clear()
+        scraper.image_cache.clear()
+        response = client.get("/?country=fr&query=game&page_limit=10&amount=100")
+        assert response.status_code == 200
+
+    with patch.object(scraper.client_registry, "get", return_value=wrapper), \
+            patch("requests.get", return_value=image), patch("requests.Session.get", return_value=image):
+        return measure(request, repeat)
+
+
+BENCHMARKS: Dict[str, Callable[[int], Any]] = {
+    "search": bench_search,
+    "models": bench_models,
+    "decode": bench_decode,
+    "codec": bench_codec,
+    "batch": bench_batch,
+    "memory": bench_memory,
+    "process_items": bench_process_items,
+    "api": bench_api,
+}
+
+
+def compare(current: Dict[str, Any], previous: Dict[str, Any], prefix: str = "") -> List[str]:
+    """List the change of every median timing between two runs."""
+    lines = []
+    for name, value in current.items():
+        before = previous.get(name) if isinstance(previous, dict) else None
+        if before is None:
+            continue
+        if isinstance(value, int) and isinstance(before, int) and before:
+            lines.append(f"{prefix}{name}: {before} -> {value} ({(value - before) / before * 100:+.1f}%)")
+        elif isinstance(value, dict) and "median_ms" in value:
+            change = (value["median_ms"] - before["median_ms"]) / before["median_ms"] * 100
+            lines.append(f"{prefix}{name}: {before['median_ms']:.3f} ms -> {value['median_ms']:.3f} ms ({change:+.1f}%)")
+        elif isinstance(value, dict):
+            lines.extend(compare(value, before, f"{prefix}{name}."))
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("benchmarks", nargs="*", help=f"Benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Compare the results to a previous JSON file")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results: Dict[str, Any] = {}
+    for name in args.benchmarks or BENCHMARKS:
+        results[name] = BENCHMARKS[name](args.repeat)
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    print(output)
+
+    if args.compare:
+        with open(args.compare, "r") as file:
+            previous = json.load(file)
+        print("\n".join(compare(results, previous.get("results", {}))), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Load driver for the wrapper against the stand-in Vinted server of `tests/stub_server.py`.
+
+It runs concurrent searches against a local StubVinted with the given latency and failure mix, and
+reports the throughput, the search latencies and the retry amplification (upstream requests sent per
+page requested) as JSON. For example:
+
+    python benchmarks/load.py --searches 200 --concurrency 8 --latency 0.02 --error-rate 502=0.1 --error-rate 401=0.02
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_PATH, "src"))
+sys.path.insert(0, ROOT_PATH)
+
+import logging  # noqa: E402
+
+# The library logs every request and every retry, which would dominate the timings
+logging.disable(logging.CRITICAL)
+
+from tests.stub_server import StubVinted  # noqa: E402
+from vinted_scraper_moneybear import VintedWrapper  # noqa: E402
+from vinted_scraper_moneybear.rate_limiter import RateLimiter  # noqa: E402
+from vinted_scraper_moneybear.retry import RetryEngine  # noqa: E402
+
+
+def percentile(values: List[float], share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def run(stub: StubVinted, searches: int, concurrency: int, page_limit: int, page_concurrency: int,
+        rate: float, max_retries: int) -> Dict[str, Any]:
+    """
+    Run the searches with a single wrapper shared by all the workers, like the Flask API does.
+
+    :param stub: The running stand-in server.
+    :param searches: Number of searches to run.
+    :param concurrency: Number of searches running at the same time.
+    :param page_limit: The page_limit of every search.
+    :param page_concurrency: The concurrency of every search.
+    :param rate: Requests per second allowed by the rate limiter.
+    :param max_retries: Maximum number of attempts of a request.
+    :return: The measurements.
+    """
+    wrapper = VintedWrapper(
+        stub.url, cookie_prefix=stub.cookie_prefix, session_cookie="stub-cookie",
+        rate_limiter=RateLimiter(rate=rate, burst=rate, max_rate=rate),
+        retry_engine=RetryEngine(max_retries=max_retries, base_delay=0.01, max_delay=0.5))
+
+    # Count the page requests of the searches, to compare with the requests the server received
+    page_requests = 0
+    lock = threading.Lock()
+    curl = wrapper._curl
+
+    def counting_curl(*args, **kwargs):
+        nonlocal page_requests
+        with lock:
+            page_requests += 1
+        return curl(*args, **kwargs)
+
+    wrapper._curl = counting_curl
+    stub.reset()
+
+    def search(_) -> Dict[str, float]:
+        start = time.perf_counter()
+        result = wrapper.search({"search_text": "game"}, page_limit=page_limit, concurrency=page_concurrency)
+        return {"seconds": time.perf_counter() - start, "items": len(result["all_items"])}
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(search, range(searches)))
+    duration = time.perf_counter() - start
+
+    latencies = [result["seconds"] * 1000 for result in results]
+    expected_items = min(page_limit, stub.pages) * stub.per_page
+    upstream = len(stub.requests)
+    return {
+        "duration_s": round(duration, 3),
+        "searches_per_second": round(searches / duration, 2),
+        "latency_ms": {
+            "median": round(statistics.median(latencies), 2),
+            "p90": round(percentile(latencies, 0.9), 2),
+            "p99": round(percentile(latencies, 0.99), 2),
+            "max": round(max(latencies), 2),
+        },
+        "page_requests": page_requests,
+        "upstream_requests": upstream,
+        "retry_amplification": round(upstream / page_requests, 3) if page_requests else None,
+        "complete_searches": sum(1 for result in results if result["items"] == expected_items),
+        "status_counts": {str(status): count for status, count in sorted(stub.status_counts.items())},
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--searches", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4, help="Searches running at the same time")
+    parser.add_argument("--pages", type=int, default=5, help="Pages served by the stand-in server")
+    parser.add_argument("--per-page", type=int, default=96)
+    parser.add_argument("--page-limit", type=int, default=5)
+    parser.add_argument("--page-concurrency", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.01, help="Seconds every response is delayed")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Maximum extra seconds of random delay")
+    parser.add_argument("--error-rate", action="append", default=[], metavar="STATUS=RATE",
+                        help="Share of the responses with a status code, like 502=0.1. Can be repeated")
+    parser.add_argument("--retry-after", type=float, help="Retry-After seconds of the 403 and 429 responses")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rate", type=float, default=1000.0, help="Requests per second of the rate limiter")
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    error_rates = {int(status): float(rate) for status, rate in (value.split("=") for value in args.error_rate)}
+    with StubVinted(args.pages, args.per_page, latency=args.latency, jitter=args.jitter, error_rates=error_rates,
+                    retry_after=args.retry_after, seed=args.seed) as stub:
+        results = run(stub, args.searches, args.concurrency, args.page_limit, args.page_concurrency,
+                      args.rate, args.max_retries)
+
+    report = {"config": {key: value for key, value in vars(args).items() if key != "output"}, "results": results}
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,62 @@
 import logging
-from flask import Flask, request, jsonify, g, Response
+from flask import Flask, request, jsonify, g, Response, abort
 from flask_cors import CORS
 from flask_wtf.csrf import CSRFProtect
-from vinted_scraper_moneybear import VintedWrapper
+from vinted_scraper_moneybear.client_registry import ClientRegistry
+from vinted_scraper_moneybear.image_cache import ImageCache, media_type
+from vinted_scraper_moneybear.result_cache import ResultCache, SQLiteCache, memoize
 from vinted_scraper_moneybear.utils import log
-from time import sleep
-import requests
 from typing import List, Dict, Optional, Any
 import time
 import bleach
 import base64
-from cachetools import cached, TTLCache
 import concurrent.futures
+from functools import partial
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-cache = TTLCache(maxsize=100, ttl=300)
-
 use_logger = False
+# Share the search results and the image index between the workers of the node, through an SQLite file.
+# The file and the image directory are set with VINTED_SCRAPER_CACHE_PATH and VINTED_SCRAPER_IMAGE_DIRECTORY
+use_shared_cache = True
+
+# Seconds after which a search result is refreshed in the background, it is still served meanwhile
+result_ttl = 300
+# Seconds a search result may be served past result_ttl, while it is refreshed. Past it, the request waits
+result_max_stale = 1800
+
+# A cache per function, bounded in bytes, so small and large entries don't compete for the same slots
+input_cache = ResultCache(max_bytes=1024 * 1024, ttl=3600, name='sanitize_input')
+if use_shared_cache:
+    result_cache = SQLiteCache(max_bytes=256 * 1024 * 1024, ttl=result_ttl + result_max_stale, name='cached_main')
+else:
+    result_cache = ResultCache(max_bytes=64 * 1024 * 1024, ttl=result_ttl + result_max_stale, name='cached_main')
+caches = {cache.name: cache for cache in (input_cache, result_cache)}
+
 time_it = False
+# Number of search pages fetched at the same time
+max_page_concurrency = 5
+# The fields of the search results read by process_item, the rest is dropped while decoding
+ITEM_FIELDS = (
+    "title", "price", "url", "photo.url", "photo.width", "photo.thumbnails.url", "photo.thumbnails.width",
+    "user.login", "user.profile_url", "user.photo.url", "user.photo.width", "user.photo.thumbnails.url",
+    "user.photo.thumbnails.width", "brand_title", "item_box.second_line", "status",
+)
+# How the photos are returned: inline as base64, or as URLs of the /image endpoint
+IMAGE_MODES = ('base64', 'url')
+# Seconds browsers may keep an image of the /image endpoint
+image_max_age = 24 * 3600
+
+# Long-lived, warmed-up clients shared by every request, one per country suffix
+client_registry = ClientRegistry()
+client_registry.start()
+
+# Item and seller photos, stored on disk and downloaded again once a day
+image_ttl = 24 * 3600
+image_cache = ImageCache(ttl=image_ttl, index=SQLiteCache(max_bytes=64 * 1024 * 1024, ttl=image_ttl, name='images')
+                         if use_shared_cache else None)
 
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "https://moneytestbear.netlify.app"}})
@@ -43,78 +79,128 @@ if time_it:
         logging.info(f"{request.remote_addr} - - [{time.strftime('%d/%b/%Y %H:%M:%S')}] \"{request.method} {request.path} HTTP/{request.environ['SERVER_PROTOCOL']}\" {response.status} {duration:.2f}s")
         return response
 
-@cached(cache)
+@memoize(input_cache)
 def sanitize_input(user_input):
         """Allow only specific tags and attributes"""
         allowed_tags = []
         allowed_attributes = {}
         return bleach.clean(user_input, tags=allowed_tags, attributes=allowed_attributes)
     
-@cached(cache)
 def encode_image(url: Optional[str]) -> str:
     """
-    Cached image encoding function with memoization.
-    Prevents redundant downloads and encoding of the same image.
+    Base64 encode an image, downloaded through the image cache.
     """
-    if not url:
+    content = image_cache.get(url)
+    if not content:
         return ''
-    try:
-        response = requests.get(url)
-        return base64.b64encode(response.content).decode('utf-8')
-    except Exception:
+    return base64.b64encode(content).decode('utf-8')
+
+def select_image(photo: Optional[Dict[Any, Any]], width: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Pick the smallest thumbnail of a photo at least `width` pixels wide, the largest one if none is,
+    or the photo itself without a width.
+    """
+    if not photo:
+        return None
+    if not width:
+        return photo
+    thumbnails = [thumbnail for thumbnail in photo.get('thumbnails') or []
+                  if isinstance(thumbnail, dict) and thumbnail.get('url') and isinstance(thumbnail.get('width'), int)]
+    if not thumbnails:
+        return photo
+    adequate = [thumbnail for thumbnail in thumbnails if thumbnail['width'] >= width]
+    if adequate:
+        return min(adequate, key=lambda thumbnail: thumbnail['width'])
+    return max(thumbnails, key=lambda thumbnail: thumbnail['width'])
+
+def encode_photo(photo: Optional[Dict[str, Any]]) -> str:
+    """
+    Base64 encode a photo, see encode_image.
+    """
+    return encode_image((photo or {}).get('url'))
+
+def item_photos(item: Dict[Any, Any], width: Optional[int] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    The item photo and the seller photo of an item, see select_image.
+    """
+    return [select_image(item.get('photo'), width), select_image((item.get('user') or {}).get('photo'), width)]
+
+def image_url(photo: Optional[Dict[str, Any]], width: Optional[int] = None) -> str:
+    """
+    The URL of a photo on the /image endpoint, downscaled by the server when it is wider than `width`.
+    """
+    if not photo or not photo.get('url'):
         return ''
+    url = f"/image/{image_cache.register(photo['url'])}"
+    if width and isinstance(photo.get('width'), int) and photo['width'] > width:
+        url += f'?width={width}'
+    return url
 
-def process_item(item: Dict[Any, Any]) -> Dict[str, Any]:
+def process_item(item: Dict[Any, Any], image_mode: str = 'base64', image_width: Optional[int] = None) -> Dict[str, Any]:
     """
     Process a single item with safe nested dictionary access.
+    The photos are inlined as base64, or returned as /image URLs with the 'url' image mode.
     """
+    photo, seller_photo = item_photos(item, image_width)
+    encode = partial(image_url, width=image_width) if image_mode == 'url' else encode_photo
     return {
         "title": item.get('title'),
         "price": (item.get('price') or {}).get('amount'),
         "currency": (item.get('price') or {}).get('currency_code'),
-        # "photo": encode_image((((item.get('photo') or {}).get('thumbnails') or [{}])[-1]).get('url')),
-        "photo": encode_image((item.get('photo') or {}).get('url')),
+        "photo": encode(photo),
         "url": item.get('url'),
         "seller_name": (item.get('user') or {}).get('login'),
         "seller_url": (item.get('user') or {}).get('profile_url'),
-        "seller_photo": encode_image(((item.get('user') or {}).get('photo') or {}).get('url')),
+        "seller_photo": encode(seller_photo),
         "brand": item.get('brand_title'),
         "size_or_status": (item.get('item_box') or {}).get('second_line'),
         "status": item.get('status'),
     }
 
-def parallel_process_items(filtered_items: List[Dict[Any, Any]], amount: int) -> List[Dict[str, Any]]:
+def parallel_process_items(filtered_items: List[Dict[Any, Any]], amount: int, image_mode: str = 'base64',
+                           image_width: Optional[int] = None) -> List[Dict[str, Any]]:
     """
     Process items in parallel with optional limiting.
     
     Args:
         filtered_items: List of items to process
         amount: Maximum number of items to process
+        image_mode: 'base64' or 'url', see process_item
+        image_width: The wanted width of the photos in pixels
     
     Returns:
         Processed list of items
     """
     # Limit items to specified amount
     items_to_process = filtered_items[:amount]
+
+    if image_mode != 'url':
+        # Download the missing images of all the items at the same time, process_item then reads them from the cache
+        image_cache.get_many((photo or {}).get('url') for item in items_to_process
+                             for photo in item_photos(item, image_width))
     
     # Use ThreadPoolExecutor for I/O bound tasks like image encoding
     with concurrent.futures.ThreadPoolExecutor() as executor:
-        result = list(executor.map(process_item, items_to_process))
+        result = list(executor.map(partial(process_item, image_mode=image_mode, image_width=image_width),
+                                   items_to_process))
     
     return result
 
-@cached(cache)
-def cached_main(country_suffix: str, query: str, page_limit: int, amount: int) -> Dict[str, Any]:
+# Stale-while-revalidate: popular queries are refreshed in the background instead of by a waiting user.
+# The empty results of the errors are not cached, so they never replace a good result
+@memoize(result_cache, stale_after=result_ttl, cache_if=bool)
+def cached_main(country_suffix: str, query: str, page_limit: int, amount: int, image_mode: str = 'base64',
+                image_width: Optional[int] = None) -> Dict[str, Any]:
     sanitized_country = sanitize_input(country_suffix)
     if len(sanitized_country) > 10:
         log(use_logger, 'warning', 'Invalid country suffix. Used suffix = "com"')
         sanitized_country = 'com'
     
     try:        
-        scraper = VintedWrapper(f"https://www.vinted.{sanitized_country}", use_logger=use_logger)
+        scraper = client_registry.get(sanitized_country)
         log(use_logger, 'info', f'Used country suffix = {sanitized_country}')
     except Exception as e:
-        scraper = VintedWrapper("https://www.vinted.com", use_logger=use_logger)
+        scraper = client_registry.get('com')
         log(use_logger, 'warning', f'{e}. Used suffix = com')
 
     sanitized_query = sanitize_input(query) if query else ''
@@ -123,21 +209,14 @@ def cached_main(country_suffix: str, query: str, page_limit: int, amount: int) -
     
     params = {"search_text": sanitized_query}
 
-    # Set a limit on the number of retries
-    max_retries = 3
-
-    for attempt in range(max_retries):
-        try:
-            log(use_logger, 'info', f"Attempting to fetch items with params: {params}, page_limit: {page_limit}")
-            items = scraper.search(params, page_limit)
-            break  # Exit loop if successful
-        except Exception as e:
-            log(use_logger, 'warning', f"Error fetching items on attempt {str(attempt + 1)}: {e}")
-            if attempt < max_retries - 1:  # Retry only if attempts remain
-                time.sleep(2 ** attempt)  # Wait before retrying
-    else:
-        # This executes if the number of attempts > max_retries
-        log(use_logger, 'error', 'Not been able to fetch items. Returning an empty list')
+    # Retries, back off and circuit breakers are handled by the wrapper's retry engine
+    try:
+        log(use_logger, 'info', f"Attempting to fetch items with params: {params}, page_limit: {page_limit}, amount: {amount}")
+        # The wrapper plans the page size around the amount and stops as soon as it is reached
+        items = scraper.search(params, page_limit, concurrency=min(page_limit, max_page_concurrency), amount=amount,
+                               fields=ITEM_FIELDS)
+    except Exception as e:
+        log(use_logger, 'error', f'{e}. Not been able to fetch items. Returning an empty list')
         return []
 
     try:
@@ -145,16 +224,16 @@ def cached_main(country_suffix: str, query: str, page_limit: int, amount: int) -
         amount = min(amount, len(items.get('all_items', [])))
         
         filtered_items = [item for item in items.get('all_items', []) if isinstance(item, dict)]
+
+        # The wrapper returns no items once it runs out of retries: an empty list is not cached
+        if not filtered_items:
+            log(use_logger, 'error', 'No valid items found. Returning an empty list')
+            return []
         
         # Extract item details if there are items available
-        result = parallel_process_items(filtered_items, amount)
+        result = parallel_process_items(filtered_items, amount, image_mode, image_width)
         
         result.insert(0, {'responses_count': len(filtered_items)})
-
-        # Check if the result is empty after processing
-        if not result:
-            log(use_logger, 'error', 'No valid items found. Returning an empty list')
-            return []
         
     except KeyError as e:
         log(use_logger, 'error', f'Key {e} does not exist. Returning an empty list')
@@ -184,9 +263,54 @@ def main() -> Response:
         log(use_logger, 'warning', '"amount" should be an integer. Defaulting to 1.')
         amount = 1
 
-    result = cached_main(country_suffix, query, page_limit, amount)
+    image_mode = request.args.get('images', 'base64')
+    if image_mode not in IMAGE_MODES:
+        log(use_logger, 'warning', f'"images" should be one of {IMAGE_MODES}. Defaulting to base64.')
+        image_mode = 'base64'
+
+    try:
+        image_width = int(request.args['image_width']) if 'image_width' in request.args else None
+        image_width = min(1024, max(1, image_width)) if image_width is not None else None
+    except ValueError:
+        log(use_logger, 'warning', '"image_width" should be an integer. Using the full size photos.')
+        image_width = None
+
+    result = cached_main(country_suffix, query, page_limit, amount, image_mode, image_width)
     return jsonify(result)
 
+@app.route('/stats', methods=['GET'])
+def stats() -> Response:
+    """
+    The hit, miss and eviction counters of the caches.
+    """
+    result = {name: cache.stats() for name, cache in caches.items()}
+    result['cached_main'].update(stale_hits=cached_main.stale_hits, refreshes=cached_main.refreshes)
+    result['images'] = image_cache.stats()
+    return jsonify(result)
+
+@app.route('/image/<key>', methods=['GET'])
+def image(key: str) -> Response:
+    """
+    Serve a photo of the 'url' image mode from the image cache, downscaled to the `width` parameter if given.
+    """
+    result = image_cache.fetch_key(key)
+    if result is None:
+        abort(404)
+    digest, content = result
+    try:
+        width = int(request.args['width']) if 'width' in request.args else None
+    except ValueError:
+        width = None
+    if width:
+        digest, content = image_cache.resized(digest, content, width)
+
+    response = Response(content, mimetype=media_type(content))
+    # The content is addressed by its digest, so it makes a strong ETag
+    response.set_etag(digest)
+    response.cache_control.public = True
+    response.cache_control.max_age = image_max_age
+    return response.make_conditional(request)
+
 
 if __name__ == '__main__':
     app.run(debug=False)
@@ -1,2 +1,4 @@
+from .asyncVintedScraper import AsyncVintedScraper  # noqa: F401
+from .asyncVintedWrapper import AsyncVintedWrapper  # noqa: F401
 from .vintedScraper import VintedScraper  # noqa: F401
 from .vintedWrapper import VintedWrapper  # noqa: F401
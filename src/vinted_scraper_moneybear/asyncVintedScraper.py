@@ -0,0 +1,56 @@
+from typing import Dict, Iterable, List, Optional
+
+from .asyncVintedWrapper import AsyncVintedWrapper
+from .models import VintedItem
+
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class AsyncVintedScraper(AsyncVintedWrapper):
+    async def search(self, params: Optional[Dict] = None, page_limit = 5, amount: Optional[int] = None,  # type: ignore
+                     per_page: Optional[int] = None, fields: Optional[Iterable[str]] = None) -> List[VintedItem]:
+        """
+        Search for items on Vinted.
+
+        :param params: an optional Dictionary with all the query parameters to append to the request.
+            Default value: None.
+        :param page_limit: Maximum number of pages to retrieve.
+        :param amount: Number of items wanted. The search stops as soon as they are fetched.
+        :param per_page: Number of items per page.
+        :param fields: The fields to keep, like ["title", "price", "user.login"]. The other fields of the
+            VintedItem instances are None.
+        :return: A list of VintedItem instances representing search results.
+        """
+        try:
+            return [VintedItem(item) for item in (await super().search(params, page_limit, amount, per_page, fields))["all_items"]]
+
+        except KeyError:
+            logger.error('Key "items" not found. returning an empty list.')
+            return []
+
+        except Exception as e:
+            logger.error(f'{e}. Returning an empty list')
+            return []
+
+    async def item(self, item_id: str, params: Optional[Dict] = None) -> VintedItem:  # type: ignore
+        """
+        Retrieve details of a specific item on Vinted.
+
+        :param item_id: The unique identifier of the item to retrieve.
+        :param params: an optional Dictionary with all the query parameters to append to the request.
+            Default value: None.
+        :return: A VintedItem instance representing the item's details.
+        """
+        try:
+            return VintedItem((await super().item(item_id, params))["item"])
+
+        except KeyError:
+            logger.error('Key "item" not found. returning an empty list.')
+            return []
+
+        except Exception as e:
+            logger.error(f'{e}. Returning an empty list')
+            return []
@@ -0,0 +1,380 @@
+import asyncio
+import time
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - aiohttp is an optional dependency
+    aiohttp = None
+
+from .cookie_pool import CookiePool
+from .models.decoder import loads
+from .projection import Projection
+from .rate_limiter import RateLimiter, default_rate_limiter
+from .retry import RetryEngine, default_retry_engine
+from .utils import UserAgentManager, ProxyManager, RotationMixin
+from .vintedWrapper import VintedWrapper
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _require_aiohttp() -> None:
+    """Raise a helpful error when the optional aiohttp dependency is missing."""
+    if aiohttp is None:
+        raise ImportError('The async client needs aiohttp. Install it with `pip install vinted_scraper_moneybear[async]`')
+
+
+def _proxy_url(baseurl: str, proxies: Optional[Dict[str, str]]) -> Optional[str]:
+    """
+    Convert a requests style proxies dictionary to the single proxy URL aiohttp expects.
+
+    :param baseurl: The URL that will be requested, used to pick the proxy for its scheme.
+    :param proxies: Dictionary mapping protocol to proxy URL.
+    :return: The proxy URL or None.
+    """
+    if not proxies:
+        return None
+    scheme = 'https' if baseurl.startswith('https') else 'http'
+    return proxies.get(scheme) or proxies.get('http') or proxies.get('https')
+
+
+def _client_timeout(timeout: Union[float, Tuple[float, float]]) -> "aiohttp.ClientTimeout":
+    """
+    Convert a requests style timeout to the aiohttp one.
+
+    :param timeout: The timeout in seconds, or as (connect, read) timeouts.
+    :return: The ClientTimeout with the same connect and read timeouts.
+    """
+    connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+    return aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+
+
+class AsyncCookieManager(RotationMixin):
+    def __init__(self, baseurl: str, user_agent: Optional[str], proxies: Optional[Dict[str, str]], cookie_prefix: str,
+                 session: "aiohttp.ClientSession", retries: int = 3, rate_limiter: Optional[RateLimiter] = None,
+                 retry_engine: Optional[RetryEngine] = None, proxy_manager: Optional[ProxyManager] = None,
+                 timeout: Union[float, Tuple[float, float]] = (3.05, 10.0)):
+        """
+        Initialize the AsyncCookieManager, the asyncio counterpart of CookieManager.
+
+        :param baseurl: The base URL to send the HTTP GET request to.
+        :param user_agent: The User-Agent header to use in the request.
+        :param proxies: Dictionary mapping protocol to proxy URL.
+        :param cookie_prefix: The name of the session cookie followed by "=".
+        :param session: The aiohttp session used to send the request.
+        :param retries: Number of retries for the HTTP request.
+        :param rate_limiter: Paces the requests per domain and proxy. Defaults to the process-wide limiter.
+        :param retry_engine: Back off, retry budget and circuit breakers. Defaults to the process-wide engine.
+        :param proxy_manager: Picks the proxies and tracks their health. Pass the one of the wrapper to share it.
+        :param timeout: The timeout of the request, in seconds, or as (connect, read) timeouts.
+        """
+        self.baseurl = baseurl
+        self.cookie_prefix = cookie_prefix
+        self.user_agent_manager = UserAgentManager()
+        self.user_agent = user_agent or self.user_agent_manager.get_random_user_agent()
+        self.proxy_manager = proxy_manager or ProxyManager()
+        self.proxies = proxies or self.proxy_manager.get_random_proxy()
+        self.session = session
+        self.retries = retries
+        self.rate_limiter = rate_limiter or default_rate_limiter
+        self.retry_engine = retry_engine or default_retry_engine
+        self.timeout = timeout
+        self._request_timeout = _client_timeout(timeout)
+
+    async def get_random_cookie(self) -> Optional[str]:
+        """
+        Send an HTTP GET request to fetch the session cookie with retries.
+
+        :return: The session cookie extracted from the HTTP response headers.
+        """
+        headers = {"User-Agent": self.user_agent,
+                   "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+                   "Referer": self.baseurl,
+                   "Accept-Encoding": "gzip, deflate, br"}
+
+        retry, proxies = self._begin_retry(self.baseurl, self.proxies, self.retries)
+        while True:
+            delay = retry.next_delay()
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+            try:
+                rate_key = self.rate_limiter.key(self.baseurl, proxies)
+                await asyncio.sleep(self.rate_limiter.reserve(rate_key))
+                start = time.monotonic()
+                async with self.session.get(self.baseurl, headers={k: v for k, v in headers.items() if v},
+                                            proxy=_proxy_url(self.baseurl, proxies),
+                                            timeout=self._request_timeout) as response:
+                    status_code = response.status
+                    session_cookie = ",".join(response.headers.getall("Set-Cookie", []))
+                    retry_after = response.headers.get("Retry-After")
+                self.rate_limiter.record(rate_key, status_code)
+                self._record_proxy(proxies, status_code, time.monotonic() - start)
+
+                if status_code == 200:
+                    if session_cookie and self.cookie_prefix in session_cookie:
+                        retry.success()
+                        logger.info("Succesfully fetched cookie.")
+                        return session_cookie.split(self.cookie_prefix)[1].split(";")[0]
+                    logger.warning('Invalid session cookie. Trying again')
+                    retry.failure(keys=[])
+                else:
+                    # A 401 needs no refresh, a new cookie is what we are fetching
+                    proxies, _ = self._handle_status(status_code, headers, retry, self.baseurl, proxies, retry_after)
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                proxies = self._handle_error(e, retry, self.baseurl, proxies)
+
+        logger.error(f"Failed to fetch session cookie from {self.baseurl} after {retry.attempt} attempts. Returning None.")
+        return None
+
+
+class AsyncVintedWrapper(RotationMixin):
+    # The validation does not depend on the transport, so it is shared with the blocking wrapper
+    _validate_baseurl = VintedWrapper._validate_baseurl
+    _validate_cookie_prefix = VintedWrapper._validate_cookie_prefix
+    _validate_request_size = VintedWrapper._validate_request_size
+
+    def __init__(
+        self,
+        baseurl: str,
+        cookie_prefix: str = "_vinted_fr_session=",
+        max_request_size_kb: int = 4,
+        agent: Optional[str] = None,
+        session_cookie: Optional[str] = None,
+        proxies: Optional[Dict[str, str]] = None,
+        session: Optional["aiohttp.ClientSession"] = None,
+        max_connections: int = 100,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_engine: Optional[RetryEngine] = None,
+        proxy_manager: Optional[ProxyManager] = None,
+        cookie_pool: Optional[CookiePool] = None,
+        timeout: Union[float, Tuple[float, float]] = (3.05, 10.0),
+    ):
+        """
+        Initialize the AsyncVintedWrapper, the asyncio counterpart of VintedWrapper.
+
+        Unlike VintedWrapper, the session cookie is not fetched here, but on the first request,
+        because it needs a running event loop. Use the wrapper as an async context manager,
+        or call close() when done, to release the connections.
+
+        :param baseurl: (required) Base Vinted site URL for requests.
+        :param agent: (optional) User agent to use for requests.
+        :param session_cookie: (optional) Vinted session cookie.
+        :param proxies: (optional) Dictionary mapping protocol and hostname to proxy URL.
+        :param session: (optional) aiohttp session to share between wrappers. It is not closed by close().
+        :param max_connections: (optional) Connection limit of the session created when none is given.
+        :param rate_limiter: (optional) Paces the requests per domain and proxy. Defaults to the process-wide
+            limiter, shared with the blocking wrappers.
+        :param retry_engine: (optional) Back off, retry budget and circuit breakers. Defaults to the
+            process-wide engine, shared with the blocking wrappers.
+        :param proxy_manager: (optional) Picks the proxies weighted by their health.
+        :param cookie_pool: (optional) Warm session cookies handed out round-robin, like the process-wide pool
+            of the domain the blocking wrappers use. Defaults to fetching a cookie through the aiohttp
+            session, on the first request and after a 401.
+        :param timeout: (optional) The timeout of every request, in seconds, or as (connect, read) timeouts.
+            A request that times out is retried like a connection error.
+        """
+        _require_aiohttp()
+        self.baseurl = self._validate_baseurl(baseurl)
+        self.cookie_prefix = self._validate_cookie_prefix(cookie_prefix)
+        self.user_agent_manager = UserAgentManager()
+        self.user_agent = agent or self.user_agent_manager.get_random_user_agent()
+        self.proxy_manager = proxy_manager or ProxyManager()
+        self.proxies = proxies or self.proxy_manager.get_random_proxy()
+        self.session_cookie = session_cookie
+        self.max_request_size_kb = max_request_size_kb
+        self.max_connections = max_connections
+        self.rate_limiter = rate_limiter or default_rate_limiter
+        self.retry_engine = retry_engine or default_retry_engine
+        self.timeout = timeout
+        self._request_timeout = _client_timeout(timeout)
+        self._session = session
+        self._owns_session = session is None
+        self.cookie_pool = cookie_pool
+        self._cookie_manager: Optional[AsyncCookieManager] = None
+        self._cookie_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def session(self) -> "aiohttp.ClientSession":
+        """The aiohttp session, created on first use inside the running event loop."""
+        if self._session is None:
+            # Cookies are always sent explicitly, so the session must not store them
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                cookie_jar=aiohttp.DummyCookieJar(),
+            )
+        return self._session
+
+    @property
+    def cookie_manager(self) -> AsyncCookieManager:
+        if self._cookie_manager is None:
+            self._cookie_manager = AsyncCookieManager(self.baseurl, self.user_agent, self.proxies,
+                                                      self.cookie_prefix, self.session,
+                                                      rate_limiter=self.rate_limiter, retry_engine=self.retry_engine,
+                                                      proxy_manager=self.proxy_manager, timeout=self.timeout)
+        return self._cookie_manager
+
+    async def __aenter__(self) -> "AsyncVintedWrapper":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the aiohttp session if it was created by this wrapper."""
+        if self._session is not None and self._owns_session:
+            await self._session.close()
+            self._session = None
+
+    async def _refresh_cookie(self) -> Optional[str]:
+        """
+        Fetch a new session cookie, or take the next one of the cookie pool. Concurrent callers share a
+        single request.
+
+        :return: The new session cookie.
+        """
+        if self._cookie_lock is None:
+            self._cookie_lock = asyncio.Lock()
+        previous = self.session_cookie
+        async with self._cookie_lock:
+            # Another coroutine already refreshed the cookie while we were waiting
+            if self.session_cookie != previous and self.session_cookie:
+                return self.session_cookie
+            if self.cookie_pool is not None:
+                self.cookie_pool.invalidate(previous)
+                # The pool only blocks when it is empty, to fetch a cookie: not on the event loop
+                self.session_cookie = await asyncio.get_running_loop().run_in_executor(None, self.cookie_pool.get_cookie)
+            else:
+                self.session_cookie = await self.cookie_manager.get_random_cookie()
+            return self.session_cookie
+
+    async def search(self, params: Optional[Dict] = None, page_limit: int = 5, amount: Optional[int] = None,
+                     per_page: Optional[int] = None,
+                     fields: Optional[Iterable[str]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Search for items using the provided parameters and return a list of items.
+
+        :param params: Optional dictionary containing search parameters.
+        :param page_limit: Maximum number of pages to retrieve.
+        :param amount: Number of items wanted. The search stops as soon as they are fetched.
+        :param per_page: Number of items per page, see VintedWrapper.search.
+        :param fields: The fields to keep, see VintedWrapper.search.
+        :return: A dictionary with the list of items under 'all_items'.
+        """
+        if not params:
+            logger.error('No search parameters found. Continuing without parameters')
+            params = {}
+
+        if not isinstance(params, dict):
+            logger.error('Parameters must be in a dictionary. Continuing without parameters')
+            params = {}
+
+        if per_page is None and isinstance(params.get('per_page'), int):
+            per_page = params['per_page']
+        # A page size planned by us may be capped or ignored by Vinted, see VintedWrapper._iter_items
+        planned = per_page is None and amount is not None
+        pages, per_page = VintedWrapper._plan_pages(page_limit, amount, per_page)
+        if per_page is not None:
+            params = {**params, 'per_page': per_page}
+        page_limit = (page_limit if pages else 0) if planned else pages
+
+        projection = Projection.of(fields)
+        all_items = []
+
+        for page_number in range(1, page_limit + 1):
+            response = await self._curl("/catalog/items", params={**params, 'page': page_number})
+            items = VintedWrapper._page_items(response, projection)
+            # If the page has no items, it is the last page, so we break
+            if not items:
+                break
+            all_items.extend(items)
+            # Stop once the amount is reached, or after a short page since it is the last page
+            if (amount is not None and len(all_items) >= amount) or (not planned and per_page and len(items) < per_page):
+                break
+
+        if amount is not None:
+            all_items = all_items[:max(0, amount)]
+
+        logger.info(f'Successfully fetched {len(all_items)} items')
+        return {'all_items': all_items}
+
+    async def item(self, item_id: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Retrieve details of a specific item on Vinted.
+
+        :param item_id: The unique identifier of the item to retrieve.
+        :param params: Optional dictionary with query parameters to append to the request.
+        :return: A dictionary containing the item's details.
+        """
+        # This endpoint only works on Vinted
+        return await self._curl(f"/items/{item_id}", params=params)
+
+    async def _curl(self, endpoint: str, params: Optional[Dict] = None, max_retries: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Send an HTTP GET request to the specified endpoint.
+
+        The status codes are handled like VintedWrapper._curl does, with the same retry engine.
+
+        :param endpoint: The endpoint to make the request to.
+        :param params: An optional dictionary with query parameters to include in the request.
+        :param max_retries: Maximum number of attempts. Defaults to the one of the retry engine.
+        :return: A dictionary containing the parsed JSON response from the endpoint.
+        """
+        status, size = self._validate_request_size(params)
+        if not status:
+            logger.error(f"Request size too large: {size} kb. Returning dict('items': []).")
+            return {"items": []}
+
+        if not self.session_cookie:
+            await self._refresh_cookie()
+
+        if not endpoint:
+            logger.warning('No endpoint specified. Defaulting to "/catalog/items" (Works on Vinted)')
+            endpoint = "/catalog/items"
+
+        # aiohttp only accepts str, int and float query values
+        query = [(key, str(value)) for key, values in (params or {}).items()
+                 for value in (values if isinstance(values, list) else [values])]
+        url = f"{self.baseurl}/api/v2{endpoint}"
+        headers = {
+            "User-Agent": self.user_agent,
+            "Cookie": f'{self.cookie_prefix}{self.session_cookie}' if self.session_cookie else None,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+            "Referer": self.baseurl,
+            "Accept-Encoding": "gzip, deflate, br"}
+
+        retry, proxies = self._begin_retry(url, self.proxies, max_retries)
+        while True:
+            delay = retry.next_delay()
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+            try:
+                rate_key = self.rate_limiter.key(url, proxies)
+                await asyncio.sleep(self.rate_limiter.reserve(rate_key))
+                start = time.monotonic()
+                async with self.session.get(url, params=query, headers={k: v for k, v in headers.items() if v},
+                                            proxy=_proxy_url(url, proxies),
+                                            timeout=self._request_timeout) as response:
+                    status_code = response.status
+                    self.rate_limiter.record(rate_key, status_code)
+                    self._record_proxy(proxies, status_code, time.monotonic() - start)
+                    if status_code == 200:
+                        retry.success()
+                        return loads(await response.read())
+                    retry_after = response.headers.get("Retry-After")
+
+                proxies, refresh_cookie = self._handle_status(status_code, headers, retry, url, proxies, retry_after)
+                if refresh_cookie:
+                    await self._refresh_cookie()
+                    headers['Cookie'] = f'{self.cookie_prefix}{self.session_cookie}' if self.session_cookie else None
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                proxies = self._handle_error(e, retry, url, proxies)
+
+        logger.error("All attempts to fetch data failed. Returning an dict('items': [])")
+        return {"items": []}
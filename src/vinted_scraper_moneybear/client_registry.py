@@ -0,0 +1,129 @@
+import re
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .utils import ProxyManager
+from .vintedWrapper import VintedWrapper
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ClientRegistry:
+    def __init__(self, factory: Callable[..., VintedWrapper] = VintedWrapper, default_suffix: str = "com",
+                 idle_timeout: float = 900.0, cookie_refresh_interval: float = 300.0, **wrapper_kwargs: Any):
+        """
+        Initialize the ClientRegistry, a thread-safe set of long-lived clients keyed by country suffix.
+
+        Clients are created on first use and reused by every request, so the agents and proxies files
+        are loaded and the first cookie is fetched only once per country. All the clients share one
+        ProxyManager, so proxy statistics and quarantines are process-wide.
+
+        :param factory: The client class, VintedWrapper or VintedScraper.
+        :param default_suffix: The country suffix used when a suffix is not valid.
+        :param idle_timeout: Seconds a client may stay unused before it is dropped.
+        :param cookie_refresh_interval: Seconds between two rotations of the clients' session cookies.
+        :param wrapper_kwargs: Other arguments passed to every client.
+        """
+        self.factory = factory
+        self.default_suffix = default_suffix
+        self.idle_timeout = idle_timeout
+        self.cookie_refresh_interval = cookie_refresh_interval
+        self.wrapper_kwargs = wrapper_kwargs
+        self.wrapper_kwargs.setdefault("proxy_manager", ProxyManager())
+        # suffix -> (client, last used)
+        self._clients: Dict[str, Tuple[VintedWrapper, float]] = {}
+        self._lock = threading.Lock()
+        self._creating: Dict[str, threading.Lock] = {}
+        self._maintenance: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _validate_suffix(self, country_suffix: str) -> str:
+        """Validate and return the country suffix, like "fr" or "co.uk"."""
+        if not isinstance(country_suffix, str) or not re.match(r"^[a-z]{2,3}(\.[a-z]{2,3})?$", country_suffix):
+            logger.warning(f'Invalid country suffix {country_suffix}. Used suffix = {self.default_suffix}')
+            return self.default_suffix
+        return country_suffix
+
+    def get(self, country_suffix: str) -> VintedWrapper:
+        """
+        Get the client of a country, creating it when needed.
+
+        :param country_suffix: The suffix of the Vinted site, like "fr" for https://www.vinted.fr.
+        :return: The long-lived client.
+        """
+        suffix = self._validate_suffix(country_suffix)
+        with self._lock:
+            entry = self._clients.get(suffix)
+            if entry is not None:
+                self._clients[suffix] = (entry[0], time.monotonic())
+                return entry[0]
+            creating = self._creating.setdefault(suffix, threading.Lock())
+
+        # Create the client outside the registry lock, once per suffix
+        with creating:
+            with self._lock:
+                entry = self._clients.get(suffix)
+            if entry is None:
+                client = self.factory(f"https://www.vinted.{suffix}", **self.wrapper_kwargs)
+                logger.info(f'Created client for vinted.{suffix}')
+            else:
+                client = entry[0]
+            with self._lock:
+                self._clients[suffix] = (client, time.monotonic())
+                self._creating.pop(suffix, None)
+            return client
+
+    def evict_idle(self) -> int:
+        """
+        Drop the clients that have been idle for longer than idle_timeout.
+
+        :return: The number of dropped clients.
+        """
+        now = time.monotonic()
+        with self._lock:
+            expired = [suffix for suffix, (_, last_used) in self._clients.items() if now - last_used > self.idle_timeout]
+            for suffix in expired:
+                del self._clients[suffix]
+        if expired:
+            logger.info(f'Dropped idle clients: {", ".join(expired)}')
+        return len(expired)
+
+    def refresh_cookies(self) -> None:
+        """Give every client the next warm cookie of its domain's pool."""
+        with self._lock:
+            clients = [client for client, _ in self._clients.values()]
+        for client in clients:
+            cookie = client.cookie_pool.get_cookie()
+            if cookie:
+                client.session_cookie = cookie
+
+    def start(self) -> None:
+        """Evict idle clients and refresh the cookies in a background thread."""
+        if self._maintenance is not None and self._maintenance.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(self.cookie_refresh_interval):
+                try:
+                    self.evict_idle()
+                    self.refresh_cookies()
+                except Exception as e:
+                    logger.warning(f'Client registry maintenance failed: {e}')
+
+        self._maintenance = threading.Thread(target=run, name="client-registry", daemon=True)
+        self._maintenance.start()
+
+    def stop(self) -> None:
+        """Stop the background maintenance."""
+        self._stop.set()
+        if self._maintenance is not None:
+            self._maintenance.join()
+            self._maintenance = None
+
+    def __len__(self) -> int:
+        return len(self._clients)
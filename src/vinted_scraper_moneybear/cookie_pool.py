@@ -0,0 +1,199 @@
+import threading
+import time
+import logging
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from .utils import CookieManager
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class CookiePool:
+    _pools: Dict[Tuple[str, str], "CookiePool"] = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, baseurl: str, cookie_prefix: str = "_vinted_fr_session=", size: int = 3,
+                 max_age: float = 600.0, refresh_margin: float = 0.2,
+                 cookie_manager: Optional[CookieManager] = None):
+        """
+        Initialize the CookiePool, which keeps `size` session cookies of a domain warm.
+
+        Cookies are handed out round-robin. Once started, a background thread replaces the cookies
+        before they reach `max_age`, so wrappers never wait for a cookie on the request path.
+
+        :param baseurl: The base URL to fetch the cookies from.
+        :param cookie_prefix: The name of the session cookie followed by "=".
+        :param size: Number of cookies to keep warm.
+        :param max_age: Seconds a cookie is considered valid.
+        :param refresh_margin: Share of max_age before the expiry at which a cookie is replaced.
+        :param cookie_manager: The CookieManager used to fetch the cookies. Defaults to a new one.
+        """
+        self.baseurl = baseurl
+        self.cookie_prefix = cookie_prefix
+        self.size = size
+        self.max_age = max_age
+        self.refresh_margin = refresh_margin
+        self._cookie_manager = cookie_manager
+        # (cookie, fetched at) in round-robin order
+        self._cookies: Deque[Tuple[str, float]] = deque()
+        # The last cookies rejected by Vinted, so the clients still holding one move to a valid one
+        self._rejected: Deque[str] = deque(maxlen=4 * size)
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._refresher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @classmethod
+    def for_domain(cls, baseurl: str, cookie_prefix: str = "_vinted_fr_session=", start: bool = True,
+                   **kwargs) -> "CookiePool":
+        """
+        Get the process-wide pool of a domain, creating it when needed.
+
+        :param baseurl: The base URL to fetch the cookies from.
+        :param cookie_prefix: The name of the session cookie followed by "=".
+        :param start: Start the background refresh of a new pool.
+        :param kwargs: The other arguments of a new pool.
+        :return: The shared CookiePool.
+        """
+        key = (baseurl, cookie_prefix)
+        with cls._pools_lock:
+            pool = cls._pools.get(key)
+            if pool is None:
+                pool = cls._pools[key] = cls(baseurl, cookie_prefix, **kwargs)
+                if start:
+                    pool.start()
+            return pool
+
+    @property
+    def cookie_manager(self) -> CookieManager:
+        if self._cookie_manager is None:
+            self._cookie_manager = CookieManager(self.baseurl, None, None, self.cookie_prefix)
+        return self._cookie_manager
+
+    def _is_fresh(self, fetched_at: float, now: float) -> bool:
+        """True if the cookie doesn't need to be replaced yet."""
+        return now - fetched_at < self.max_age * (1 - self.refresh_margin)
+
+    def _prune(self, now: float) -> None:
+        """Drop the expired cookies. Must hold the lock."""
+        self._cookies = deque(entry for entry in self._cookies if now - entry[1] < self.max_age)
+
+    def _fetch(self) -> Optional[str]:
+        """Fetch a new cookie and add it to the pool."""
+        cookie = self.cookie_manager.get_random_cookie()
+        if cookie:
+            with self._lock:
+                self._cookies.append((cookie, time.monotonic()))
+                while len(self._cookies) > self.size:
+                    # The order is the round-robin one, not the age: evict the oldest cookie
+                    self._cookies.remove(min(self._cookies, key=lambda entry: entry[1]))
+        return cookie
+
+    def get_cookie(self) -> Optional[str]:
+        """
+        Get the next cookie, round-robin.
+
+        Only fetches a cookie on the caller's thread when the pool is empty, for example before the
+        background refresh has warmed it up.
+
+        :return: A session cookie, or None if none could be fetched.
+        """
+        with self._lock:
+            self._prune(time.monotonic())
+            if self._cookies:
+                self._cookies.rotate(-1)
+                return self._cookies[-1][0]
+
+        with self._fetch_lock:
+            # Another thread may have filled the pool while we were waiting
+            with self._lock:
+                if self._cookies:
+                    return self._cookies[-1][0]
+            logger.info('Cookie pool is empty. Fetching a cookie on the request path')
+            return self._fetch()
+
+    def invalidate(self, cookie: Optional[str]) -> None:
+        """
+        Remove a cookie that was rejected, for example with a 401.
+
+        :param cookie: The rejected session cookie.
+        """
+        with self._lock:
+            self._cookies = deque(entry for entry in self._cookies if entry[0] != cookie)
+            if cookie and cookie not in self._rejected:
+                self._rejected.append(cookie)
+
+    def rejected(self, cookie: Optional[str]) -> bool:
+        """:return: True if the cookie was rejected recently."""
+        if cookie is None:
+            return False
+        # invalidate() may append to the deque from another thread while it is searched
+        with self._lock:
+            return cookie in self._rejected
+
+    def refresh(self) -> int:
+        """
+        Replace the cookies close to their expiry and fill the pool up to its size.
+
+        :return: The number of cookies fetched.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            stale = sum(1 for _, fetched_at in self._cookies if not self._is_fresh(fetched_at, now))
+            missing = self.size - len(self._cookies) + stale
+
+        fetched = 0
+        for _ in range(missing):
+            with self._fetch_lock:
+                if not self._fetch():
+                    break
+            fetched += 1
+        if fetched:
+            logger.info(f'Refreshed {fetched} cookies of {self.baseurl}')
+        return fetched
+
+    def warm(self) -> int:
+        """
+        Fill the pool on the caller's thread.
+
+        :return: The number of cookies fetched.
+        """
+        return self.refresh()
+
+    def start(self, interval: Optional[float] = None) -> None:
+        """
+        Refresh the pool in a background thread.
+
+        :param interval: Seconds between two refreshes. Defaults to half of the refresh margin.
+        """
+        if self._refresher is not None and self._refresher.is_alive():
+            return
+        interval = interval or max(1.0, self.max_age * self.refresh_margin / 2)
+        self._stop.clear()
+
+        def run():
+            # Warm up at once, then keep the cookies fresh
+            while True:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.warning(f'Cookie refresh failed: {e}')
+                if self._stop.wait(interval):
+                    return
+
+        self._refresher = threading.Thread(target=run, name=f"cookie-pool-{self.baseurl}", daemon=True)
+        self._refresher.start()
+
+    def stop(self) -> None:
+        """Stop the background refresh."""
+        self._stop.set()
+        if self._refresher is not None:
+            self._refresher.join()
+            self._refresher = None
+
+    def __len__(self) -> int:
+        return len(self._cookies)
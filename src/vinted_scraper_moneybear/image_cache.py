@@ -0,0 +1,429 @@
+import hashlib
+import io
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - Pillow is an optional dependency
+    Image = None
+
+from .utils import SessionManager, default_session_manager
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Shared by every process of the host using it, VINTED_SCRAPER_IMAGE_DIRECTORY replaces it when set
+DEFAULT_DIRECTORY = os.path.join(tempfile.gettempdir(), "vinted_scraper_images")
+# The widths images are downscaled to, a requested width is rounded up to the next one
+WIDTHS = (64, 128, 256, 512, 1024)
+# The key of a URL, or the digest of a content: a SHA-256 in hex
+_HASH = re.compile(r"^[0-9a-f]{64}$")
+# Magic number -> media type
+_MEDIA_TYPES = ((b"\xff\xd8\xff", "image/jpeg"), (b"\x89PNG", "image/png"), (b"GIF8", "image/gif"))
+
+
+def media_type(content: bytes) -> str:
+    """:return: The media type of an image, from its first bytes."""
+    if content[:4] == b"RIFF" and content[8:12] == b"WEBP":
+        return "image/webp"
+    for magic, media in _MEDIA_TYPES:
+        if content.startswith(magic):
+            return media
+    return "application/octet-stream"
+
+
+def url_key(url: str) -> str:
+    """:return: The stable key of a URL, the SHA-256 of the URL in hex."""
+    return hashlib.sha256(url.encode()).hexdigest()
+
+
+class ImageCache:
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = 512 * 1024 * 1024,
+                 ttl: float = 24 * 3600.0, timeout: Union[float, Tuple[float, float]] = (3.05, 10.0),
+                 max_downloads: int = 16, session_manager: Optional[SessionManager] = None,
+                 index: Optional[Any] = None, scan_interval: float = 60.0):
+        """
+        Initialize the ImageCache, a content-addressed on-disk store of the downloaded images.
+
+        Images are stored once per content, under the SHA-256 of their bytes, and every URL points to the
+        content it was last downloaded as. A URL is downloaded again once its entry is older than `ttl`.
+        The contents are evicted least recently used first once they take more than `max_bytes`.
+
+        `max_bytes` is the budget of the directory, shared by every process using it: the contents are
+        counted on disk, with the ones stored by the other processes, whenever this process goes over the
+        budget and at least every `scan_interval` seconds it stores images. Between two scans, the
+        directory can go over the budget by what the other processes stored.
+
+        Downloads go through keep-alive pooled sessions with a timeout, at most `max_downloads` at a time,
+        and concurrent requests for the same URL share a single download.
+
+        :param directory: The directory of the store. It survives restarts and can be shared by processes.
+            Defaults to VINTED_SCRAPER_IMAGE_DIRECTORY if it is set, or DEFAULT_DIRECTORY.
+        :param max_bytes: The byte budget of the stored contents.
+        :param ttl: Seconds before the content of a URL is downloaded again.
+        :param timeout: The timeout of a download, in seconds, or as (connect, read) timeouts.
+        :param max_downloads: Maximum number of downloads at the same time.
+        :param session_manager: The pool of sessions to download with. Defaults to the process-wide one.
+        :param index: The cache keeping what each URL points to, like a result_cache.SQLiteCache shared by
+            the workers, with `ttl` as its ttl. Defaults to a small file per URL in `directory`.
+        :param scan_interval: Maximum seconds between two counts of the contents on disk, see above.
+        """
+        self.directory = directory or os.environ.get("VINTED_SCRAPER_IMAGE_DIRECTORY") or DEFAULT_DIRECTORY
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.timeout = timeout
+        self.max_downloads = max_downloads
+        self.session_manager = session_manager or default_session_manager
+        self.index = index
+        self.scan_interval = scan_interval
+        self._downloads = threading.BoundedSemaphore(max_downloads)
+        self._lock = threading.Lock()
+        # URL -> (digest of its content, download time)
+        self._urls: Dict[str, Tuple[str, float]] = {}
+        # The contents and bytes of the directory at the last scan, plus the ones stored by this process since
+        self._count = 0
+        self._size = 0
+        self._scanned_at = 0.0
+        self._evict_lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._scan()
+
+    def _content_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "contents", digest[:2], digest)
+
+    def _url_path(self, url: str) -> str:
+        return os.path.join(self.directory, "urls", url_key(url))
+
+    def _source_path(self, key: str) -> str:
+        return os.path.join(self.directory, "sources", key)
+
+    def _scan(self) -> None:
+        """Drop the expired URL and source entries, and the contents over budget."""
+        # The URL and source entries are tiny, but one is left per URL ever seen: drop the expired ones
+        now = time.time()
+        for directory in ("urls", "sources"):
+            try:
+                for entry in os.scandir(os.path.join(self.directory, directory)):
+                    if now - entry.stat().st_mtime > self.ttl:
+                        os.remove(entry.path)
+            except OSError:
+                pass
+        self._evict()
+
+    def _stored_contents(self) -> List[Tuple[float, str, int]]:
+        """:return: (last use, digest, size) of the contents on disk, stored by any process."""
+        contents = []
+        try:
+            for shard in os.scandir(os.path.join(self.directory, "contents")):
+                for entry in os.scandir(shard.path):
+                    # Skip the files still being written
+                    if not _HASH.match(entry.name):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        # Evicted by another process meanwhile
+                        continue
+                    contents.append((stat.st_mtime, entry.name, stat.st_size))
+        except OSError:
+            pass
+        return contents
+
+    @staticmethod
+    def _write(path: str, data: bytes) -> None:
+        """Write a file atomically, so readers never see it half written."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def _lookup(self, url: str) -> Optional[str]:
+        """:return: The digest of the fresh content of a URL, or None."""
+        if self.index is not None:
+            return self.index.get(("url", url), None)
+        entry = self._urls.get(url)
+        if entry is None:
+            # Downloaded before a restart, or by another process
+            try:
+                path = self._url_path(url)
+                with open(path, "r") as file:
+                    entry = (file.read(), os.stat(path).st_mtime)
+            except OSError:
+                return None
+            self._urls[url] = entry
+        digest, downloaded_at = entry
+        if time.time() - downloaded_at > self.ttl:
+            return None
+        return digest
+
+    def _read(self, digest: str) -> Optional[bytes]:
+        path = self._content_path(digest)
+        try:
+            with open(path, "rb") as file:
+                content = file.read()
+            # The modification time is the last use, the LRU order shared by the processes and restarts
+            os.utime(path)
+        except OSError:
+            return None
+        return content
+
+    def _store(self, url: str, content: bytes) -> str:
+        """Store a content as the one of a URL. :return: The digest of the content."""
+        digest = hashlib.sha256(content).hexdigest()
+        added = False
+        try:
+            if not os.path.exists(self._content_path(digest)):
+                self._write(self._content_path(digest), content)
+                added = True
+            else:
+                os.utime(self._content_path(digest))
+            if self.index is None:
+                self._write(self._url_path(url), digest.encode())
+        except OSError as e:
+            logger.warning(f'Could not store the image {url}: {e}')
+            return digest
+        if self.index is not None:
+            self.index.set(("url", url), digest)
+        with self._lock:
+            if self.index is None:
+                self._urls[url] = (digest, time.time())
+            if added:
+                self._count += 1
+                self._size += len(content)
+            scan = self._size > self.max_bytes or time.monotonic() - self._scanned_at > self.scan_interval
+        if scan:
+            self._evict(keep=digest)
+        return digest
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """
+        Count the contents on disk and remove the least recently used ones until they fit the budget.
+
+        :param keep: A content not to remove, like the one just stored.
+        """
+        # A single scan at a time, the other threads keep serving meanwhile
+        if not self._evict_lock.acquire(blocking=False):
+            return
+        try:
+            contents = self._stored_contents()
+            count, size = len(contents), sum(entry[2] for entry in contents)
+            evicted = 0
+            for _, digest, entry_size in sorted(contents):
+                if size <= self.max_bytes:
+                    break
+                if digest == keep:
+                    continue
+                try:
+                    os.remove(self._content_path(digest))
+                    evicted += 1
+                except OSError:
+                    # Removed by another process already
+                    pass
+                count -= 1
+                size -= entry_size
+            # The URLs of the removed contents miss on their next read and are downloaded again
+            with self._lock:
+                self._count, self._size = count, size
+                self._scanned_at = time.monotonic()
+                self.evictions += evicted
+        finally:
+            self._evict_lock.release()
+
+    def _download(self, url: str) -> Optional[bytes]:
+        parts = urlsplit(url)
+        session = self.session_manager.get_session(f"{parts.scheme}://{parts.netloc}")
+        with self._downloads:
+            try:
+                response = session.get(url, timeout=self.timeout)
+            except Exception as e:
+                logger.warning(f'Could not download the image {url}: {e}')
+                return None
+        if response.status_code != 200:
+            logger.warning(f'Could not download the image {url}: status code {response.status_code}')
+            return None
+        return response.content
+
+    def fetch(self, url: Optional[str]) -> Optional[Tuple[str, bytes]]:
+        """
+        Get the content of an image and its digest, from the store or downloaded.
+
+        :param url: The URL of the image.
+        :return: (SHA-256 of the content in hex, bytes of the image), or None if it could not be downloaded.
+        """
+        if not url:
+            return None
+        digest = self._lookup(url)
+        if digest is not None:
+            content = self._read(digest)
+            if content is not None:
+                self.hits += 1
+                return digest, content
+        self.misses += 1
+
+        with self._lock:
+            future = self._inflight.get(url)
+            owner = future is None
+            if owner:
+                future = self._inflight[url] = Future()
+        if not owner:
+            return future.result()
+        result = None
+        try:
+            content = self._download(url)
+            if content is not None:
+                result = self._store(url, content), content
+        finally:
+            with self._lock:
+                self._inflight.pop(url, None)
+            future.set_result(result)
+        return result
+
+    def get(self, url: Optional[str]) -> Optional[bytes]:
+        """
+        Get the content of an image, from the store or downloaded.
+
+        :param url: The URL of the image.
+        :return: The bytes of the image, or None if it could not be downloaded.
+        """
+        result = self.fetch(url)
+        return result[1] if result is not None else None
+
+    def register(self, url: str) -> str:
+        """
+        Allow an image to be fetched by its key, without downloading it yet, see `fetch_key`.
+
+        :param url: The URL of the image.
+        :return: The key of the URL.
+        """
+        key = url_key(url)
+        if self.index is not None:
+            self.index.set(("source", key), url)
+            return key
+        path = self._source_path(key)
+        try:
+            # Keeps a source in use from expiring
+            os.utime(path)
+        except OSError:
+            try:
+                self._write(path, url.encode())
+            except OSError as e:
+                logger.warning(f'Could not register the image {url}: {e}')
+        return key
+
+    def fetch_key(self, key: str) -> Optional[Tuple[str, bytes]]:
+        """
+        Get an image by the key of its URL. Only the registered URLs can be fetched.
+
+        :param key: The key returned by `register`.
+        :return: See `fetch`. None for an unknown key.
+        """
+        if not _HASH.match(key):
+            return None
+        if self.index is not None:
+            return self.fetch(self.index.get(("source", key), None))
+        try:
+            with open(self._source_path(key), "r") as file:
+                url = file.read()
+        except OSError:
+            return None
+        return self.fetch(url)
+
+    def resized(self, digest: str, content: bytes, width: int) -> Tuple[str, bytes]:
+        """
+        Downscale an image to the next of `WIDTHS`, keeping its aspect ratio and format. The downscaled
+        images are stored like the downloaded ones.
+
+        :param digest: The digest of the image, see `fetch`.
+        :param content: The bytes of the image.
+        :param width: The wanted width in pixels.
+        :return: (digest, bytes) of the downscaled image, or of the image itself when it is not wider, the
+            image can't be decoded or Pillow isn't installed.
+        """
+        if Image is None:
+            return digest, content
+        width = next((size for size in WIDTHS if size >= width), WIDTHS[-1])
+        # A pseudo URL, stored and expired like the real ones
+        source = f"resized:{digest}:{width}"
+        resized_digest = self._lookup(source)
+        if resized_digest is not None:
+            resized = self._read(resized_digest)
+            if resized is not None:
+                return resized_digest, resized
+        try:
+            with Image.open(io.BytesIO(content)) as image:
+                if image.width <= width:
+                    return digest, content
+                image_format = image.format
+                image.thumbnail((width, round(image.height * width / image.width)))
+                output = io.BytesIO()
+                image.save(output, format=image_format)
+        except Exception as e:
+            logger.warning(f'Could not downscale the image {digest}: {e}')
+            return digest, content
+        resized = output.getvalue()
+        return self._store(source, resized), resized
+
+    def get_many(self, urls: Iterable[Optional[str]]) -> Dict[str, Optional[bytes]]:
+        """
+        Get the contents of several images, downloading the missing ones at the same time.
+
+        :param urls: The URLs of the images. Duplicates and empty URLs are skipped.
+        :return: URL -> bytes of the image, or None if it could not be downloaded.
+        """
+        urls = list(dict.fromkeys(url for url in urls if url))
+        if len(urls) <= 1:
+            return {url: self.get(url) for url in urls}
+        with ThreadPoolExecutor(max_workers=min(self.max_downloads, len(urls))) as executor:
+            return dict(zip(urls, executor.map(self.get, urls)))
+
+    def stats(self) -> Dict[str, int]:
+        """
+        :return: The number and bytes of the stored contents, as of the last scan plus the ones this process
+            stored since, and the hits, misses and evictions of this process.
+        """
+        return {
+            "contents": self._count,
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def clear(self) -> None:
+        """Remove every stored image, for every process using the directory, and reset the stats."""
+        for _, digest, _ in self._stored_contents():
+            try:
+                os.remove(self._content_path(digest))
+            except OSError:
+                pass
+        with self._lock:
+            self._count = 0
+            self._size = 0
+            self._urls.clear()
+            self.hits = self.misses = self.evictions = 0
+        if self.index is not None:
+            self.index.clear()
+        for directory in ("urls", "sources"):
+            try:
+                for entry in os.scandir(os.path.join(self.directory, directory)):
+                    os.remove(entry.path)
+            except OSError:
+                pass
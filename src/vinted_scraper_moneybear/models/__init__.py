@@ -1,9 +1,12 @@
+from .codec import pack, unpack  # noqa: F401
+from .decoder import StringPool, decode, decode_many, string_pool  # noqa: F401
 from .vintedBrand import VintedBrand  # noqa: F401
 from .vintedBundleDiscount import VintedBundleDiscount  # noqa: F401
 from .vintedBundleDiscount import VintedDiscount  # noqa: F401
 from .vintedHighResolution import VintedHighResolution  # noqa: F401
 from .vintedImage import VintedImage  # noqa: F401
 from .vintedItem import VintedItem  # noqa: F401
+from .vintedItemBatch import VintedItemBatch  # noqa: F401
 from .vintedMedia import VintedMedia  # noqa: F401
 from .vintedPaymentMethod import VintedPaymentMethod  # noqa: F401
 from .vintedUser import VintedUser  # noqa: F401
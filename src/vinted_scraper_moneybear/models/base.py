@@ -0,0 +1,119 @@
+from dataclasses import fields
+from typing import Any, Callable, Dict, FrozenSet, Optional
+
+from .decoder import compile_handlers
+
+
+class VintedModel:
+    """
+    Base of the models. The declared fields are stored in slots (see `slotted`), a field that was never
+    set reads as None, and the keys of the JSON data that are not declared go to the `_extra` overflow,
+    which stays None when there are none.
+    """
+
+    __slots__ = ("_extra",)
+    _fields: FrozenSet[str] = frozenset()
+    # Field name -> setter of its slot, coercing the value if needed, see decoder.compile_handlers
+    _setters: Dict[str, Callable[[Any, Any], None]] = {}
+    # The low cardinality fields, whose strings are shared through decoder.string_pool
+    _interned: FrozenSet[str] = frozenset()
+
+    def _load(self, json_data: Dict[str, Any]) -> None:
+        """Store the declared keys of the JSON data in their slot and the others in the overflow."""
+        setters = self._setters
+        extra = None
+        for key, value in json_data.items():
+            setter = setters.get(key)
+            if setter is not None:
+                setter(self, value)
+            elif extra is None:
+                extra = {key: value}
+            else:
+                extra[key] = value
+        if extra is not None:
+            object.__setattr__(self, "_extra", extra)
+
+    def _set_raw(self, name: str, json_data: Optional[Any]) -> None:
+        """Store the raw JSON data of a field, to be decoded when read if the field is lazy."""
+        self._setters[name](self, json_data)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called when the normal lookup fails: an unset slot or a key of the overflow
+        if name in self._fields or name == "_extra":
+            return None
+        extra = self._extra
+        if extra is not None and name in extra:
+            return extra[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in self._fields or hasattr(type(self), name):
+            object.__setattr__(self, name, value)
+            return
+        # Not a declared field: keep it in the overflow
+        if self._extra is None:
+            object.__setattr__(self, "_extra", {})
+        self._extra[name] = value
+
+
+class lazy:
+    """
+    Default of a nested model field, like `user: Optional[VintedUser] = lazy(VintedUser)`.
+
+    The field keeps the raw JSON data in a private slot and only builds the model, or the list of models
+    with `many=True`, the first time it is read. The model then replaces the raw data.
+    """
+
+    def __init__(self, model: Callable[[Dict[str, Any]], Any], many: bool = False):
+        self.model = model
+        self.many = many
+        # The member descriptor of the private slot, set by `slotted`
+        self.slot: Any = None
+
+    def __set_name__(self, owner, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance, owner=None) -> Any:
+        if instance is None:
+            return self
+        try:
+            value = self.slot.__get__(instance, owner)
+        except AttributeError:
+            return None
+        if self.many:
+            if type(value) is list and value and type(value[0]) is dict:
+                value = [self.model(data) for data in value]
+                self.slot.__set__(instance, value)
+        elif type(value) is dict:
+            value = self.model(value)
+            self.slot.__set__(instance, value)
+        return value
+
+    def __set__(self, instance, value: Any) -> None:
+        self.slot.__set__(instance, value)
+
+
+def slotted(cls):
+    """
+    Rebuild a model dataclass with a slot per field, like `dataclass(slots=True)` of Python 3.10.
+
+    Instances then hold a fixed array of references instead of a dict of every key of the JSON data.
+    The `lazy` fields get a private slot behind their descriptor. Apply it on top of `@dataclass`.
+    """
+    names = tuple(field.name for field in fields(cls))
+    lazy_names = {name for name in names if isinstance(cls.__dict__.get(name), lazy)}
+    namespace = {
+        key: value
+        for key, value in cls.__dict__.items()
+        # The class defaults of the fields would shadow the slots, the unset fields read as None instead
+        if (key not in names or key in lazy_names) and key not in ("__dict__", "__weakref__")
+    }
+    slots = {name: f"_{name}" if name in lazy_names else name for name in names}
+    namespace["__slots__"] = tuple(slots.values())
+    namespace["_fields"] = frozenset(names)
+    slotted_cls = type(cls)(cls.__name__, cls.__bases__, namespace)
+    # The raw JSON data of a lazy field is stored as is, it is decoded when read
+    slotted_cls._setters = compile_handlers(slotted_cls, slots)
+    for name in lazy_names:
+        namespace[name].slot = slotted_cls.__dict__[slots[name]]
+    return slotted_cls
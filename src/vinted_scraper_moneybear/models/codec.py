@@ -0,0 +1,104 @@
+from dataclasses import fields
+from typing import Any, Callable, Dict, List, Tuple, Type, Union
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack is an optional dependency
+    msgpack = None
+
+from .base import VintedModel
+from .vintedBrand import VintedBrand
+from .vintedBundleDiscount import VintedBundleDiscount, VintedDiscount
+from .vintedHighResolution import VintedHighResolution
+from .vintedImage import VintedImage
+from .vintedItem import VintedItem
+from .vintedMedia import VintedMedia
+from .vintedPaymentMethod import VintedPaymentMethod
+from .vintedUser import VintedUser
+
+# The msgpack extension code of every model. Stored in the encoded data: never change or reuse a code
+MODEL_CODES: Dict[Type[VintedModel], int] = {
+    VintedItem: 1,
+    VintedUser: 2,
+    VintedImage: 3,
+    VintedBrand: 4,
+    VintedMedia: 5,
+    VintedHighResolution: 6,
+    VintedPaymentMethod: 7,
+    VintedBundleDiscount: 8,
+    VintedDiscount: 9,
+}
+_CODE_MODELS: Dict[int, Type[VintedModel]] = {code: model for model, code in MODEL_CODES.items()}
+
+
+def _require_msgpack() -> None:
+    """Raise a helpful error when the optional msgpack dependency is missing."""
+    if msgpack is None:
+        raise ImportError('The binary codec needs msgpack. Install it with `pip install vinted_scraper_moneybear[binary]`')
+
+
+def _layout(model: Type[VintedModel]) -> Tuple[Tuple[str, ...], List[Callable[[Any, Any], None]]]:
+    """:return: The slots of the model and the setters of its fields, both in the order of the fields."""
+    # `slotted` lays out the slots in the order of the fields, the lazy ones under their private name
+    return tuple(model.__slots__), [model._setters[field.name] for field in fields(model)]
+
+
+_LAYOUTS = {model: _layout(model) for model in MODEL_CODES}
+
+
+def _default(value: Any) -> Any:
+    """Encode a model as an extension: [overflow, value of each field in the order of the fields]."""
+    model = type(value)
+    code = MODEL_CODES.get(model)
+    if code is None:
+        raise TypeError(f"Can't encode an object of type {model.__name__}")
+    # The raw slots, so the lazy fields that were never read are stored as their JSON data and stay lazy
+    values = [getattr(value, slot, None) for slot in _LAYOUTS[model][0]]
+    while values and values[-1] is None:
+        values.pop()
+    return msgpack.ExtType(code, msgpack.packb([value._extra, *values], default=_default, use_bin_type=True))
+
+
+def _ext_hook(code: int, data: bytes) -> Any:
+    model = _CODE_MODELS.get(code)
+    if model is None:
+        return msgpack.ExtType(code, data)
+    extra, *values = msgpack.unpackb(data, ext_hook=_ext_hook, raw=False)
+    instance = model.__new__(model)
+    # Fields added to a model after the data was encoded are missing at the end, and read as None
+    for setter, value in zip(_LAYOUTS[model][1], values):
+        if value is not None:
+            setter(instance, value)
+    if extra is not None:
+        object.__setattr__(instance, "_extra", extra)
+    return instance
+
+
+def pack(value: Any) -> bytes:
+    """
+    Encode models, or lists and dicts of them, to compact msgpack bytes, like a cache entry or the results
+    sent to another process.
+
+    A model is stored as its field values in the order of its fields, without the field names. The models
+    of `MODEL_CODES` are supported: VintedItem, VintedUser, VintedImage and the models nested in them.
+
+    :param value: A model, or any msgpack value holding models.
+    :return: The encoded bytes.
+    """
+    _require_msgpack()
+    return msgpack.packb(value, default=_default, use_bin_type=True)
+
+
+def unpack(raw: Union[bytes, bytearray, memoryview]) -> Any:
+    """
+    Decode the bytes of `pack`.
+
+    The models are rebuilt without calling `__init__` and the nested models that were never read are
+    stored as their JSON data, to be built on first access like after a normal decode. `raw` can be any
+    buffer, like a memoryview of shared memory, which is read without a copy.
+
+    :param raw: The encoded bytes.
+    :return: The decoded value.
+    """
+    _require_msgpack()
+    return msgpack.unpackb(raw, ext_hook=_ext_hook, raw=False)
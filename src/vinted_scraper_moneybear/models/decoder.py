@@ -0,0 +1,200 @@
+import json
+import threading
+from dataclasses import fields
+from typing import Any, Callable, Dict, List, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional dependency
+    orjson = None
+
+# Slot setter or coercing handler of a field: handler(instance, value)
+Handler = Callable[[Any, Any], None]
+
+
+class StringPool:
+    def __init__(self, max_size: int = 10_000):
+        """
+        Initialize the StringPool, which dedupes the values of the low cardinality fields, like the currency,
+        status or city of an item, so every model holding the same value shares a single string.
+
+        The pool only grows until it holds `max_size` strings. Past that, new values are kept as they are,
+        the strings already pooled, the frequent ones in practice, stay shared.
+
+        :param max_size: Maximum number of distinct strings to pool.
+        """
+        self.max_size = max_size
+        self._strings: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def intern(self, value: Any) -> Any:
+        """
+        :param value: A decoded value.
+        :return: The pooled copy of a string, or the value itself.
+        """
+        if type(value) is not str:
+            return value
+        with self._lock:
+            pooled = self._strings.get(value)
+            if pooled is not None:
+                self.hits += 1
+                return pooled
+            self.misses += 1
+            if len(self._strings) < self.max_size:
+                self._strings[value] = value
+        return value
+
+    def intern_dict(self, value: Any) -> Any:
+        """
+        Pool the string values of a dict, like the item box {"first_line": "Nike", "second_line": "M"}, in place.
+        The values are only swapped for equal strings, so the dict reads the same.
+
+        :param value: A decoded value.
+        :return: The value.
+        """
+        if type(value) is dict:
+            intern = self.intern
+            for key, entry in value.items():
+                if type(entry) is str:
+                    value[key] = intern(entry)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """:return: The size of the pool, and its hits and misses since it was created or cleared."""
+        with self._lock:
+            size, hits, misses = len(self._strings), self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "size": size,
+            "max_size": self.max_size,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        """Forget the pooled strings and reset the stats."""
+        with self._lock:
+            self._strings.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+
+# Shared by all the models of the process
+string_pool = StringPool()
+
+
+def loads(raw: Union[bytes, str]) -> Any:
+    """
+    Parse JSON bytes, with orjson when it is installed.
+
+    :param raw: The JSON document.
+    :return: The parsed document.
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _is_float(field_type: Any) -> bool:
+    """True for the float and Optional[float] field types."""
+    return field_type is float or float in getattr(field_type, "__args__", ())
+
+
+def _to_float(value: Any) -> Any:
+    """Convert a numeric string, or the amount of a money object, to a float. Other values are kept."""
+    if type(value) is dict and "amount" in value:
+        value = value["amount"]
+    if type(value) is str:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _is_dict(field_type: Any) -> bool:
+    """True for the dict and Optional[Dict[...]] field types."""
+    return any(getattr(option, "__origin__", option) is dict for option in (field_type, *getattr(field_type, "__args__", ())))
+
+
+def _interned_handler(set_slot: Handler, intern: Callable[[Any], Any]) -> Handler:
+    def handler(instance, value):
+        set_slot(instance, intern(value))
+    return handler
+
+
+def _float_handler(set_slot: Handler) -> Handler:
+    def handler(instance, value):
+        set_slot(instance, _to_float(value) if type(value) is not float else value)
+    return handler
+
+
+def _money_handler(set_slot: Handler, set_currency: Handler) -> Handler:
+    def handler(instance, value):
+        # The catalog returns the price as {"amount": "4.5", "currency_code": "EUR"}
+        if type(value) is dict and "currency_code" in value:
+            set_currency(instance, value["currency_code"])
+        set_slot(instance, _to_float(value) if type(value) is not float else value)
+    return handler
+
+
+def compile_handlers(cls, slots: Dict[str, str]) -> Dict[str, Handler]:
+    """
+    Compile the handlers of a slotted model class once, from the types of its dataclass fields.
+
+    Most fields are set with the C setter of their slot. The float fields convert numeric strings and
+    money objects to a float, and `price` also sets `currency` from its money object, so `_load`
+    decodes and coerces the JSON data in a single pass. The fields named in the `_interned` attribute
+    of the class share their strings through `string_pool`, or the strings of their dict for dict fields.
+
+    :param cls: The slotted model class.
+    :param slots: Field name -> name of its slot.
+    :return: Field name -> handler(instance, value).
+    """
+    setters = {name: cls.__dict__[slot].__set__ for name, slot in slots.items()}
+    handlers = dict(setters)
+    for field in fields(cls):
+        if field.name in getattr(cls, "_interned", ()):
+            intern = string_pool.intern_dict if _is_dict(field.type) else string_pool.intern
+            handlers[field.name] = _interned_handler(setters[field.name], intern)
+    for field in fields(cls):
+        if not _is_float(field.type):
+            continue
+        if field.name == "price" and "currency" in setters:
+            handlers[field.name] = _money_handler(setters[field.name], handlers["currency"])
+        else:
+            handlers[field.name] = _float_handler(setters[field.name])
+    return handlers
+
+
+def decode(model: Callable[[Dict[str, Any]], Any], raw: Union[bytes, str], key: Optional[str] = None) -> Any:
+    """
+    Decode a JSON document straight into a model.
+
+    The parsed dicts only live until the model is built, apart from the sub-dicts kept by the lazy fields.
+
+    :param model: The model class, like VintedItem.
+    :param raw: The JSON document, like the body of an item response.
+    :param key: The key of the model in the document, like "item". Defaults to the whole document.
+    :return: The model.
+    """
+    data = loads(raw)
+    return model(data[key] if key is not None else data)
+
+
+def decode_many(model: Callable[[Dict[str, Any]], Any], raw: Union[bytes, str], key: str = "items") -> List[Any]:
+    """
+    Decode a JSON document straight into a list of models, skipping the entries that are not objects.
+
+    :param model: The model class, like VintedItem.
+    :param raw: The JSON document, like the body of a catalog response.
+    :param key: The key of the list in the document.
+    :return: The list of models.
+    """
+    return [model(data) for data in loads(raw).get(key) or [] if type(data) is dict]
@@ -1,9 +1,12 @@
 from dataclasses import dataclass
 from typing import Optional
 
+from .base import VintedModel, slotted
 
+
+@slotted
 @dataclass
-class VintedBrand:
+class VintedBrand(VintedModel):
     id: Optional[str] = None
     title: Optional[str] = None
     slug: Optional[str] = None
@@ -18,6 +21,8 @@ class VintedBrand:
     url: Optional[str] = None
     is_favourite: Optional[bool] = None
 
+    _interned = frozenset({"title"})
+
     def __init__(self, json_data=None):
         if json_data is not None:
-            self.__dict__.update(json_data)
+            self._load(json_data)
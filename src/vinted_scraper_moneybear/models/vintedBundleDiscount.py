@@ -1,31 +1,30 @@
 from dataclasses import dataclass
 from typing import List, Optional
 
+from .base import VintedModel, lazy, slotted
 
+
+@slotted
 @dataclass
-class VintedDiscount:
+class VintedDiscount(VintedModel):
     minimal_item_count: Optional[int] = None
     fraction: Optional[float] = None
 
     def __init__(self, json_data=None):
         if json_data is not None:
-            self.__dict__.update(json_data)
+            self._load(json_data)
 
 
+@slotted
 @dataclass
-class VintedBundleDiscount:
+class VintedBundleDiscount(VintedModel):
     id: Optional[str] = None
     user_id: Optional[str] = None
     enabled: Optional[bool] = None
     minimal_item_count: Optional[int] = None
     fraction: Optional[float] = None
-    discounts: Optional[List[VintedDiscount]] = None
+    discounts: Optional[List[VintedDiscount]] = lazy(VintedDiscount, many=True)
 
     def __init__(self, json_data=None):
         if json_data is not None:
-            self.__dict__.update(json_data)
-
-            if "discounts" in json_data:
-                self.discounts = [
-                    VintedDiscount(discount) for discount in json_data.get("discounts")
-                ]
+            self._load(json_data)
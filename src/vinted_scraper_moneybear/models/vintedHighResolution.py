@@ -1,13 +1,16 @@
 from dataclasses import dataclass
 from typing import Optional
 
+from .base import VintedModel, slotted
 
+
+@slotted
 @dataclass
-class VintedHighResolution:
+class VintedHighResolution(VintedModel):
     id: Optional[str] = None
     timestamp: Optional[int] = None
     orientation: Optional[str] = None
 
     def __init__(self, json_data=None):
         if json_data is not None:
-            self.__dict__.update(json_data)
+            self._load(json_data)
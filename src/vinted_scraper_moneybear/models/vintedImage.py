@@ -1,12 +1,14 @@
 from dataclasses import dataclass
 from typing import List, Optional
 
+from .base import VintedModel, lazy, slotted
 from .vintedHighResolution import VintedHighResolution
 from .vintedMedia import VintedMedia
 
 
+@slotted
 @dataclass
-class VintedImage:
+class VintedImage(VintedModel):
     id: Optional[str] = None
     width: Optional[int] = None
     height: Optional[int] = None
@@ -14,10 +16,10 @@ class VintedImage:
     url: Optional[str] = None
     dominant_color: Optional[str] = None
     dominant_color_opaque: Optional[str] = None
-    thumbnails: Optional[List[VintedMedia]] = None
+    thumbnails: Optional[List[VintedMedia]] = lazy(VintedMedia, many=True)
     is_suspicious: Optional[bool] = None
     orientation: Optional[str] = None
-    high_resolution: Optional[VintedHighResolution] = None
+    high_resolution: Optional[VintedHighResolution] = lazy(VintedHighResolution)
     full_size_url: Optional[str] = None
     is_hidden: Optional[bool] = None
     image_no: Optional[int] = None
@@ -25,13 +27,5 @@ class VintedImage:
 
     def __init__(self, json_data=None):
         if json_data is not None:
-            self.__dict__.update(json_data)
-
-            high_resolution_data = json_data.get("high_resolution")
-            if high_resolution_data:
-                self.high_resolution = VintedHighResolution(high_resolution_data)
-
-            if "thumbnails" in json_data:
-                self.thumbnails = [
-                    VintedMedia(media) for media in json_data.get("thumbnails")
-                ]
+            # The thumbnails and high resolution are only built when read, see `lazy`
+            self._load(json_data)
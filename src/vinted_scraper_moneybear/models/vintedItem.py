@@ -1,28 +1,30 @@
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from deprecated import deprecated
 
+from .base import VintedModel, lazy, slotted
 from .vintedBrand import VintedBrand
 from .vintedImage import VintedImage
 from .vintedPaymentMethod import VintedPaymentMethod
 from .vintedUser import VintedUser
 
 
+@slotted
 @dataclass
-class VintedItem:
+class VintedItem(VintedModel):
     id: Optional[str] = None
     title: Optional[str] = None
     price: Optional[float] = None
     is_visible: Optional[int] = None
     discount: Optional[str] = None
     currency: Optional[str] = None
-    brand: Optional[VintedBrand] = None
+    brand: Optional[VintedBrand] = lazy(VintedBrand)
     is_for_swap: Optional[bool] = None
-    user: Optional[VintedUser] = None
+    user: Optional[VintedUser] = lazy(VintedUser)
     url: Optional[str] = None
     promoted: Optional[bool] = None
-    photos: Optional[List[VintedImage]] = None
+    photos: Optional[List[VintedImage]] = lazy(VintedImage, many=True)
     favourite_count: Optional[int] = None
     is_favourite: Optional[bool] = None
     badge: Optional[str] = None
@@ -32,7 +34,7 @@ class VintedItem:
     view_count: Optional[int] = None
     size_title: Optional[str] = None
     content_source: Optional[str] = None
-    accepted_pay_in_methods: Optional[List[VintedPaymentMethod]] = None
+    accepted_pay_in_methods: Optional[List[VintedPaymentMethod]] = lazy(VintedPaymentMethod, many=True)
     user_id: Optional[str] = None
     description: Optional[str] = None
     brand_id: Optional[int] = None
@@ -125,6 +127,13 @@ class VintedItem:
     is_upload_story_button_visible: Optional[bool] = None
     offline_verification: Optional[bool] = None
     offline_verification_fee: Optional[float] = None
+    brand_title: Optional[str] = None
+    item_box: Optional[Dict[str, str]] = None
+
+    _interned = frozenset({
+        "currency", "brand_title", "size_title", "status", "content_source", "country", "city", "color1", "color2",
+        "measurement_unit", "item_box",
+    })
 
     @property
     @deprecated(
@@ -140,45 +149,14 @@ class VintedItem:
 
     def __init__(self, json_data=None):
         if json_data is not None:
-            self.__dict__.update(json_data)
-
-            if "user" in json_data:
-                self.user = VintedUser(json_data.get("user"))
-
-            if "photo" in json_data:
-                self.photos = [VintedImage(json_data.get("photo"))]
-
-            if "photos" in json_data:
-                self.photos = [VintedImage(i) for i in json_data.get("photos")]
+            # The user, photos, payment methods and brand are only built when read, see `lazy`.
+            # The prices are converted to floats while loading, see decoder.compile_handlers
+            self._load(json_data)
 
-            if "accepted_pay_in_methods" in json_data:
-                self.accepted_pay_in_methods = [
-                    VintedPaymentMethod(method)
-                    for method in json_data.get("accepted_pay_in_methods")
-                ]
+            if "photo" in json_data and "photos" not in json_data:
+                self._set_raw("photos", [json_data.get("photo")])
 
             if "brand_dto" in json_data:
-                self.brand = VintedBrand(json_data.get("brand_dto"))
+                self._set_raw("brand", json_data.get("brand_dto"))
             elif "brand_title" in json_data:
-                self.brand = VintedBrand()
-                self.brand.title = json_data.get("brand_title")
-
-        if type(json_data.get("price")) is dict:
-            self.price = float(json_data.get("price")["amount"])
-            self.currency = json_data.get("price")["currency_code"]
-        else:
-            self.price = (
-                float(self.price) if isinstance(self.price, str) else self.price
-            )
-
-        self.service_fee = (
-            float(self.service_fee)
-            if isinstance(self.service_fee, str)
-            else self.service_fee
-        )
-
-        self.total_item_price = (
-            float(self.total_item_price)
-            if isinstance(self.total_item_price, str)
-            else self.total_item_price
-        )
+                self._set_raw("brand", {"title": self.brand_title})
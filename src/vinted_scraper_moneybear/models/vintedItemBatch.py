@@ -0,0 +1,229 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is an optional dependency
+    np = None
+
+from .decoder import _to_float
+from .vintedItem import VintedItem
+
+# Numeric columns, stored as float64 arrays with NaN for the missing values
+NUMERIC_COLUMNS = (
+    "price", "total_item_price", "service_fee", "favourite_count", "view_count", "brand_id", "status_id", "catalog_id",
+)
+# Low cardinality string columns, stored dictionary-encoded
+STRING_COLUMNS = ("currency", "brand", "status", "size_title", "user_login")
+
+
+def _require_numpy() -> None:
+    """Raise a helpful error when the optional numpy dependency is missing."""
+    if np is None:
+        raise ImportError('VintedItemBatch needs numpy. Install it with `pip install vinted_scraper_moneybear[batch]`')
+
+
+def _number(value: Any) -> float:
+    value = _to_float(value)
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else float("nan")
+
+
+def _nested(value: Any, key: str) -> Any:
+    return value.get(key) if isinstance(value, dict) else None
+
+
+# Column -> value of a raw item dict, as returned by the catalog endpoint
+_RAW_GETTERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    **{column: (lambda item, column=column: item.get(column)) for column in NUMERIC_COLUMNS + STRING_COLUMNS},
+    "currency": lambda item: _nested(item.get("price"), "currency_code") or item.get("currency"),
+    "brand": lambda item: _nested(item.get("brand_dto"), "title") or item.get("brand_title"),
+    "user_login": lambda item: _nested(item.get("user"), "login"),
+}
+
+# Column -> value of a VintedItem
+_MODEL_GETTERS: Dict[str, Callable[[VintedItem], Any]] = {
+    **{column: (lambda item, column=column: getattr(item, column)) for column in NUMERIC_COLUMNS + STRING_COLUMNS},
+    "brand": lambda item: item.brand.title if item.brand is not None else None,
+    "user_login": lambda item: item.user.login if item.user is not None else None,
+}
+
+
+class DictionaryColumn:
+    """
+    A dictionary-encoded string column: an int32 code per row and the list of the distinct values.
+    The code -1 is a missing value. Comparisons with a string return a boolean mask.
+    """
+
+    def __init__(self, codes: "np.ndarray", categories: Tuple[Optional[str], ...]):
+        self.codes = codes
+        self.categories = categories
+        self._index = {value: code for code, value in enumerate(categories)}
+
+    @classmethod
+    def encode(cls, values: Iterable[Optional[str]]) -> "DictionaryColumn":
+        index: Dict[str, int] = {}
+        codes = [-1 if value is None else index.setdefault(value, len(index)) for value in values]
+        return cls(np.asarray(codes, dtype=np.int32), tuple(index))
+
+    def _code(self, value: Optional[str]) -> int:
+        # A value that doesn't occur gets a code no row has
+        return -1 if value is None else self._index.get(value, -2)
+
+    def __eq__(self, value: Any) -> "np.ndarray":  # type: ignore[override]
+        return self.codes == self._code(value)
+
+    def __ne__(self, value: Any) -> "np.ndarray":  # type: ignore[override]
+        return self.codes != self._code(value)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def isin(self, values: Iterable[Optional[str]]) -> "np.ndarray":
+        """:return: The mask of the rows whose value is one of `values`."""
+        return np.isin(self.codes, [self._code(value) for value in values])
+
+    def take(self, indices: "np.ndarray") -> "DictionaryColumn":
+        return DictionaryColumn(self.codes[indices], self.categories)
+
+    def decode(self) -> List[Optional[str]]:
+        """:return: The values of the rows."""
+        categories = self.categories
+        return [categories[code] if code >= 0 else None for code in self.codes.tolist()]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+class VintedItemBatch:
+    def __init__(self, rows: Sequence[Union[Dict[str, Any], VintedItem]], columns: Dict[str, Any]):
+        """
+        A columnar batch of items: the scalar fields as NumPy arrays, for vectorised filtering and sorting,
+        and the items themselves, only built into VintedItem rows when they are read.
+
+        Use `from_items` to build one.
+
+        :param rows: The raw item dicts or the VintedItem rows.
+        :param columns: Column name -> float64 array or DictionaryColumn.
+        """
+        _require_numpy()
+        self._rows = list(rows)
+        self.columns = columns
+
+    @classmethod
+    def from_items(cls, items: Iterable[Union[Dict[str, Any], VintedItem]]) -> "VintedItemBatch":
+        """
+        Build a batch from raw item dicts, like the ones of VintedWrapper.iter_search, or from VintedItems.
+
+        :param items: The items. Entries that are neither are skipped.
+        :return: The batch.
+        """
+        _require_numpy()
+        rows = [item for item in items if isinstance(item, (dict, VintedItem))]
+        if all(type(row) is dict for row in rows):
+            # The common case of raw catalog items: no getter call for the plain columns
+            plain = set(NUMERIC_COLUMNS + STRING_COLUMNS) - {"currency", "brand", "user_login"}
+            values = {
+                column: [row.get(column) for row in rows] if column in plain else [_RAW_GETTERS[column](row) for row in rows]
+                for column in NUMERIC_COLUMNS + STRING_COLUMNS
+            }
+        else:
+            getters = [_RAW_GETTERS if isinstance(row, dict) else _MODEL_GETTERS for row in rows]
+            values = {
+                column: [get[column](row) for get, row in zip(getters, rows)]
+                for column in NUMERIC_COLUMNS + STRING_COLUMNS
+            }
+
+        columns: Dict[str, Any] = {}
+        nan = float("nan")
+        for column in NUMERIC_COLUMNS:
+            columns[column] = np.fromiter(
+                (value if type(value) is float or type(value) is int else nan if value is None else _number(value)
+                 for value in values[column]),
+                dtype=np.float64, count=len(rows))
+        for column in STRING_COLUMNS:
+            columns[column] = DictionaryColumn.encode(values[column])
+
+        ids = [row.get("id") if isinstance(row, dict) else row.id for row in rows]
+        try:
+            columns["id"] = np.asarray([int(item_id) for item_id in ids], dtype=np.int64)
+        except (TypeError, ValueError):
+            columns["id"] = np.asarray(ids, dtype=object)
+        return cls(rows, columns)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, key: Union[str, int]) -> Any:
+        """
+        :param key: A column name, or a row position.
+        :return: The column, or the VintedItem of the row, built on first access.
+        """
+        if isinstance(key, str):
+            return self.columns[key]
+        row = self._rows[key]
+        if isinstance(row, dict):
+            row = self._rows[key] = VintedItem(row)
+        return row
+
+    def __iter__(self) -> Iterator[VintedItem]:
+        for position in range(len(self._rows)):
+            yield self[position]
+
+    def to_items(self) -> List[VintedItem]:
+        """:return: All the rows as VintedItem objects."""
+        return list(self)
+
+    def take(self, indices: Union[Sequence[int], "np.ndarray"]) -> "VintedItemBatch":
+        """
+        :param indices: Positions of the rows to keep, in the wanted order.
+        :return: A new batch with those rows.
+        """
+        indices = np.asarray(indices, dtype=np.intp)
+        columns = {
+            name: column.take(indices) if isinstance(column, DictionaryColumn) else column[indices]
+            for name, column in self.columns.items()
+        }
+        return VintedItemBatch([self._rows[position] for position in indices.tolist()], columns)
+
+    def filter(self, mask: "np.ndarray") -> "VintedItemBatch":
+        """
+        Keep the rows of a boolean mask, like `batch.filter((batch["price"] < 10) & (batch["brand"] == "Nike"))`.
+
+        :param mask: One boolean per row.
+        :return: A new batch with the selected rows.
+        """
+        return self.take(np.flatnonzero(mask))
+
+    def _sort_keys(self, column: str, descending: bool) -> "np.ndarray":
+        values = self.columns[column]
+        if isinstance(values, DictionaryColumn):
+            # Sort by value, not by code. The code -1 of the missing values picks the last rank, NaN
+            order = sorted(range(len(values.categories)), key=lambda code: values.categories[code])
+            ranks = np.full(len(order) + 1, np.nan)
+            ranks[np.asarray(order, dtype=np.intp)] = np.arange(len(order))
+            keys = ranks[values.codes]
+        else:
+            keys = values.astype(np.float64)
+        # NumPy sorts NaN last, whatever the sign of the other keys
+        return -keys if descending else keys
+
+    def sort(self, column: str, descending: bool = False) -> "VintedItemBatch":
+        """
+        :param column: The column to sort by. Missing values come last.
+        :param descending: Sort from the largest value.
+        :return: A new, sorted batch. The sort is stable.
+        """
+        return self.take(np.argsort(self._sort_keys(column, descending), kind="stable"))
+
+    def top_k(self, column: str, k: int, largest: bool = True) -> "VintedItemBatch":
+        """
+        :param column: The column to rank by. Missing values are ranked last.
+        :param k: Number of rows to keep. The batch is empty when it is 0 or less.
+        :param largest: Keep the largest values, or the smallest ones.
+        :return: A new batch with the k first rows, sorted.
+        """
+        if k <= 0:
+            return self.take(np.empty(0, dtype=np.intp))
+        keys = self._sort_keys(column, descending=largest)
+        if k >= len(keys):
+            return self.take(np.argsort(keys, kind="stable"))
+        candidates = np.argpartition(keys, k)[:k]
+        return self.take(candidates[np.argsort(keys[candidates], kind="stable")])
@@ -1,9 +1,12 @@
 from dataclasses import dataclass
 from typing import Optional
 
+from .base import VintedModel, slotted
 
+
+@slotted
 @dataclass
-class VintedMedia:
+class VintedMedia(VintedModel):
     type: Optional[str] = None
     url: Optional[str] = None
     width: Optional[int] = None
@@ -12,4 +15,4 @@ class VintedMedia:
 
     def __init__(self, json_data=None):
         if json_data is not None:
-            self.__dict__.update(json_data)
+            self._load(json_data)
@@ -1,9 +1,12 @@
 from dataclasses import dataclass
 from typing import Optional
 
+from .base import VintedModel, slotted
 
+
+@slotted
 @dataclass
-class VintedPaymentMethod:
+class VintedPaymentMethod(VintedModel):
     id: Optional[int] = None
     code: Optional[str] = None
     requires_credit_card: Optional[bool] = None
@@ -16,4 +19,4 @@ class VintedPaymentMethod:
 
     def __init__(self, json_data=None):
         if json_data is not None:
-            self.__dict__.update(json_data)
+            self._load(json_data)
@@ -1,18 +1,20 @@
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
+from .base import VintedModel, lazy, slotted
 from .vintedBundleDiscount import VintedBundleDiscount
 from .vintedImage import VintedImage
 from .vintedPaymentMethod import VintedPaymentMethod
 
 
+@slotted
 @dataclass
-class VintedUser:
+class VintedUser(VintedModel):
     id: Optional[str] = None
     login: Optional[str] = None
     business: Optional[bool] = None
     profile_url: Optional[str] = None
-    photo: Optional[VintedImage] = None
+    photo: Optional[VintedImage] = lazy(VintedImage)
     anon_id: Optional[str] = None
     real_name: Optional[str] = None
     email: Optional[str] = None
@@ -60,7 +62,7 @@ class VintedUser:
     hide_feedback: Optional[bool] = None
     can_post_big_forum_photos: Optional[bool] = None
     allow_direct_messaging: Optional[bool] = None
-    bundle_discount: Optional[VintedBundleDiscount] = None
+    bundle_discount: Optional[VintedBundleDiscount] = lazy(VintedBundleDiscount)
     donation_configuration: Optional[str] = None
     fundraiser: Optional[str] = None
     has_ship_fast_badge: Optional[bool] = None
@@ -84,24 +86,15 @@ class VintedUser:
     can_bundle: Optional[bool] = None
     country_title_local: Optional[str] = None
     last_loged_on: Optional[str] = None
-    accepted_pay_in_methods: Optional[List[VintedPaymentMethod]] = None
+    accepted_pay_in_methods: Optional[List[VintedPaymentMethod]] = lazy(VintedPaymentMethod, many=True)
     localization: Optional[str] = None
     is_bpf_price_prominence_applied: Optional[bool] = None
 
+    _interned = frozenset({
+        "gender", "city", "country_code", "country_iso_code", "country_title", "country_title_local", "locale",
+    })
+
     def __init__(self, json_data=None):
         if json_data is not None:
-            self.__dict__.update(json_data)
-
-            if "photo" in json_data:
-                self.photo = VintedImage(json_data.get("photo"))
-
-            if "bundle_discount" in json_data:
-                self.bundle_discount = VintedBundleDiscount(
-                    json_data.get("bundle_discount")
-                )
-
-            if "accepted_pay_in_methods" in json_data:
-                self.bundle_discount = [
-                    VintedPaymentMethod(method)
-                    for method in json_data.get("accepted_pay_in_methods")
-                ]
+            # The photo, bundle discount and payment methods are only built when read, see `lazy`
+            self._load(json_data)
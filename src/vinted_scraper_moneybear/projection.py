@@ -0,0 +1,70 @@
+from typing import Any, Dict, Iterable, Optional
+
+
+class Projection:
+    def __init__(self, fields: Iterable[str]):
+        """
+        Initialize the Projection, the subset of the item fields to keep, like ["title", "user.login", "photo.url"].
+
+        A path keeps a whole value, a dotted path only keeps that key of the nested object, or of every
+        object of a nested list. The paths are compiled once into a tree, then applied to every item.
+
+        :param fields: The field paths to keep.
+        """
+        self.fields = tuple(fields)
+        # key -> subtree, or None to keep the whole value
+        self.tree: Dict[str, Optional[dict]] = {}
+        for path in self.fields:
+            node = self.tree
+            keys = path.split(".")
+            for key in keys[:-1]:
+                child = node.get(key, {})
+                if child is None:
+                    # The whole value is already kept
+                    break
+                node = node.setdefault(key, child)
+            else:
+                node[keys[-1]] = None
+
+    def __contains__(self, path: str) -> bool:
+        """True if the path is kept, by itself or as part of a kept value."""
+        node: Optional[dict] = self.tree
+        for key in path.split("."):
+            if node is None:
+                return True
+            if key not in node:
+                return False
+            node = node[key]
+        return True
+
+    @classmethod
+    def of(cls, fields: Optional[Iterable[str]]) -> Optional["Projection"]:
+        """:return: The projection of the fields, None to keep everything, or the projection itself."""
+        if fields is None or isinstance(fields, Projection):
+            return fields
+        return cls(fields)
+
+    def apply(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the projected copy of an item. The item itself is not changed.
+
+        :param item: A raw item dict.
+        :return: A new dict with only the projected fields that the item has.
+        """
+        return self._apply(self.tree, item)
+
+    def _apply(self, tree: Dict[str, Optional[dict]], value: Dict[str, Any]) -> Dict[str, Any]:
+        result = {}
+        for key, subtree in tree.items():
+            if key not in value:
+                continue
+            nested = value[key]
+            if subtree is None:
+                result[key] = nested
+            elif isinstance(nested, dict):
+                result[key] = self._apply(subtree, nested)
+            elif isinstance(nested, list):
+                result[key] = [self._apply(subtree, entry) if isinstance(entry, dict) else entry for entry in nested]
+            else:
+                result[key] = nested
+        return result
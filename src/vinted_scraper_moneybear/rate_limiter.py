@@ -0,0 +1,155 @@
+import threading
+import time
+import logging
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Status codes that mean we are sending too many requests
+THROTTLED_STATUS_CODES = (403, 429)
+
+
+class _Bucket:
+    """The token bucket state of a single (domain, proxy) pair."""
+    __slots__ = ("rate", "tokens", "updated", "last_decrease")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.tokens = burst
+        self.updated = now
+        self.last_decrease = 0.0
+
+
+class RateLimiter:
+    def __init__(self, rate: float = 5.0, burst: float = 10.0, min_rate: float = 0.5, max_rate: float = 50.0,
+                 increase: float = 0.1, decrease: float = 0.5, decrease_cooldown: float = 1.0,
+                 idle_timeout: float = 900.0):
+        """
+        Initialize the RateLimiter, a token bucket per (domain, proxy) that adapts its rate AIMD-style.
+
+        Every throttled response (403/429) multiplies the rate by `decrease`, every successful response
+        adds `increase` to it, so the sustained rate settles just under the ban threshold.
+
+        :param rate: Starting number of requests per second of every bucket.
+        :param burst: Maximum number of requests that can be sent at once after an idle period.
+        :param min_rate: The rate never goes below this number of requests per second.
+        :param max_rate: The rate never goes above this number of requests per second.
+        :param increase: Requests per second added to the rate after a successful response.
+        :param decrease: Factor the rate is multiplied by after a throttled response.
+        :param decrease_cooldown: Seconds after a decrease in which further throttled responses are ignored,
+            so a single burst of bans does not collapse the rate.
+        :param idle_timeout: Seconds a bucket may stay unused before it is dropped, so rotating proxies don't
+            grow the buckets without bound. A dropped bucket starts over from `rate`.
+        """
+        self.initial_rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.decrease_cooldown = decrease_cooldown
+        self.idle_timeout = idle_timeout
+        self._buckets: Dict[Tuple, _Bucket] = {}
+        self._lock = threading.Lock()
+        self._evicted_at = time.monotonic()
+
+    @staticmethod
+    def key(url: str, proxies: Optional[Dict[str, str]] = None) -> Tuple:
+        """
+        Build the bucket key of a request.
+
+        :param url: Any URL of the domain the request is sent to.
+        :param proxies: The proxy configuration the request is sent through.
+        :return: A hashable (domain, proxy) key.
+        """
+        return urlparse(url).netloc or url, tuple(sorted(proxies.items())) if proxies else ()
+
+    def _bucket(self, key: Tuple, now: float) -> _Bucket:
+        """Get the bucket of the key, refilled up to now. Must hold the lock."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            # Sweep the idle buckets at most once per idle_timeout, when a new one is needed
+            if now - self._evicted_at > self.idle_timeout:
+                self._evict_idle(now)
+            bucket = self._buckets[key] = _Bucket(self.initial_rate, self.burst, now)
+        else:
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+            bucket.updated = now
+        return bucket
+
+    def _evict_idle(self, now: float) -> int:
+        """Drop the buckets idle for longer than idle_timeout. Must hold the lock."""
+        expired = [key for key, bucket in self._buckets.items() if now - bucket.updated > self.idle_timeout]
+        for key in expired:
+            del self._buckets[key]
+        self._evicted_at = now
+        return len(expired)
+
+    def evict_idle(self) -> int:
+        """
+        Drop the buckets that have been idle for longer than idle_timeout.
+
+        :return: The number of dropped buckets.
+        """
+        with self._lock:
+            return self._evict_idle(time.monotonic())
+
+    def reserve(self, key: Tuple) -> float:
+        """
+        Take a token from the bucket of the key, without blocking.
+
+        :param key: The bucket key, see RateLimiter.key.
+        :return: The number of seconds to wait before sending the request.
+        """
+        with self._lock:
+            bucket = self._bucket(key, time.monotonic())
+            bucket.tokens -= 1
+            return 0.0 if bucket.tokens >= 0 else -bucket.tokens / bucket.rate
+
+    def acquire(self, key: Tuple) -> None:
+        """
+        Block until the request is allowed to be sent.
+
+        :param key: The bucket key, see RateLimiter.key.
+        """
+        delay = self.reserve(key)
+        if delay > 0:
+            time.sleep(delay)
+
+    def record(self, key: Tuple, status_code: int) -> None:
+        """
+        Adapt the rate of the key to the status code of a response.
+
+        :param key: The bucket key, see RateLimiter.key.
+        :param status_code: The status code of the response.
+        """
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._bucket(key, now)
+            if status_code in THROTTLED_STATUS_CODES:
+                if now - bucket.last_decrease < self.decrease_cooldown:
+                    return
+                bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+                bucket.last_decrease = now
+                logger.warning(f'Throttled by {key[0]}. Lowering the rate to {bucket.rate:.2f} requests per second')
+            elif 200 <= status_code < 300:
+                bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+
+    def rate(self, key: Tuple) -> float:
+        """
+        :param key: The bucket key, see RateLimiter.key.
+        :return: The current number of requests per second allowed for the key.
+        """
+        with self._lock:
+            bucket = self._buckets.get(key)
+            return bucket.rate if bucket else self.initial_rate
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# Shared by all the wrappers and threads in the process
+default_rate_limiter = RateLimiter()
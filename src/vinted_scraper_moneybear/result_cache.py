@@ -0,0 +1,402 @@
+import functools
+import json
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from .models.codec import msgpack, pack, unpack
+from .models.decoder import loads
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Returned by `get` for a missing key, None being a valid cached value
+MISSING = object()
+# Shared by every process of the host using it, VINTED_SCRAPER_CACHE_PATH replaces it when set
+DEFAULT_PATH = os.path.join(tempfile.gettempdir(), "vinted_scraper_cache.sqlite3")
+
+
+def sizeof(value: Any) -> int:
+    """
+    Estimate the memory held by a value, in bytes, with its nested lists, tuples, sets and dicts.
+
+    :param value: The value.
+    :return: The estimated size.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(sizeof(key) + sizeof(entry) for key, entry in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(sizeof(entry) for entry in value)
+    return size
+
+
+class ResultCache:
+    def __init__(self, max_bytes: int, ttl: float, name: str = "cache",
+                 sizeof: Callable[[Any], int] = sizeof):
+        """
+        Initialize the ResultCache, a thread-safe LRU cache whose size is bounded in bytes.
+
+        Entries expire `ttl` seconds after they are set. Once the entries take more than `max_bytes`, the
+        least recently used ones are evicted, so a few large results can't push out many small ones
+        without the budget saying so. An entry larger than the whole budget is not stored.
+
+        :param max_bytes: The byte budget of the entries, keys included.
+        :param ttl: Seconds an entry stays valid.
+        :param name: The name of the cache in the logs and the stats.
+        :param sizeof: Estimates the size of a key or value in bytes.
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.name = name
+        self.sizeof = sizeof
+        # key -> (value, expiry, size), least recently used first
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, int]]" = OrderedDict()
+        self._size = 0
+        # key -> expiry of the claim, see `claim`
+        self._claims: Dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """
+        :param key: The key of the entry.
+        :param default: Returned when there is no valid entry.
+        :return: The cached value, or the default.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                self._remove(key)
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, replacing the entry of the key if there is one.
+
+        :param key: The key of the entry.
+        :param value: The value to cache.
+        """
+        size = self.sizeof(key) + self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                logger.warning(f'Not caching an entry of {size} bytes in {self.name}, its budget is {self.max_bytes}')
+                return
+            self._entries[key] = (value, time.monotonic() + self.ttl, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        """Remove an entry. Must hold the lock."""
+        self._size -= self._entries.pop(key)[2]
+
+    def claim(self, key: Hashable, seconds: float) -> bool:
+        """
+        Claim a key for `seconds`, or until it is released, like the refresh of a stale entry.
+
+        :param key: The key to claim.
+        :param seconds: Seconds after which the claim expires, if it was not released.
+        :return: True if the caller got the claim, False if someone else holds it.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._claims.get(key, 0.0) > now:
+                return False
+            self._claims = {claimed: expiry for claimed, expiry in self._claims.items() if expiry > now}
+            self._claims[key] = now + seconds
+            return True
+
+    def release(self, key: Hashable) -> None:
+        """Release the claim of a key, see `claim`."""
+        with self._lock:
+            self._claims.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove every entry. The stats are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """:return: The number and bytes of the entries, and the hits, misses, evictions and expirations."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    def __init__(self, max_bytes: int, ttl: float, name: str = "cache", path: Optional[str] = None):
+        """
+        Initialize the SQLiteCache, a cache shared by every process using the same database file, like the
+        workers of a gunicorn deployment, and kept across restarts. It has the interface of ResultCache.
+
+        Entries are stored serialized, with the binary codec of the models when msgpack is installed and
+        as JSON otherwise, so values must be plain JSON data, or models with msgpack. Each cache is a
+        namespace of the database, with its own byte budget. Once over the budget, the entries closest to
+        their expiry are evicted first, which spares reads from writing to the database.
+
+        :param max_bytes: The byte budget of the serialized entries of this cache.
+        :param ttl: Seconds an entry stays valid.
+        :param name: The namespace of the cache in the database, and its name in the logs and the stats.
+        :param path: The database file, created if needed. Defaults to VINTED_SCRAPER_CACHE_PATH if it is
+            set, or DEFAULT_PATH.
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.name = name
+        self.path = path or os.environ.get("VINTED_SCRAPER_CACHE_PATH") or DEFAULT_PATH
+        self._local = threading.local()
+        # Counted by this process only
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries (namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, "
+                "expires REAL NOT NULL, size INTEGER NOT NULL, PRIMARY KEY (namespace, key))")
+            connection.execute("CREATE INDEX IF NOT EXISTS entries_expires ON entries (namespace, expires)")
+            connection.execute("CREATE TABLE IF NOT EXISTS claims (namespace TEXT NOT NULL, key TEXT NOT NULL, "
+                               "expires REAL NOT NULL, PRIMARY KEY (namespace, key))")
+
+    def _connect(self) -> sqlite3.Connection:
+        """:return: The connection of the current thread, opened on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10.0)
+            # Readers don't block the writer and the other way around
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def _dumps(value: Any) -> bytes:
+        # The first byte tells the format, the database may be shared with a process without msgpack
+        if msgpack is not None:
+            return b"m" + pack(value)
+        return b"j" + json.dumps(value, separators=(",", ":")).encode()
+
+    @staticmethod
+    def _loads(data: bytes) -> Any:
+        if data[:1] == b"m":
+            return unpack(memoryview(data)[1:])
+        return loads(data[1:])
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """
+        :param key: The key of the entry. Keys are compared by their repr.
+        :param default: Returned when there is no valid entry.
+        :return: The cached value, or the default.
+        """
+        try:
+            row = self._connect().execute(
+                "SELECT value FROM entries WHERE namespace = ? AND key = ? AND expires > ?",
+                (self.name, repr(key), time.time())).fetchone()
+            value = self._loads(row[0]) if row is not None else MISSING
+        except Exception as e:
+            logger.warning(f'Could not read {self.name} from {self.path}: {e}')
+            value = MISSING
+        if value is MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, replacing the entry of the key if there is one.
+
+        :param key: The key of the entry. Keys are compared by their repr.
+        :param value: The value to cache.
+        """
+        try:
+            data = self._dumps(value)
+        except (TypeError, ValueError) as e:
+            logger.warning(f'Could not serialize an entry of {self.name}: {e}')
+            return
+        if len(data) > self.max_bytes:
+            logger.warning(f'Not caching an entry of {len(data)} bytes in {self.name}, its budget is {self.max_bytes}')
+            return
+        now = time.time()
+        try:
+            with self._connect() as connection:
+                connection.execute("DELETE FROM entries WHERE namespace = ? AND expires <= ?", (self.name, now))
+                connection.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                                   (self.name, repr(key), data, now + self.ttl, len(data)))
+                excess = connection.execute("SELECT SUM(size) FROM entries WHERE namespace = ?",
+                                            (self.name,)).fetchone()[0] - self.max_bytes
+                if excess > 0:
+                    self._evict(connection, excess)
+        except sqlite3.Error as e:
+            logger.warning(f'Could not write {self.name} to {self.path}: {e}')
+
+    def _evict(self, connection: sqlite3.Connection, excess: int) -> None:
+        """Remove the entries closest to their expiry until `excess` bytes are freed."""
+        rows = connection.execute("SELECT key, size FROM entries WHERE namespace = ? ORDER BY expires",
+                                  (self.name,))
+        keys = []
+        for key, size in rows:
+            if excess <= 0:
+                break
+            keys.append((self.name, key))
+            excess -= size
+        connection.executemany("DELETE FROM entries WHERE namespace = ? AND key = ?", keys)
+        self.evictions += len(keys)
+
+    def claim(self, key: Hashable, seconds: float) -> bool:
+        """
+        Claim a key for `seconds`, or until it is released, for every process using the database. Only one
+        of the workers sharing the cache refreshes a stale entry this way.
+
+        :param key: The key to claim. Keys are compared by their repr.
+        :param seconds: Seconds after which the claim expires, if it was not released, like after a crash.
+        :return: True if the caller got the claim, False if another thread or process holds it.
+        """
+        now = time.time()
+        try:
+            with self._connect() as connection:
+                connection.execute("DELETE FROM claims WHERE namespace = ? AND expires <= ?", (self.name, now))
+                return connection.execute("INSERT OR IGNORE INTO claims VALUES (?, ?, ?)",
+                                          (self.name, repr(key), now + seconds)).rowcount == 1
+        except sqlite3.Error as e:
+            # Better a refresh per process than none
+            logger.warning(f'Could not claim an entry of {self.name} in {self.path}: {e}')
+            return True
+
+    def release(self, key: Hashable) -> None:
+        """Release the claim of a key, see `claim`."""
+        try:
+            with self._connect() as connection:
+                connection.execute("DELETE FROM claims WHERE namespace = ? AND key = ?", (self.name, repr(key)))
+        except sqlite3.Error as e:
+            logger.warning(f'Could not release an entry of {self.name} in {self.path}: {e}')
+
+    def clear(self) -> None:
+        """Remove every entry of this cache, for every process. The stats are kept."""
+        with self._connect() as connection:
+            connection.execute("DELETE FROM entries WHERE namespace = ?", (self.name,))
+            connection.execute("DELETE FROM claims WHERE namespace = ?", (self.name,))
+
+    def stats(self) -> Dict[str, Any]:
+        """:return: The number and bytes of the entries, and the hits, misses and evictions of this process."""
+        entries, size = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries WHERE namespace = ? AND expires > ?",
+            (self.name, time.time())).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def __len__(self) -> int:
+        return self.stats()["entries"]
+
+
+def memoize(cache: ResultCache, key: Optional[Callable[..., Hashable]] = None, stale_after: Optional[float] = None,
+            cache_if: Optional[Callable[[Any], bool]] = None) -> Callable:
+    """
+    Cache the results of a function, like `@memoize(ResultCache(max_bytes=1 << 20, ttl=300, name="search"))`.
+
+    Give every function its own cache, so their entries only compete with each other. The cache is
+    the `cache` attribute of the decorated function, which can be replaced, in the tests for example.
+
+    With `stale_after`, a result older than `stale_after` seconds is still returned right away, and a single
+    background call per key refreshes it: the refresh claims the key in the cache, so with a shared
+    SQLiteCache a single worker of the node refreshes it. The claim expires after `stale_after` seconds if
+    the refresh never ends. The ttl of the cache is then the hard bound on the staleness: past it, the
+    caller waits for a new result, like without `stale_after`.
+
+    :param cache: The cache of the function, a ResultCache or a shared SQLiteCache.
+    :param key: Builds the key of a call from its arguments. Defaults to the arguments themselves.
+    :param stale_after: Seconds after which a result is refreshed in the background. Defaults to never.
+    :param cache_if: Only the results it returns True for are cached, so an error doesn't replace a good
+        result. Defaults to every result.
+    :return: The decorator.
+    """
+    def decorator(function: Callable) -> Callable:
+        # The keys being refreshed in the background, by this process
+        refreshing: Set[Hashable] = set()
+        lock = threading.Lock()
+
+        def call(call_key: Hashable, args: Tuple, kwargs: Dict[str, Any]) -> Any:
+            value = function(*args, **kwargs)
+            if cache_if is None or cache_if(value):
+                # With stale_after, the entries keep the time they were stored at, shared by the processes
+                wrapper.cache.set(call_key, value if stale_after is None else [time.time(), value])
+            return value
+
+        def refresh(call_key: Hashable, args: Tuple, kwargs: Dict[str, Any]) -> None:
+            try:
+                call(call_key, args, kwargs)
+                wrapper.refreshes += 1
+            except Exception as e:
+                logger.warning(f'Could not refresh an entry of {wrapper.cache.name}, the stale one is kept: {e}')
+            finally:
+                wrapper.cache.release(call_key)
+                with lock:
+                    refreshing.discard(call_key)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            call_key = key(*args, **kwargs) if key is not None else (args, tuple(sorted(kwargs.items())))
+            entry = wrapper.cache.get(call_key)
+            if entry is MISSING:
+                return call(call_key, args, kwargs)
+            if stale_after is None:
+                return entry
+            stored_at, value = entry
+            if time.time() - stored_at > stale_after:
+                wrapper.stale_hits += 1
+                with lock:
+                    start = call_key not in refreshing
+                    refreshing.add(call_key)
+                if start:
+                    # Another worker sharing the cache may be refreshing it already
+                    if wrapper.cache.claim(call_key, stale_after):
+                        threading.Thread(target=refresh, args=(call_key, args, kwargs), daemon=True).start()
+                    else:
+                        with lock:
+                            refreshing.discard(call_key)
+            return value
+
+        wrapper.cache = cache
+        wrapper.stale_hits = 0
+        wrapper.refreshes = 0
+        return wrapper
+    return decorator
@@ -0,0 +1,335 @@
+import random
+import threading
+import time
+import logging
+from email.utils import parsedate_to_datetime
+from typing import Dict, Hashable, Iterable, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header, which is either a number of seconds or an HTTP date.
+
+    :param value: The value of the header.
+    :return: The number of seconds to wait, or None if the header is missing or not valid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        logger.warning(f'Invalid Retry-After header: {value}. Ignoring it')
+        return None
+
+
+def breaker_keys(url: str, proxies: Optional[Dict[str, str]] = None) -> Tuple[Hashable, Optional[Hashable]]:
+    """
+    Build the circuit breaker keys of a request.
+
+    :param url: Any URL of the domain the request is sent to.
+    :param proxies: The proxy configuration the request is sent through.
+    :return: The key of the domain and the key of the proxy (None without proxy).
+    """
+    return urlparse(url).netloc or url, tuple(sorted(proxies.items())) if proxies else None
+
+
+class RetryBudget:
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, max_tokens: float = 50.0):
+        """
+        Initialize the RetryBudget, which limits the retries to a share of the requests of the whole process.
+
+        Every first attempt deposits `ratio` tokens and every retry withdraws one, so during an incident
+        the retries can't multiply the upstream load. `min_per_second` tokens are always added over time,
+        so a low traffic process can still retry.
+
+        :param ratio: Number of retries allowed per request.
+        :param min_per_second: Number of retries allowed per second, regardless of the traffic.
+        :param max_tokens: Maximum number of retries that can be saved up.
+        """
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, amount: float = 0.0) -> None:
+        """Add the time based tokens and the given amount. Must hold the lock."""
+        now = time.monotonic()
+        self._tokens = min(self.max_tokens, self._tokens + (now - self._updated) * self.min_per_second + amount)
+        self._updated = now
+
+    def record_request(self) -> None:
+        """Deposit the tokens of a first attempt."""
+        with self._lock:
+            self._refill(self.ratio)
+
+    def try_retry(self) -> bool:
+        """
+        Withdraw a token for a retry.
+
+        :return: True if the retry is allowed.
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialize the CircuitBreaker of a single proxy or domain.
+
+        After `failure_threshold` failures in a row the breaker opens and requests are refused.
+        After `reset_timeout` seconds a single trial request is let through and every other one is refused
+        until it resolves: its success closes the breaker, its failure opens it again. A trial that never
+        resolves is given up after another `reset_timeout` seconds, and a new one is let through.
+
+        :param failure_threshold: Number of consecutive failures that opens the breaker.
+        :param reset_timeout: Seconds the breaker stays open before a trial request is allowed.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self.state = self.CLOSED
+        self.trial_in_flight = False
+        self.trial_started_at = 0.0
+        self._lock = threading.Lock()
+
+    def _trial_available(self, now: float) -> bool:
+        """:return: True if a trial request may start. Must hold the lock."""
+        if self.state == self.OPEN:
+            return now - self.opened_at >= self.reset_timeout
+        return not self.trial_in_flight or now - self.trial_started_at >= self.reset_timeout
+
+    def available(self) -> bool:
+        """
+        Check the breaker without starting a trial, for example to pick a proxy.
+
+        :return: True if a request would be allowed.
+        """
+        with self._lock:
+            return self.state == self.CLOSED or self._trial_available(time.monotonic())
+
+    def allow(self) -> bool:
+        """
+        :return: True if a request may be sent. Once the breaker is no longer closed, the caller that gets
+            True owns the trial request and must record its success or failure.
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            now = time.monotonic()
+            if not self._trial_available(now):
+                return False
+            self.state = self.HALF_OPEN
+            self.trial_in_flight = True
+            self.trial_started_at = now
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.state = self.CLOSED
+            self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f'Circuit breaker opened after {self.failures} failures')
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class RetryEngine:
+    def __init__(self, max_retries: int = 3, base_delay: float = 0.2, max_delay: float = 10.0,
+                 max_retry_after: float = 60.0, budget: Optional[RetryBudget] = None,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialize the RetryEngine, the retry and back off policy shared by every client.
+
+        The delay between attempts uses decorrelated jitter, unless the response asked for a longer one
+        with a Retry-After header. Retries are limited by a process-wide RetryBudget, and every proxy
+        and domain gets its own CircuitBreaker.
+
+        :param max_retries: Maximum number of attempts of a single request.
+        :param base_delay: Minimum delay in seconds between two attempts.
+        :param max_delay: Maximum delay in seconds of the jittered back off.
+        :param max_retry_after: Maximum delay in seconds honoured from a Retry-After header.
+        :param budget: The retry budget. Defaults to a new RetryBudget.
+        :param failure_threshold: Number of consecutive failures that opens a circuit breaker.
+        :param reset_timeout: Seconds a circuit breaker stays open before a trial request is allowed.
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.budget = budget or RetryBudget()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[Hashable, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, key: Hashable) -> CircuitBreaker:
+        """
+        :param key: A proxy or domain key, see breaker_keys.
+        :return: The circuit breaker of the key.
+        """
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = self._breakers[key] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def allows(self, key: Hashable) -> bool:
+        """
+        :param key: A proxy or domain key.
+        :return: True if the circuit breaker of the key would let a request through. Doesn't start a trial.
+        """
+        return self.breaker(key).available()
+
+    def begin(self, keys: Iterable[Hashable], max_retries: Optional[int] = None) -> "RetryState":
+        """
+        Start the attempts of a request.
+
+        :param keys: The circuit breaker keys of the request, usually the ones of breaker_keys.
+            The request is refused while the breaker of any of them is open. None keys are ignored.
+        :param max_retries: Maximum number of attempts. Defaults to the one of the engine.
+        :return: The RetryState driving the attempts.
+        """
+        return RetryState(self, keys, self.max_retries if max_retries is None else max_retries)
+
+    def backoff(self, previous_delay: float) -> float:
+        """
+        Compute the next delay with decorrelated jitter.
+
+        :param previous_delay: The previous delay, or 0 before the first retry.
+        :return: The delay in seconds.
+        """
+        return min(self.max_delay, random.uniform(self.base_delay, max(self.base_delay, previous_delay) * 3))
+
+
+class RetryState:
+    def __init__(self, engine: RetryEngine, keys: Iterable[Hashable], max_retries: int):
+        """
+        The attempts of a single request. Use it like:
+
+            retry = engine.begin(keys)
+            while retry.next_attempt():
+                ...send the request...
+                retry.success() or retry.failure(retry_after=...)
+
+        :param engine: The RetryEngine of the request.
+        :param keys: The circuit breaker keys of the request.
+        :param max_retries: Maximum number of attempts.
+        """
+        self.engine = engine
+        self.keys = [key for key in keys if key is not None]
+        self.max_retries = max_retries
+        self.attempt = -1
+        self.delay = 0.0
+        self._retry_after: Optional[float] = None
+        # Keys whose trial request is owned by this request
+        self._trials: Set[Hashable] = set()
+
+    @property
+    def last_attempt(self) -> bool:
+        """True during the last allowed attempt."""
+        return self.attempt >= self.max_retries - 1
+
+    def set_keys(self, keys: Iterable[Hashable]) -> None:
+        """Replace the circuit breaker keys, for example after rotating the proxy."""
+        self.keys = [key for key in keys if key is not None]
+
+    def next_delay(self) -> Optional[float]:
+        """
+        Move to the next attempt without sleeping.
+
+        :return: The seconds to wait before the attempt, or None if no attempt is left, the retry budget is
+            spent or a circuit breaker is open.
+        """
+        self.attempt += 1
+        if self.attempt >= self.max_retries:
+            return None
+
+        if self.attempt == 0:
+            self.engine.budget.record_request()
+            delay = 0.0
+        elif not self.engine.budget.try_retry():
+            logger.warning('Retry budget exhausted. Giving up')
+            return None
+        else:
+            self.delay = self.engine.backoff(self.delay)
+            delay = self.delay
+            if self._retry_after is not None:
+                delay = max(delay, min(self._retry_after, self.engine.max_retry_after))
+
+        for key in self.keys:
+            breaker = self.engine.breaker(key)
+            if key in self._trials and breaker.state == CircuitBreaker.HALF_OPEN:
+                # The trial of this request is still unresolved, it may go on
+                continue
+            if not breaker.allow():
+                logger.warning(f'Circuit breaker of {key} is open. Giving up')
+                return None
+            if breaker.state == CircuitBreaker.HALF_OPEN:
+                self._trials.add(key)
+        return delay
+
+    def next_attempt(self) -> bool:
+        """
+        Sleep until the next attempt.
+
+        :return: False if no attempt is left.
+        """
+        delay = self.next_delay()
+        if delay is None:
+            return False
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+    def stop(self) -> None:
+        """Make no other attempt, for example when the response is final."""
+        self.attempt = self.max_retries
+
+    def success(self) -> None:
+        """Record a successful attempt."""
+        for key in self.keys:
+            self.engine.breaker(key).record_success()
+
+    def failure(self, retry_after: Optional[str] = None, keys: Optional[Iterable[Hashable]] = None) -> None:
+        """
+        Record a failed attempt.
+
+        :param retry_after: The Retry-After header of the response, if any.
+        :param keys: The circuit breaker keys to blame. Defaults to all the keys of the request.
+        """
+        self._retry_after = parse_retry_after(retry_after)
+        for key in self.keys if keys is None else keys:
+            if key is not None:
+                self.engine.breaker(key).record_failure()
+
+
+# Shared by all the wrappers and threads in the process
+default_retry_engine = RetryEngine()
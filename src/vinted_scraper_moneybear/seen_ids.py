@@ -0,0 +1,49 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class SeenIds:
+    def __init__(self, max_size: int = 100_000):
+        """
+        Initialize SeenIds, a memory-bounded set of the item ids a watcher has already emitted.
+
+        Ids are stored as ints when possible. Once `max_size` ids are stored, the least recently seen ones
+        are forgotten, so the memory stays bounded however long the watcher runs.
+
+        :param max_size: Maximum number of ids to remember.
+        """
+        self.max_size = max_size
+        self._ids: "OrderedDict[Hashable, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(item_id: Any) -> Hashable:
+        """Store numeric ids as ints, which are smaller than their strings."""
+        try:
+            return int(item_id)
+        except (TypeError, ValueError):
+            return item_id
+
+    def add(self, item_id: Any) -> bool:
+        """
+        Remember an id.
+
+        :param item_id: The id of an item.
+        :return: True if the id was not seen before.
+        """
+        key = self._key(item_id)
+        with self._lock:
+            if key in self._ids:
+                self._ids.move_to_end(key)
+                return False
+            self._ids[key] = None
+            if len(self._ids) > self.max_size:
+                self._ids.popitem(last=False)
+            return True
+
+    def __contains__(self, item_id: Any) -> bool:
+        return self._key(item_id) in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
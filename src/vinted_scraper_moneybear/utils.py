@@ -2,14 +2,124 @@ import json
 import os
 import random
 import requests
+import threading
 import time
 import logging
-from typing import List, Dict
+from collections import OrderedDict
+from http.cookiejar import DefaultCookiePolicy
+from typing import List, Dict, Optional, Tuple
+
+from requests.adapters import HTTPAdapter
+
+from .rate_limiter import RateLimiter, default_rate_limiter
+from .retry import RetryEngine, RetryState, breaker_keys, default_retry_engine
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Status codes caused by the proxy rather than by Vinted
+PROXY_ERROR_STATUS_CODES = (407, 502, 504)
+
+def log(use_logger: bool, level: str, message: str) -> None:
+    """
+    Log a message if logging is enabled, used by the Flask API.
+
+    :param use_logger: Whether to log the message at all.
+    :param level: The name of the logging level, like 'info' or 'warning'.
+    :param message: The message to log.
+    """
+    if use_logger:
+        getattr(logger, level)(message)
+
+class SessionManager:
+    def __init__(self, max_sessions: int = 32, pool_maxsize: int = 10, idle_timeout: float = 300.0):
+        """
+        Initialize the SessionManager, a pool of keep-alive HTTP sessions.
+
+        Sessions are keyed by (baseurl, proxy), so every request to the same site through the same
+        proxy reuses the already open TCP+TLS connections instead of doing a new handshake.
+
+        :param max_sessions: Maximum number of sessions to keep. The least recently used one is closed first.
+        :param pool_maxsize: Maximum number of connections kept open per session.
+        :param idle_timeout: Seconds a session may stay unused before it is closed.
+        """
+        self.max_sessions = max_sessions
+        self.pool_maxsize = pool_maxsize
+        self.idle_timeout = idle_timeout
+        self._sessions: "OrderedDict[Tuple, Tuple[requests.Session, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(baseurl: str, proxies: Optional[Dict[str, str]]) -> Tuple:
+        """Build a hashable pool key from the base URL and the proxy configuration."""
+        return baseurl, tuple(sorted(proxies.items())) if proxies else ()
+
+    def _new_session(self) -> requests.Session:
+        """
+        Create a session with a sized connection pool.
+
+        The cookie jar is disabled because sessions are shared between wrappers. The session cookie
+        is always sent explicitly through the headers.
+        """
+        session = requests.Session()
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def get_session(self, baseurl: str, proxies: Optional[Dict[str, str]] = None) -> requests.Session:
+        """
+        Get the pooled session for the given base URL and proxy, creating it when needed.
+
+        :param baseurl: The base URL the session will be used for.
+        :param proxies: The proxy configuration the session will be used with.
+        :return: A keep-alive requests.Session.
+        """
+        key = self._key(baseurl, proxies)
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            if key in self._sessions:
+                session = self._sessions.pop(key)[0]
+            else:
+                session = self._new_session()
+                while len(self._sessions) >= self.max_sessions:
+                    self._sessions.popitem(last=False)[1][0].close()
+            self._sessions[key] = (session, now)
+            return session
+
+    def _evict_idle(self, now: float) -> int:
+        """Close the sessions that have been idle for longer than idle_timeout. Must hold the lock."""
+        expired = [key for key, (_, last_used) in self._sessions.items() if now - last_used > self.idle_timeout]
+        for key in expired:
+            self._sessions.pop(key)[0].close()
+        if expired:
+            logger.info(f'Closed {len(expired)} idle sessions')
+        return len(expired)
+
+    def evict_idle(self) -> int:
+        """
+        Close the sessions that have been idle for longer than idle_timeout.
+
+        :return: The number of closed sessions.
+        """
+        with self._lock:
+            return self._evict_idle(time.monotonic())
+
+    def close(self) -> None:
+        """Close all the pooled sessions."""
+        with self._lock:
+            while self._sessions:
+                self._sessions.popitem()[1][0].close()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+# Shared by all the wrappers and cookie managers in the process
+default_session_manager = SessionManager()
+
 class UserAgentManager:
     def __init__(self, agents_file: str = "agents.json"):
         """
@@ -65,15 +175,48 @@ class UserAgentManager:
         logger.info(f'Succesfully loaded user agent, {chosen_user_agent}')
         return chosen_user_agent
 
+class ProxyHealth:
+    """The health statistics of a single proxy."""
+    __slots__ = ("successes", "failures", "consecutive_failures", "latency", "quarantined_until")
+
+    def __init__(self):
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.latency: Optional[float] = None
+        self.quarantined_until = 0.0
+
+    @property
+    def success_rate(self) -> float:
+        """The success rate, smoothed so that a new proxy starts at 50%."""
+        return (self.successes + 1) / (self.successes + self.failures + 2)
+
 class ProxyManager:
-    def __init__(self, proxies_file: str = "proxies.json"):
+    def __init__(self, proxies_file: str = "proxies.json", latency_alpha: float = 0.3, failure_threshold: int = 3,
+                 quarantine_seconds: float = 60.0, max_quarantine_seconds: float = 900.0):
         """
         Initialize the ProxyManager and load proxies from the specified file.
+
+        Every proxy gets a health score from its success rate and EWMA latency, and proxies are picked
+        weighted by that score. A proxy that fails `failure_threshold` times in a row is quarantined,
+        for twice as long every time it fails again after the quarantine.
         
         :param proxies_file: Path to the JSON file containing proxy configurations.
+        :param latency_alpha: Weight of the newest latency in the EWMA latency.
+        :param failure_threshold: Number of consecutive failures that quarantines a proxy.
+        :param quarantine_seconds: Seconds a proxy is quarantined the first time.
+        :param max_quarantine_seconds: Maximum number of seconds a proxy is quarantined.
         """
         self.proxies_source = os.path.join(os.path.dirname(__file__), proxies_file)
         self.proxies = self._load_proxies()
+        self.latency_alpha = latency_alpha
+        self.failure_threshold = failure_threshold
+        self.quarantine_seconds = quarantine_seconds
+        self.max_quarantine_seconds = max_quarantine_seconds
+        self._health: Dict[Tuple, ProxyHealth] = {}
+        self._lock = threading.Lock()
+        self._prober: Optional[threading.Thread] = None
+        self._stop_prober = threading.Event()
 
     def _load_proxies(self) -> List[Dict[str, str]]:
         """
@@ -106,36 +249,327 @@ class ProxyManager:
             logger.error(f"Error loading proxies: {e}. Returning None")
             return None
 
+    @staticmethod
+    def _key(proxy: Dict[str, str]) -> Tuple:
+        """Build a hashable key from a proxy configuration."""
+        return tuple(sorted(proxy.items()))
+
+    def _get_health(self, proxy: Dict[str, str]) -> ProxyHealth:
+        """Get the health statistics of a proxy. Must hold the lock."""
+        key = self._key(proxy)
+        health = self._health.get(key)
+        if health is None:
+            health = self._health[key] = ProxyHealth()
+        return health
+
+    def health(self, proxy: Dict[str, str]) -> ProxyHealth:
+        """
+        :param proxy: A proxy configuration.
+        :return: The health statistics of the proxy.
+        """
+        with self._lock:
+            return self._get_health(proxy)
+
+    def score(self, proxy: Dict[str, str]) -> float:
+        """
+        Score a proxy by its success rate divided by its EWMA latency. Higher is better.
+
+        :param proxy: A proxy configuration.
+        :return: The score, 0 while the proxy is quarantined.
+        """
+        with self._lock:
+            return self._score(self._get_health(proxy), time.monotonic())
+
+    @staticmethod
+    def _score(health: ProxyHealth, now: float) -> float:
+        if health.quarantined_until > now:
+            return 0.0
+        # Unknown latencies count as 1 second, latencies under 50 ms are not rewarded any further
+        return health.success_rate / max(0.05, health.latency if health.latency is not None else 1.0)
+
+    def record_success(self, proxy: Optional[Dict[str, str]], latency: float) -> None:
+        """
+        Record a request that went through the proxy.
+
+        :param proxy: The proxy configuration of the request.
+        :param latency: Seconds the request took.
+        """
+        if not proxy:
+            return
+        with self._lock:
+            health = self._get_health(proxy)
+            health.successes += 1
+            health.consecutive_failures = 0
+            health.quarantined_until = 0.0
+            health.latency = latency if health.latency is None else (
+                self.latency_alpha * latency + (1 - self.latency_alpha) * health.latency)
+
+    def record_failure(self, proxy: Optional[Dict[str, str]]) -> None:
+        """
+        Record a request that failed because of the proxy, quarantining it after repeated failures.
+
+        :param proxy: The proxy configuration of the request.
+        """
+        if not proxy:
+            return
+        with self._lock:
+            health = self._get_health(proxy)
+            health.failures += 1
+            health.consecutive_failures += 1
+            if health.consecutive_failures >= self.failure_threshold:
+                cooldown = min(self.max_quarantine_seconds,
+                               self.quarantine_seconds * 2 ** (health.consecutive_failures - self.failure_threshold))
+                health.quarantined_until = time.monotonic() + cooldown
+                logger.warning(f'Proxy {proxy} failed {health.consecutive_failures} times in a row. '
+                               f'Quarantined for {cooldown:.0f} seconds')
+
     def get_random_proxy(self) -> Dict[str, str]:
         """
-        Randomly select a proxy from the loaded list of proxies.
+        Select a proxy from the loaded list of proxies, weighted by their health score.
+
+        Quarantined proxies are skipped. If every proxy is quarantined, the one released first is used.
 
         :return: A dictionary with 'http' and 'https' proxy URLs.
         """
         if not self.proxies:
             logger.error("No proxies available to rotate. Will continue without proxy")
             return None
-        
-        proxy = random.choice(self.proxies)
+
+        with self._lock:
+            now = time.monotonic()
+            healths = [self._get_health(proxy) for proxy in self.proxies]
+            weights = [self._score(health, now) for health in healths]
+            if any(weights):
+                proxy = random.choices(self.proxies, weights=weights)[0]
+            else:
+                logger.warning('All the proxies are quarantined. Using the one released first')
+                proxy = min(zip(self.proxies, healths), key=lambda pair: pair[1].quarantined_until)[0]
+
         logger.info(f'Succesfully fetched proxy, {proxy}')
         return proxy
 
-class CookieManager:
-    def __init__(self, baseurl: str, user_agent: str, proxies: dict[str, str], cookie_prefix: str, retries: int = 3):
+    def probe(self, endpoint: str, timeout: float = 5.0, only_quarantined: bool = True) -> None:
+        """
+        Send a request to the endpoint through the proxies and record the outcome.
+
+        :param endpoint: The URL to request, for example "https://www.vinted.com".
+        :param timeout: Seconds before a probe counts as a failure.
+        :param only_quarantined: Only probe the quarantined proxies, to release the ones that recovered.
+        """
+        for proxy in self.proxies or []:
+            if only_quarantined and self.health(proxy).quarantined_until <= time.monotonic():
+                continue
+            start = time.monotonic()
+            try:
+                response = requests.get(endpoint, proxies=proxy, timeout=timeout)
+                if response.status_code in PROXY_ERROR_STATUS_CODES:
+                    self.record_failure(proxy)
+                else:
+                    self.record_success(proxy, time.monotonic() - start)
+            except requests.RequestException:
+                self.record_failure(proxy)
+
+    def start_prober(self, endpoint: str, interval: float = 60.0, timeout: float = 5.0,
+                     only_quarantined: bool = True) -> None:
+        """
+        Probe the proxies in a background thread every `interval` seconds.
+
+        :param endpoint: The URL to request, for example "https://www.vinted.com".
+        :param interval: Seconds between two probe rounds.
+        :param timeout: Seconds before a probe counts as a failure.
+        :param only_quarantined: Only probe the quarantined proxies.
+        """
+        if self._prober is not None and self._prober.is_alive():
+            return
+        self._stop_prober.clear()
+
+        def run():
+            while not self._stop_prober.wait(interval):
+                try:
+                    self.probe(endpoint, timeout, only_quarantined)
+                except Exception as e:
+                    logger.warning(f'Proxy probe failed: {e}')
+
+        self._prober = threading.Thread(target=run, name="proxy-prober", daemon=True)
+        self._prober.start()
+
+    def stop_prober(self) -> None:
+        """Stop the background prober."""
+        self._stop_prober.set()
+        if self._prober is not None:
+            self._prober.join()
+            self._prober = None
+
+class RotationMixin:
+    """
+    Status code handling shared by every client that talks to Vinted.
+
+    The class using it must set `user_agent_manager`, `proxy_manager` and `retry_engine`. The clients are
+    shared by threads, so the proxy and headers rotated during a request are kept by the request itself,
+    and the `user_agent` and `proxies` of the client are only the ones every request starts with.
+    """
+
+    def _begin_retry(self, url: str, proxies: Optional[Dict[str, str]],
+                     max_retries: Optional[int] = None) -> Tuple[RetryState, Optional[Dict[str, str]]]:
+        """
+        Start the attempts of a request, moving away from the proxy if its circuit breaker is open.
+
+        :param url: The URL of the request.
+        :param proxies: The proxy the request starts with.
+        :param max_retries: Maximum number of attempts.
+        :return: The RetryState driving the attempts, and the proxy of the first attempt.
+        """
+        proxy_key = breaker_keys(url, proxies)[1]
+        if proxy_key is not None and not self.retry_engine.allows(proxy_key):
+            logger.warning("The circuit breaker of the proxy is open. Fetching a new one")
+            proxies = self._next_proxy(url)
+        return self.retry_engine.begin(breaker_keys(url, proxies), max_retries), proxies
+
+    def _next_proxy(self, url: str, tries: int = 5) -> Optional[Dict[str, str]]:
+        """
+        Get a new proxy whose circuit breaker is not open.
+
+        :param url: The URL of the request.
+        :param tries: Number of proxies to try.
+        :return: A dictionary with 'http' and 'https' proxy URLs, or None.
+        """
+        for _ in range(tries):
+            proxy = self.proxy_manager.get_random_proxy()
+            proxy_key = breaker_keys(url, proxy)[1]
+            if proxy_key is None or self.retry_engine.allows(proxy_key):
+                return proxy
+        logger.warning('Could not find a proxy with a closed circuit breaker. Continuing without proxy')
+        return None
+
+    def _record_proxy(self, proxies: Optional[Dict[str, str]], status_code: int, latency: float) -> None:
+        """
+        Update the health of a proxy with the outcome of a request.
+
+        :param proxies: The proxy the request was sent through.
+        :param status_code: The status code of the response.
+        :param latency: Seconds the request took.
+        """
+        if status_code in PROXY_ERROR_STATUS_CODES:
+            self.proxy_manager.record_failure(proxies)
+        else:
+            self.proxy_manager.record_success(proxies, latency)
+
+    def _handle_status(self, status_code: int, headers: Dict[str, Optional[str]], retry: RetryState, url: str,
+                       proxies: Optional[Dict[str, str]],
+                       retry_after: Optional[str] = None) -> Tuple[Optional[Dict[str, str]], bool]:
+        """
+        Record a failed status code and rotate what caused it before the next attempt.
+
+        - 401: the session cookie expired, it has to be refreshed.
+        - 400: the user agent is not valid, a new one is used.
+        - 403/429: we are banned or throttled, a new user agent and proxy are used.
+        - 407/502/504: the proxy does not work, a new one is used.
+        - Other 5xx: Vinted failed, the request is retried.
+        - Other 4xx: the request itself is wrong, like a removed item. It is not retried.
+        On the last attempt the request is retried without the cookie, user agent or proxy instead.
+
+        Nothing is changed on the client: the new user agent goes in `headers` and the new proxy is returned.
+
+        :param status_code: The status code of the response.
+        :param headers: The headers of the request, updated in place.
+        :param retry: The RetryState of the request.
+        :param url: The URL of the request.
+        :param proxies: The proxy of the failed attempt.
+        :param retry_after: The Retry-After header of the response, if any.
+        :return: The proxy of the next attempt, and True if the session cookie must be refreshed before it.
+        """
+        domain_key, proxy_key = breaker_keys(url, proxies)
+        refresh_cookie = False
+
+        if status_code == 401:
+            retry.failure(retry_after, keys=[])
+            if retry.last_attempt:
+                logger.warning('Session cookie did not work. Trying without one on the last attempt')
+                headers['Cookie'] = None
+            else:
+                logger.warning("Session cookie expired. Fetching a new one.")
+                refresh_cookie = True
+        elif status_code == 400:
+            retry.failure(retry_after, keys=[])
+            if retry.last_attempt:
+                logger.warning('User agent did not work. Trying without one on the last attempt')
+                headers['User-Agent'] = None
+            else:
+                logger.warning("User agent not valid. Fetching a new one.")
+                headers['User-Agent'] = self.user_agent_manager.get_random_user_agent()
+        elif status_code in [403, 429]:
+            retry.failure(retry_after, keys=[domain_key])
+            if retry.last_attempt:
+                logger.warning(f'Status code = {status_code}. Trying without a user agent on the last attempt')
+                headers['User-Agent'] = None
+            else:
+                logger.warning(f"Status code = {status_code}. Trying with a new user agent and proxy.")
+                proxies = self._next_proxy(url)
+                headers['User-Agent'] = self.user_agent_manager.get_random_user_agent()
+        elif status_code in PROXY_ERROR_STATUS_CODES:
+            retry.failure(retry_after, keys=[proxy_key or domain_key])
+            if retry.last_attempt:
+                logger.warning('Proxy did not work. Trying without one on the last attempt')
+                proxies = None
+            else:
+                logger.warning(f"Proxy problem {status_code}. Fetching a new one")
+                proxies = self._next_proxy(url)
+        elif status_code >= 500:
+            retry.failure(retry_after, keys=[domain_key])
+            logger.warning(f"Error {status_code} occurred. Trying again")
+        else:
+            # Like a 404 on a removed item: retrying gets the same answer and Vinted itself is fine
+            logger.warning(f"Error {status_code} occurred. Not retrying")
+            retry.stop()
+
+        retry.set_keys(breaker_keys(url, proxies))
+        return proxies, refresh_cookie
+
+    def _handle_error(self, error: Exception, retry: RetryState, url: str,
+                      proxies: Optional[Dict[str, str]]) -> Optional[Dict[str, str]]:
+        """
+        Record a request that failed without a response, blaming the proxy if there is one.
+
+        :param error: The connection or request error.
+        :param retry: The RetryState of the request.
+        :param url: The URL of the request.
+        :param proxies: The proxy of the failed attempt.
+        :return: The proxy of the next attempt.
+        """
+        domain_key, proxy_key = breaker_keys(url, proxies)
+        logger.warning(f"Request error occurred: {error}. Trying again")
+        self.proxy_manager.record_failure(proxies)
+        retry.failure(keys=[proxy_key or domain_key])
+        if proxy_key is not None and not self.retry_engine.allows(proxy_key):
+            proxies = self._next_proxy(url)
+            retry.set_keys(breaker_keys(url, proxies))
+        return proxies
+
+class CookieManager(RotationMixin):
+    def __init__(self, baseurl: str, user_agent: str, proxies: dict[str, str], cookie_prefix: str, retries: int = 3,
+                 session_manager: Optional[SessionManager] = None, rate_limiter: Optional[RateLimiter] = None,
+                 retry_engine: Optional[RetryEngine] = None, proxy_manager: Optional[ProxyManager] = None):
         """
         Initialize the CookieManager with base URL and user agent.
         
         :param baseurl: The base URL to send the HTTP GET request to.
         :param user_agent: The User-Agent header to use in the request.
         :param retries: Number of retries for the HTTP request.
+        :param session_manager: Pool of keep-alive sessions. Defaults to the process-wide pool.
+        :param rate_limiter: Paces the requests per domain and proxy. Defaults to the process-wide limiter.
+        :param retry_engine: Back off, retry budget and circuit breakers. Defaults to the process-wide engine.
+        :param proxy_manager: Picks the proxies and tracks their health. Pass the one of the wrapper to share it.
         """
         self.baseurl = baseurl
         self.cookie_prefix = cookie_prefix
         self.user_agent_manager = UserAgentManager()
         self.user_agent = user_agent or self.user_agent_manager.get_random_user_agent()
-        self.proxy_manager = ProxyManager()
+        self.proxy_manager = proxy_manager or ProxyManager()
         self.proxies = proxies or self.proxy_manager.get_random_proxy()
         self.retries = retries
+        self.session_manager = session_manager or default_session_manager
+        self.rate_limiter = rate_limiter or default_rate_limiter
+        self.retry_engine = retry_engine or default_retry_engine
 
     def get_random_cookie(self) -> str | None:
         """
@@ -147,97 +581,39 @@ class CookieManager:
                    "Cookie": None,
                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
                    "Referer": self.baseurl,
-                   "Connection": 'close',
                    "Accept-Encoding": "gzip, deflate, br"}
         
-        for attempt in range(self.retries):
+        retry, proxies = self._begin_retry(self.baseurl, self.proxies, self.retries)
+        while retry.next_attempt():
             try:
-                response = requests.get(self.baseurl, headers=headers, proxies=self.proxies)
+                session = self.session_manager.get_session(self.baseurl, proxies)
+                rate_key = self.rate_limiter.key(self.baseurl, proxies)
+                self.rate_limiter.acquire(rate_key)
+                start = time.monotonic()
+                response = session.get(self.baseurl, headers=headers, proxies=proxies)
                 
                 status_code = response.status_code
+                self.rate_limiter.record(rate_key, status_code)
+                self._record_proxy(proxies, status_code, time.monotonic() - start)
                 
                 if status_code == 200:
-                    try:
-                        session_cookie = response.headers.get("Set-Cookie")
-                        headers["Cookie"] = session_cookie # Use the new cookie on retries
-                        if session_cookie and self.cookie_prefix in session_cookie:
-                            logger.info("Succesfully fetched cookie.")
-                            return session_cookie.split(self.cookie_prefix)[1].split(";")[0]
-                        logger.warning('Invalid session cookie. Trying again')
-                        time.sleep(random.uniform(0,1))
-                        continue
-                    except Exception as e:
-                        logger.warning(e)
-                        time.sleep(random.uniform(0,1))
-                        continue
-                elif status_code == 401:
-                    if attempt == self.retries - 1:
-                        logger.warning('Session cookie did not work. Trying without one on the last attempt')
-                        headers['Cookie'] = None
-                        time.sleep(random.uniform(0,1))
-                        continue
-                    logger.warning("Session cookie expired. Fetching a new one.")
-                    self.session_cookie = self.get_random_cookie()
-                    headers['Cookie'] = f'{self.cookie_prefix}{self.session_cookie}' if self.session_cookie else None
-                    time.sleep(random.uniform(0,1))
-                    continue
-                elif status_code == 400:
-                    if attempt == self.retries - 1:
-                        logger.warning('User agent did not work. Trying without one on the last attempt')
-                        headers['User-Agent'] = None
-                        time.sleep(random.uniform(0,1))
-                        continue
-                    logger.warning("User agent not valid. Fetching a new one.")
-                    self.user_agent = self.user_agent_manager.get_random_user_agent()
-                    headers['User-Agent'] = self.user_agent
-                    time.sleep(random.uniform(0,1))
-                    continue
-                elif status_code == 403:
-                    if attempt == self.retries - 1:
-                        logger.warning('Status code = 403. Retrying without a user agent the last attempt')
-                        headers['User-Agent'] = None
-                        continue
-                    logger.warning("Status code = 403. Trying with a new user agent and proxy.")
-                    self.proxies = self.proxy_manager.get_random_proxy()
-                    self.user_agent = self.user_agent_manager.get_random_user_agent()
-                    headers['User-Agent'] = self.user_agent
-                    time.sleep(random.uniform(0,1))
-                    continue
-                elif status_code == 407:
-                    if attempt == self.retries - 1:
-                        logger.warning('Proxy did not work. Trying without one on the last attempt')
-                        self.proxies = None
-                        time.sleep(random.uniform(0,1))
-                        continue
-                    logger.warning("Proxy authentication failed. Fetching a new one")
-                    self.proxies = self.proxy_manager.get_random_proxy()
-                    time.sleep(random.uniform(0,1))
-                    continue
-                elif status_code in [502, 504]:
-                    if attempt == self.retries - 1:
-                        logger.warning('Proxy did not work. Trying without one on the last attempt')
-                        self.proxies = None
-                        continue
-                    logger.warning(f"Proxy gateway problem {response.status_code}. Fetching a new one")
-                    self.proxies = self.proxy_manager.get_random_proxy()
-                    time.sleep(random.uniform(0,1))
-                    continue
-                    
+                    session_cookie = response.headers.get("Set-Cookie")
+                    headers["Cookie"] = session_cookie # Use the new cookie on retries
+                    if session_cookie and self.cookie_prefix in session_cookie:
+                        retry.success()
+                        logger.info("Succesfully fetched cookie.")
+                        return session_cookie.split(self.cookie_prefix)[1].split(";")[0]
+                    logger.warning('Invalid session cookie. Trying again')
+                    retry.failure(keys=[])
                 else:
-                    logger.warning(f"Error {status_code} occurred: {response.content}. Trying again")
-                    time.sleep(random.uniform(0,1))
-                    continue
+                    proxies, refresh_cookie = self._handle_status(status_code, headers, retry, self.baseurl, proxies,
+                                                                  response.headers.get("Retry-After"))
+                    if refresh_cookie:
+                        # We are fetching a new cookie already, so retry without the rejected one
+                        headers['Cookie'] = None
             
-            except requests.exceptions.ConnectionError as con_err:
-                logger.warning(f"Connection error occured: {con_err}. Trying again")
-                time.sleep(random.uniform(0,1))
-                continue              
-
             except requests.RequestException as e:
-                logger.warning(f"Attempt {attempt + 1} failed: {e}")
-                time.sleep(random.uniform(0,1))
-                continue
+                proxies = self._handle_error(e, retry, self.baseurl, proxies)
 
-        logger.error(f"Failed to fetch session cookie from {self.baseurl} after {self.retries} attempts. Returning None.")
+        logger.error(f"Failed to fetch session cookie from {self.baseurl} after {retry.attempt} attempts. Returning None.")
         return None
-        
\ No newline at end of file
@@ -1,6 +1,12 @@
-from typing import Dict, List, Optional
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Union
 
-from .models import VintedItem
+from .cookie_pool import CookiePool
+from .models import VintedItem, VintedItemBatch
+from .rate_limiter import RateLimiter
+from .retry import RetryEngine
+from .seen_ids import SeenIds
+from .utils import ProxyManager, SessionManager
 from .vintedWrapper import VintedWrapper
 
 import logging
@@ -17,6 +23,11 @@ class VintedScraper(VintedWrapper):
         agent: Optional[str] = None,
         session_cookie: Optional[str] = None,
         proxies: Optional[Dict[str, str]] = None,
+        session_manager: Optional[SessionManager] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_engine: Optional[RetryEngine] = None,
+        proxy_manager: Optional[ProxyManager] = None,
+        cookie_pool: Optional[CookiePool] = None,
     ):
         """
         :param baseurl: (required) Base Vinted site url to use in the requests
@@ -25,10 +36,28 @@ class VintedScraper(VintedWrapper):
         :param proxies: (optional) Dictionary mapping protocol or protocol and
         hostname to the URL of the proxy. For more info see:
         https://requests.readthedocs.io/en/latest/user/advanced/#proxies
+        :param session_manager: (optional) Pool of keep-alive sessions shared between wrappers
+        :param rate_limiter: (optional) Paces the requests per domain and proxy
+        :param retry_engine: (optional) Back off, retry budget and circuit breakers
+        :param proxy_manager: (optional) Picks the proxies weighted by their health
+        :param cookie_pool: (optional) Warm session cookies shared between wrappers
         """
-        super().__init__(baseurl, cookie_prefix, agent, session_cookie, proxies)
+        super().__init__(
+            baseurl,
+            cookie_prefix=cookie_prefix,
+            agent=agent,
+            session_cookie=session_cookie,
+            proxies=proxies,
+            session_manager=session_manager,
+            rate_limiter=rate_limiter,
+            retry_engine=retry_engine,
+            proxy_manager=proxy_manager,
+            cookie_pool=cookie_pool,
+        )
 
-    def search(self, params: Optional[Dict] = None, page_limit = 5) -> List[VintedItem]:  # type: ignore
+    def search(self, params: Optional[Dict] = None, page_limit = 5, concurrency: int = 1,  # type: ignore
+               amount: Optional[int] = None, per_page: Optional[int] = None, as_batch: bool = False,
+               fields: Optional[Iterable[str]] = None) -> Union[List[VintedItem], VintedItemBatch]:
         """
         Search for items on Vinted.
 
@@ -36,18 +65,82 @@ class VintedScraper(VintedWrapper):
             Vinted supports a search without any parameters, but to perform a search,
             you should add the `search_text` parameter.
             Default value: None.
+        :param page_limit: Maximum number of pages to retrieve.
+        :param concurrency: Number of pages fetched at the same time.
+        :param amount: Number of items wanted. The search stops as soon as they are fetched.
+        :param per_page: Number of items per page.
+        :param as_batch: Return a columnar VintedItemBatch instead of a list, to filter and sort many items
+            at once. The rows are only built into VintedItem instances when they are read. Needs numpy.
+        :param fields: The fields to keep, like ["title", "price", "user.login"]. The other fields of the
+            VintedItem instances are None.
         :return: A list of VintedItem instances representing search results.
         """
+        if as_batch:
+            return VintedItemBatch.from_items(self._iter_checked_items(params, page_limit, concurrency, amount, per_page, fields))
+        return list(self.iter_search(params, page_limit, concurrency, amount, per_page, fields))
+
+    def iter_search(self, params: Optional[Dict] = None, page_limit = 5, concurrency: int = 1,  # type: ignore
+                    amount: Optional[int] = None, per_page: Optional[int] = None,
+                    fields: Optional[Iterable[str]] = None) -> Iterator[VintedItem]:
+        """
+        Search for items on Vinted, yielding every VintedItem as soon as its page is decoded.
+
+        :param params: an optional Dictionary with all the query parameters to append to the request.
+            Default value: None.
+        :param page_limit: Maximum number of pages to retrieve.
+        :param concurrency: Number of pages fetched at the same time.
+        :param amount: Number of items wanted. The search stops as soon as they are fetched.
+        :param per_page: Number of items per page.
+        :param fields: The fields to keep, see search().
+        :return: An iterator over VintedItem instances representing search results.
+        """
+        for item in self._iter_checked_items(params, page_limit, concurrency, amount, per_page, fields):
+            yield VintedItem(item)
+
+    def _iter_checked_items(self, params: Optional[Dict], page_limit: int, concurrency: int, amount: Optional[int],
+                            per_page: Optional[int], fields: Optional[Iterable[str]]) -> Iterator[Dict]:
+        """
+        Yield the raw item dicts of a search, skipping the invalid ones. An error stops the search and
+        keeps the items already yielded.
+        """
         try:
-            return [VintedItem(item) for item in super().search(params, page_limit)["all_items"]]
-            
+            for item in self._iter_items(params, page_limit, concurrency, amount, per_page, fields):
+                if not isinstance(item, dict):
+                    logger.warning('Item is not a dictionary. Skipping this item.')
+                    continue
+                yield item
+
         except KeyError:
-            logger.error('Key "items" not found. returning an empty list.')
-            return []
-        
+            logger.error('Key "items" not found. Stopping the search.')
+
         except Exception as e:
-            logger.error(f'{e}. Returning an empty list')
-            return []
+            logger.error(f'{e}. Stopping the search')
+
+    def new_items(self, params: Optional[Dict] = None, seen: Optional[SeenIds] = None, page_limit: int = 5) -> List[VintedItem]:  # type: ignore
+        """
+        Poll a search on Vinted for the items posted since the previous poll.
+
+        :param params: an optional Dictionary with all the query parameters to append to the request.
+        :param seen: The ids emitted by the previous polls of this search. The new ids are added to it.
+        :param page_limit: Maximum number of pages to retrieve.
+        :return: A list of VintedItem instances of the new items, newest first.
+        """
+        return [VintedItem(item) for item in super().new_items(params, seen, page_limit)]
+
+    def watch(self, params: Optional[Dict] = None, interval: float = 30.0, page_limit: int = 5,  # type: ignore
+              seen: Optional[SeenIds] = None, stop: Optional[threading.Event] = None) -> Iterator[VintedItem]:
+        """
+        Poll a search on Vinted every `interval` seconds and yield only the newly posted items.
+
+        :param params: an optional Dictionary with all the query parameters to append to the request.
+        :param interval: Seconds between two polls.
+        :param page_limit: Maximum number of pages to retrieve per poll.
+        :param seen: The ids already emitted. Defaults to a new SeenIds.
+        :param stop: Set this event to end the iteration.
+        :return: An iterator over VintedItem instances of the new items.
+        """
+        for item in super().watch(params, interval, page_limit, seen, stop):
+            yield VintedItem(item)
 
     def item(self, item_id: str, params: Optional[Dict] = None) -> VintedItem:  # type: ignore
         """
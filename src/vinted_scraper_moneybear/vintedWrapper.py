@@ -1,19 +1,30 @@
 import json
 import re
+import threading
 import time
-import random
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import requests
 
-from .utils import CookieManager, UserAgentManager, ProxyManager
+from .cookie_pool import CookiePool
+from .models.decoder import loads
+from .projection import Projection
+from .rate_limiter import RateLimiter, default_rate_limiter
+from .retry import RetryEngine, default_retry_engine
+from .seen_ids import SeenIds
+from .utils import CookieManager, UserAgentManager, ProxyManager, RotationMixin, SessionManager, default_session_manager
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class VintedWrapper:
+# Largest page size accepted by the catalog endpoint
+MAX_PER_PAGE = 96
+
+class VintedWrapper(RotationMixin):
     def __init__(
         self,
         baseurl: str,
@@ -22,6 +33,11 @@ class VintedWrapper:
         agent: Optional[str] = None,
         session_cookie: Optional[str] = None,
         proxies: Optional[Dict[str, str]] = None,
+        session_manager: Optional[SessionManager] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_engine: Optional[RetryEngine] = None,
+        proxy_manager: Optional[ProxyManager] = None,
+        cookie_pool: Optional[CookiePool] = None,
     ):
         """
         Initialize the VintedWrapper with the base URL and optional parameters.
@@ -30,18 +46,57 @@ class VintedWrapper:
         :param agent: (optional) User agent to use for requests.
         :param session_cookie: (optional) Vinted session cookie.
         :param proxies: (optional) Dictionary mapping protocol and hostname to proxy URL.
+        :param session_manager: (optional) Pool of keep-alive sessions. Defaults to the process-wide pool,
+            so connections are reused across pages, item() calls and wrapper instances.
+        :param rate_limiter: (optional) Paces the requests per domain and proxy. Defaults to the process-wide
+            limiter, shared by all the wrappers and threads.
+        :param retry_engine: (optional) Back off, retry budget and circuit breakers. Defaults to the
+            process-wide engine.
+        :param proxy_manager: (optional) Picks the proxies weighted by their health. Pass the same one to
+            several wrappers to share the proxy statistics and quarantines.
+        :param cookie_pool: (optional) Warm session cookies handed out round-robin. Defaults to the
+            process-wide pool of the domain, refreshed in the background.
         """
         self.baseurl = self._validate_baseurl(baseurl)
         self.cookie_prefix = self._validate_cookie_prefix(cookie_prefix)
         self.user_agent_manager = UserAgentManager()
         self.user_agent = agent or self.user_agent_manager.get_random_user_agent()
-        self.proxy_manager = ProxyManager()
+        self.proxy_manager = proxy_manager or ProxyManager()
         # If there are no proxies in proxies.json, you should change this to self.proxies = proxies else None
         self.proxies = proxies or self.proxy_manager.get_random_proxy()
-        self.cookie_manager = CookieManager(self.baseurl, self.user_agent, self.proxies, self.cookie_prefix)
-        self.session_cookie = session_cookie or self.cookie_manager.get_random_cookie()
+        self.session_manager = session_manager or default_session_manager
+        self.rate_limiter = rate_limiter or default_rate_limiter
+        self.retry_engine = retry_engine or default_retry_engine
+        self.cookie_manager = CookieManager(self.baseurl, self.user_agent, self.proxies, self.cookie_prefix,
+                                            session_manager=self.session_manager, rate_limiter=self.rate_limiter,
+                                            retry_engine=self.retry_engine, proxy_manager=self.proxy_manager)
+        self._cookie_pool = cookie_pool
+        self.session_cookie = session_cookie or self.cookie_pool.get_cookie()
         self.max_request_size_kb = max_request_size_kb
 
+    @property
+    def cookie_pool(self) -> CookiePool:
+        """The pool the session cookies come from, created on first use."""
+        if self._cookie_pool is None:
+            self._cookie_pool = CookiePool.for_domain(self.baseurl, self.cookie_prefix)
+        return self._cookie_pool
+
+    def _current_cookie(self) -> Optional[str]:
+        """:return: The session cookie a request starts with, the next one of the pool if it was rejected."""
+        if self._cookie_pool is not None and self._cookie_pool.rejected(self.session_cookie):
+            return self._cookie_pool.get_cookie()
+        return self.session_cookie
+
+    def _refresh_cookie(self, rejected: Optional[str]) -> Optional[str]:
+        """
+        Replace a rejected session cookie with the next one of the pool, for the current request only.
+
+        :param rejected: The session cookie of the failed attempt.
+        :return: The new session cookie.
+        """
+        self.cookie_pool.invalidate(rejected)
+        return self.cookie_pool.get_cookie()
+
     def _validate_baseurl(self, baseurl: str) -> Optional[str]:
         """Validate and return the base URL."""
         if not isinstance(baseurl, str):
@@ -50,7 +105,8 @@ class VintedWrapper:
             return "https://www.vinted.com"
         
         baseurl = baseurl.rstrip('/')
-        if not re.match(r"^(https?://)?(www\.)?[\w.-]+\.\w{2,}$", baseurl):
+        # Hosts with a port, localhost and IPv4 addresses are accepted for local stand-in servers
+        if not re.match(r"^(https?://)?((www\.)?[\w.-]+\.\w{2,}|localhost|\d{1,3}(\.\d{1,3}){3})(:\d{1,5})?$", baseurl):
             logger.warning(f'{baseurl} is not a valid URL. Defaulting to "https://www.vinted.com"')
             # Only works for Vinted
             return "https://www.vinted.com"
@@ -80,17 +136,127 @@ class VintedWrapper:
             return False, request_size_kb
         return True, request_size_kb
 
-    def search(self, params: Optional[Dict] = None, page_limit: int = 5) -> Dict[str, Dict[str, Any]]:
+    def search(self, params: Optional[Dict] = None, page_limit: int = 5, concurrency: int = 1,
+               amount: Optional[int] = None, per_page: Optional[int] = None,
+               fields: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
         """
         Search for items using the provided parameters and return a list of items.
 
         :param params: Optional dictionary containing search parameters.
         :param page_limit: Maximum number of pages to retrieve.
+        :param concurrency: Number of pages fetched at the same time. With 1 the pages are fetched one
+            after another. Items are always returned in page order.
+        :param amount: Number of items wanted. The page size and number of pages are planned to fetch them
+            in as few requests as possible, and the search stops as soon as they are fetched.
+        :param per_page: Number of items per page, up to MAX_PER_PAGE. Defaults to the page size of the API,
+            or to the one planned for `amount`.
+        :param fields: The fields to keep, like ["title", "price", "user.login", "photo.url"]. The projection is
+            applied once when a page is decoded and the rest of the item is dropped. "user.feedback_url" is
+            built from the profile URL. Defaults to the whole items, with the feedback URL of the user added.
         :return: A list of dictionaries containing item details.
         """
-        # starting page
-        page_number = 1
-        
+        all_items = list(self._iter_items(params, page_limit, concurrency, amount, per_page, fields))
+          
+        result = {'all_items' : all_items}
+        logger.info(f'Successfully fetched {len(all_items)} items')
+        return result
+
+    def iter_search(self, params: Optional[Dict] = None, page_limit: int = 5, concurrency: int = 1,
+                    amount: Optional[int] = None, per_page: Optional[int] = None,
+                    fields: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Search for items like search(), but yield the items as soon as their page is decoded.
+
+        Only the pages that are consumed are fetched (plus the ones in flight when fetching concurrently),
+        so stopping the iteration early also stops the pagination.
+
+        :param params: Optional dictionary containing search parameters.
+        :param page_limit: Maximum number of pages to retrieve.
+        :param concurrency: Number of pages fetched at the same time.
+        :param amount: Number of items wanted, see search().
+        :param per_page: Number of items per page, see search().
+        :param fields: The fields to keep, see search().
+        :return: An iterator over the dictionaries containing item details.
+        """
+        return self._iter_items(params, page_limit, concurrency, amount, per_page, fields)
+
+    def new_items(self, params: Optional[Dict] = None, seen: Optional[SeenIds] = None, page_limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Poll a search for the items posted since the previous poll.
+
+        The pages are fetched newest first, and the pagination stops after the first page that contains
+        an item already in `seen`, so a poll usually costs a single page. On the first poll, when `seen`
+        is empty, up to `page_limit` pages are fetched and all their items are new.
+
+        :param params: Optional dictionary containing search parameters.
+        :param seen: The ids emitted by the previous polls of this search. The new ids are added to it.
+        :param page_limit: Maximum number of pages to retrieve.
+        :return: The new items, newest first.
+        """
+        return list(self._iter_new(params, SeenIds() if seen is None else seen, page_limit))
+
+    def watch(self, params: Optional[Dict] = None, interval: float = 30.0, page_limit: int = 5,
+              seen: Optional[SeenIds] = None, stop: Optional[threading.Event] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Poll a search every `interval` seconds and yield only the newly posted items.
+
+        :param params: Optional dictionary containing search parameters.
+        :param interval: Seconds between two polls.
+        :param page_limit: Maximum number of pages to retrieve per poll.
+        :param seen: The ids already emitted. Defaults to a new SeenIds, so the first poll emits every item.
+        :param stop: Set this event to end the iteration.
+        :return: An iterator over the new items.
+        """
+        seen = SeenIds() if seen is None else seen
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            yield from self._iter_new(params, seen, page_limit)
+            stop.wait(interval)
+
+    def _iter_new(self, params: Optional[Dict], seen: SeenIds, page_limit: int) -> Iterator[Dict[str, Any]]:
+        """Yield the items of the newest pages until a page reaches an id already seen."""
+        if not isinstance(params, dict):
+            params = {}
+        params = {**params, 'order': 'newest_first'}
+
+        for items in self._iter_pages(params, page_limit):
+            reached_seen = False
+            # Finish the page anyway: a bumped item can come before newer ones
+            for item in items:
+                if not isinstance(item, dict) or 'id' not in item:
+                    continue
+                if seen.add(item['id']):
+                    yield item
+                else:
+                    reached_seen = True
+            if reached_seen:
+                logger.info('Reached the items of the previous poll. Stopping the pagination')
+                return
+
+    @staticmethod
+    def _plan_pages(page_limit: int, amount: Optional[int] = None, per_page: Optional[int] = None) -> Tuple[int, Optional[int]]:
+        """
+        Plan the fewest catalog requests that return `amount` items.
+
+        :param page_limit: Maximum number of pages to retrieve.
+        :param amount: Number of items wanted, or None for all the items of `page_limit` pages.
+        :param per_page: The requested page size, if any.
+        :return: The number of pages to fetch and the page size, None to keep the default of the API.
+        """
+        if per_page is not None:
+            per_page = max(1, min(MAX_PER_PAGE, per_page))
+        if amount is None:
+            return page_limit, per_page
+        if amount <= 0:
+            return 0, per_page
+        if per_page is None:
+            per_page = min(MAX_PER_PAGE, amount)
+        return min(page_limit, -(-amount // per_page)), per_page
+
+    def _iter_items(self, params: Optional[Dict], page_limit: int, concurrency: int,
+                    amount: Optional[int] = None, per_page: Optional[int] = None,
+                    fields: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Validate the search parameters and yield the items of every page, up to `amount` items."""
         if not params:
             logger.error('No search parameters found. Continuing without parameters')
             params = {}
@@ -98,50 +264,138 @@ class VintedWrapper:
         if not isinstance(params, dict):
             logger.error('Parameters must be in a dictionary. Continuing without parameters')
             params = {}
-            
-        all_items = []
 
-        while page_number <= page_limit:
-            params['page'] = page_number
-            # This endpoint only works for Vinted
-            response = self._curl("/catalog/items", params=params)
+        if per_page is None and isinstance(params.get('per_page'), int):
+            per_page = params['per_page']
+        # Vinted may cap or ignore a page size we planned ourselves, so a shorter page doesn't end the search
+        planned = per_page is None and amount is not None
+        pages, per_page = self._plan_pages(page_limit, amount, per_page)
+        if per_page is not None:
+            params = {**params, 'per_page': per_page}
+            logger.info(f'Planned {pages} pages of {per_page} items')
+        if planned:
+            # The amount ends the search, up to page_limit pages if the pages are shorter than planned
+            concurrency = min(concurrency, pages)
+            page_limit = page_limit if pages else 0
+        else:
+            page_limit = pages
 
-            if not response:
-                logger.error('No response. Breaking')
-                break
+        count = 0
+        for items in self._iter_pages(params, page_limit, concurrency, Projection.of(fields), short_page_is_last=not planned):
+            for item in items:
+                yield item
+                count += 1
+                # Stop the pagination as soon as the wanted amount is reached
+                if amount is not None and count >= amount:
+                    return
+
+    def _fetch_page(self, params: Dict, page_number: int) -> Dict[str, List[Optional[dict]]]:
+        """Fetch a single catalog page."""
+        # This endpoint only works for Vinted
+        return self._curl("/catalog/items", params={**params, 'page': page_number})
+
+    def _iter_pages(self, params: Dict, page_limit: int, concurrency: int = 1,
+                    projection: Optional[Projection] = None,
+                    short_page_is_last: bool = True) -> Iterator[List[Optional[dict]]]:
+        """
+        Fetch the catalog pages and yield their items in page order.
+
+        Stops at the first empty (or invalid) page, since it is the last page, and after a page shorter than
+        the `per_page` parameter, since no page comes after it. When fetching concurrently,
+        up to `concurrency` pages are in flight at once, and the pages after the last one are cancelled
+        or discarded.
+
+        :param params: Dictionary containing search parameters.
+        :param page_limit: Maximum number of pages to retrieve.
+        :param concurrency: Number of pages fetched at the same time.
+        :param projection: The fields to keep of every item.
+        :param short_page_is_last: Stop after a page shorter than `per_page`. Only for a page size asked by the
+            caller: Vinted may serve fewer items than a planned one.
+        :return: An iterator over the items of each page.
+        """
+        per_page = params.get('per_page') if short_page_is_last and isinstance(params.get('per_page'), int) else None
+        if concurrency <= 1:
+            for page_number in range(1, page_limit + 1):
+                items = self._page_items(self._fetch_page(params, page_number), projection)
+                # If the page has no items, it is the last page, so we break
+                if not items:
+                    return
+                yield items
+                if per_page and len(items) < per_page:
+                    return
+            return
+
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        pending = deque()
+        next_page = 1
+        try:
+            while pending or next_page <= page_limit:
+                while next_page <= page_limit and len(pending) < concurrency:
+                    pending.append(executor.submit(self._fetch_page, params, next_page))
+                    next_page += 1
+                items = self._page_items(pending.popleft().result(), projection)
+                # If the page has no items, it is the last page, so the pages after it are not needed
+                if not items:
+                    return
+                yield items
+                if per_page and len(items) < per_page:
+                    return
+        finally:
+            for future in pending:
+                future.cancel()
+            # Don't wait for the requests already in flight, their result is discarded
+            executor.shutdown(wait=False)
 
+    @staticmethod
+    def _page_items(response: Optional[Dict], projection: Optional[Projection] = None) -> Optional[List[Optional[dict]]]:
+        """
+        Validate a catalog response and return its items.
+
+        :param response: The parsed JSON response of the catalog endpoint.
+        :param projection: The fields to keep. The projected items are new dicts, the raw ones are dropped.
+        :return: The items of the page, or None if the response is not valid.
+        """
+        if not response:
+            logger.error('No response. Breaking')
+            return None
+
+        try:
+            items: list[Optional[dict]] = response['items']
+
+        except KeyError as e:
+            logger.error(f'Key {e} does not exist in the response. Breaking')
+            return None
+
+        if not isinstance(items, list):
+            logger.error('The response must be a list (with dictionaries). Breaking')
+            return None
+
+        if projection is not None:
+            return [VintedWrapper._project(item, projection) if isinstance(item, dict) else item for item in items]
+
+        for item in items:
+            if not isinstance(item, dict):
+                logger.warning('Item is not a dictionary. Skipping this item.')
+                continue
             try:
-                items: list[Optional[dict]] = response['items']
-            
+                # Only works for Vinted
+                item['user']['feedback_url'] = item['user']['profile_url'] + '?tab=feedback'
             except KeyError as e:
                 logger.error(f'Key {e} does not exist in the response. Breaking')
                 break
-            
-            if not isinstance(items, list):
-                logger.error('The response must be a list (with dictionaries). Breaking')
-                break
-            
-            # If the page has no items, it is the last page, so we break
-            if not items:
-                break
-            
-            for item in items:
-                if not isinstance(item, dict):
-                    logger.warning('Item is not a dictionary. Skipping this item.')
-                    continue
-                try:
-                    # Only works for Vinted
-                    item['user']['feedback_url'] = item['user']['profile_url'] + '?tab=feedback'
-                except KeyError as e:
-                    logger.error(f'Key {e} does not exist in the response. Breaking')
-                    break
-                
-            all_items.extend(items)
-            page_number += 1
-          
-        result = {'all_items' : all_items}
-        logger.info(f'Successfully fetched {len(all_items)} items')
-        return result
+
+        return items
+
+    @staticmethod
+    def _project(item: Dict[str, Any], projection: Projection) -> Dict[str, Any]:
+        """Project an item, adding the feedback URL of the user only when it is asked for."""
+        projected = projection.apply(item)
+        if 'user.feedback_url' in projection and isinstance(projected.get('user'), dict):
+            profile_url = (item.get('user') or {}).get('profile_url')
+            if profile_url:
+                # A copy, the user may be kept whole, as the same dict as the raw item. Only works for Vinted
+                projected['user'] = {**projected['user'], 'feedback_url': profile_url + '?tab=feedback'}
+        return projected
 
     def item(self, item_id: str, params: Optional[Dict] = None) -> Dict[str, Any]:
         """
@@ -154,12 +408,16 @@ class VintedWrapper:
         # This endpoint only works on Vinted
         return self._curl(f"/items/{item_id}", params=params)
 
-    def _curl(self, endpoint: str, params: Optional[Dict] = None, max_retries = 3) -> Dict[str, List[Optional[dict]]]:
+    def _curl(self, endpoint: str, params: Optional[Dict] = None, max_retries: Optional[int] = None) -> Dict[str, List[Optional[dict]]]:
         """
         Send an HTTP GET request to the specified endpoint.
 
+        Failed attempts are retried with the back off, retry budget and circuit breakers of the retry engine.
+        See RotationMixin._handle_status for how each status code is handled.
+
         :param endpoint: The endpoint to make the request to.
         :param params: An optional dictionary with query parameters to include in the request.
+        :param max_retries: Maximum number of attempts. Defaults to the one of the retry engine.
         :return: A dictionary containing the parsed JSON response from the endpoint.
         """
         status, size = self._validate_request_size(params)
@@ -168,12 +426,13 @@ class VintedWrapper:
             return {"items": []}
         logger.info(f'Request size within limits: {size} kb.')
         
+        # The client is shared by threads: the cookie, user agent and proxy rotated by this request stay here
+        cookie = self._current_cookie()
         headers = {
             "User-Agent": self.user_agent,
-            "Cookie": f'{self.cookie_prefix}{self.session_cookie}' if self.session_cookie else None,
+            "Cookie": f'{self.cookie_prefix}{cookie}' if cookie else None,
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
             "Referer": self.baseurl,
-            "Connection": 'close',
             "Accept-Encoding": "gzip, deflate, br"}
         
         if not endpoint:
@@ -189,88 +448,38 @@ class VintedWrapper:
             logger.warning('No baseurl specified. Defaulting to "https://www.vinted.com"')
             self.baseurl = "https://www.vinted.com"
 
-        for attempt in range(max_retries):
+        url = f"{self.baseurl}/api/v2{endpoint}"
+        retry, proxies = self._begin_retry(url, self.proxies, max_retries)
+        while retry.next_attempt():
             try:
-                response = requests.get(
+                session = self.session_manager.get_session(self.baseurl, proxies)
+                rate_key = self.rate_limiter.key(self.baseurl, proxies)
+                self.rate_limiter.acquire(rate_key)
+                start = time.monotonic()
+                response = session.get(
                     # Only works for Vinted
-                    f"{self.baseurl}/api/v2{endpoint}",
+                    url,
                     params=params,
                     headers=headers,
-                    proxies=self.proxies,
+                    proxies=proxies,
                 )
                 
                 status_code = response.status_code
+                self.rate_limiter.record(rate_key, status_code)
+                self._record_proxy(proxies, status_code, time.monotonic() - start)
 
                 if status_code == 200:
-                    return json.loads(response.content.decode("utf-8"))
-                elif status_code == 401:
-                    if attempt == max_retries - 1:
-                        logger.warning('Session cookie did not work. Trying without on on the last attempt')
-                        headers['Cookie'] = None
-                        time.sleep(random.uniform(0,1))
-                        continue
-                    logger.warning("Session cookie expired. Fetching a new one.")
-                    self.session_cookie = self.cookie_manager.get_random_cookie()
-                    headers['Cookie'] = f'{self.cookie_prefix}{self.session_cookie}' if self.session_cookie else None
-                    time.sleep(random.uniform(0,1))
-                    continue
-                elif status_code == 400:
-                    if attempt == max_retries - 1:
-                        logger.warning('User agent did not work. Trying without on on the last attempt')
-                        headers['User-Agent'] = None
-                        time.sleep(random.uniform(0,1))
-                        continue
-                    logger.warning("User agent not valid. Fetching a new one.")
-                    self.user_agent = self.user_agent_manager.get_random_user_agent()
-                    headers['User-Agent'] = self.user_agent
-                    time.sleep(random.uniform(0,1))
-                    continue
-                elif status_code == 403:
-                    if attempt == max_retries - 1:
-                        logger.warning('User agent did not work. Trying without on on the last attempt')
-                        headers['User-Agent'] = None
-                        time.sleep(random.uniform(0,1))
-                        continue
-                    logger.warning("User agent banned. Fetching a new one.")
-                    self.user_agent = self.user_agent_manager.get_random_user_agent()
-                    headers['User-Agent'] = self.user_agent
-                    time.sleep(random.uniform(0,1))
-                    continue
-                elif status_code == 407:
-                    if attempt == max_retries - 1:
-                        logger.warning('Proxy did not work. Trying without on on the last attempt')
-                        self.proxies = None
-                        time.sleep(random.uniform(0,1))
-                        continue
-                    logger.warning("Proxy authentication failed. Fetching a new one")
-                    self.proxies = self.proxy_manager.get_random_proxy()
-                    time.sleep(random.uniform(0,1))
-                    continue
-                elif status_code in [502, 504]:
-                    if attempt == max_retries - 1:
-                        logger.warning('Proxy did not work. Trying without on on the last attempt')
-                        self.proxies = None
-                        time.sleep(random.uniform(0,1))
-                        continue
-                    logger.warning(f"Proxy gateway problem {response.status_code}. Fetching a new one")
-                    self.proxies = self.proxy_manager.get_random_proxy()
-                    time.sleep(random.uniform(0,1))
-                    continue
-                    
-                else:
-                    logger.warning(f"Error {status_code} occurred: {response.content}. Trying again")
-                    time.sleep(random.uniform(0,1))
-                    continue
-            
-            except requests.exceptions.ConnectionError as con_err:
-                logger.warning(f"Connection error occured: {con_err}. Trying again")
-                time.sleep(random.uniform(0,1))
-                continue
+                    retry.success()
+                    return loads(response.content)
+
+                proxies, refresh_cookie = self._handle_status(status_code, headers, retry, url, proxies,
+                                                              response.headers.get("Retry-After"))
+                if refresh_cookie:
+                    cookie = self._refresh_cookie(cookie)
+                    headers['Cookie'] = f'{self.cookie_prefix}{cookie}' if cookie else None
             
             except requests.exceptions.RequestException as req_err:
-                logger.warning(f"Request error occurred: {req_err}. Trying again")
-                time.sleep(random.uniform(0,1))
-                continue
+                proxies = self._handle_error(req_err, retry, url, proxies)
 
         logger.error("All attempts to fetch data failed. Returning an dict('items': [])")
         return {"items": []}
\ No newline at end of file
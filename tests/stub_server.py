@@ -0,0 +1,195 @@
+import argparse
+import copy
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+SAMPLES_PATH = os.path.join(os.path.dirname(__file__), "samples")
+
+
+def read_sample(filename: str) -> Dict:
+    """Read a sample from the samples' folder, wherever the tests are run from."""
+    with open(os.path.join(SAMPLES_PATH, f"{filename}.json"), "r") as file:
+        return json.load(file)
+
+
+class StubVinted:
+    """
+    A local stand-in for the Vinted endpoints used by the wrappers.
+
+    It serves `/` with a session cookie, `/api/v2/catalog/items` with pages built from
+    `tests/samples/search_item_dummy.json` and `/api/v2/items/<id>` from `item_dummy.json`.
+    Status codes queued in `statuses` are answered first, one per request. After that, faults are
+    injected at random with the rates of `error_rates`, for example {401: 0.05, 502: 0.1}.
+    """
+
+    def __init__(self, pages: int = 3, per_page: int = 2, cookie_prefix: str = "_vinted_fr_session=",
+                 latency: float = 0.0, jitter: float = 0.0, error_rates: Optional[Dict[int, float]] = None,
+                 retry_after: Optional[float] = None, seed: Optional[int] = None, port: int = 0,
+                 max_per_page: Optional[int] = None):
+        """
+        :param pages: Number of catalog pages with items.
+        :param per_page: Number of items per page.
+        :param cookie_prefix: The name of the session cookie followed by "=".
+        :param latency: Seconds every response is delayed.
+        :param jitter: Maximum extra seconds added at random to the latency.
+        :param error_rates: Share of the requests answered with each status code.
+        :param retry_after: Retry-After header in seconds sent with the 403 and 429 responses.
+        :param seed: Seed of the fault injection, to replay the same failure mix.
+        :param port: The port to listen on. Defaults to a free one.
+        :param max_per_page: The largest page size served, a larger per_page parameter is capped to it.
+        """
+        self.pages = pages
+        self.per_page = per_page
+        self.cookie_prefix = cookie_prefix
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rates = error_rates or {}
+        self.retry_after = retry_after
+        self.max_per_page = max_per_page
+        self.statuses: List[int] = []
+        self.requests: List[str] = []
+        self.status_counts: Counter = Counter()
+        self._random = random.Random(seed)
+        self._search_item = read_sample("search_item_dummy")["items"][0]
+        self._item = read_sample("item_dummy")
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def page(self, number: int, per_page: Optional[int] = None) -> List[Dict]:
+        """
+        Build the items of a catalog page, with ids unique across pages.
+
+        The catalog holds `pages * per_page` items, so a larger page size means fewer pages.
+        """
+        per_page = per_page or self.per_page
+        if self.max_per_page:
+            per_page = min(per_page, self.max_per_page)
+        total = self.pages * self.per_page
+        items = []
+        for item_id in range((number - 1) * per_page + 1, min(number * per_page, total) + 1):
+            item = copy.deepcopy(self._search_item)
+            item["id"] = item_id
+            items.append(item)
+        return items
+
+    def _next_status(self) -> int:
+        """Pick the status of the next response. Must hold the lock."""
+        if self.statuses:
+            return self.statuses.pop(0)
+        draw = self._random.random()
+        for status, rate in self.error_rates.items():
+            if draw < rate:
+                return status
+            draw -= rate
+        return 200
+
+    def reset(self) -> None:
+        """Forget the logged requests and status counts."""
+        with self._lock:
+            self.requests.clear()
+            self.status_counts.clear()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: bytes = b"", headers: Optional[Dict[str, str]] = None):
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                with stub._lock:
+                    stub.requests.append(self.path)
+                    status = stub._next_status()
+                    stub.status_counts[status] += 1
+                    delay = stub.latency + (stub._random.uniform(0, stub.jitter) if stub.jitter else 0)
+                if delay:
+                    time.sleep(delay)
+                if status != 200:
+                    headers = {"Retry-After": str(stub.retry_after)} \
+                        if stub.retry_after is not None and status in (403, 429) else None
+                    return self._send(status, headers=headers)
+
+                if url.path == "/":
+                    return self._send(200, b"<html></html>", {
+                        "Set-Cookie": f"{stub.cookie_prefix}stub-cookie; path=/; HttpOnly"})
+                if url.path == "/api/v2/catalog/items":
+                    query = parse_qs(url.query)
+                    page = int(query.get("page", ["1"])[0])
+                    per_page = int(query["per_page"][0]) if "per_page" in query else None
+                    return self._send(200, json.dumps({"items": stub.page(page, per_page)}).encode())
+                if url.path.startswith("/api/v2/items/"):
+                    item = copy.deepcopy(stub._item)
+                    item["item"]["id"] = url.path.rsplit("/", 1)[-1]
+                    return self._send(200, json.dumps(item).encode())
+                return self._send(404)
+
+        return Handler
+
+    def start(self) -> "StubVinted":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubVinted":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the stand-in Vinted server until interrupted.")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--per-page", type=int, default=96)
+    parser.add_argument("--cookie-prefix", default="_vinted_fr_session=")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds every response is delayed")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Maximum extra seconds of random delay")
+    parser.add_argument("--error-rate", action="append", default=[], metavar="STATUS=RATE",
+                        help="Share of the responses with a status code, like 502=0.1. Can be repeated")
+    parser.add_argument("--retry-after", type=float, help="Retry-After seconds of the 403 and 429 responses")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--max-per-page", type=int, help="Largest page size served, like Vinted capping per_page")
+    args = parser.parse_args()
+
+    error_rates = {int(status): float(rate) for status, rate in (value.split("=") for value in args.error_rate)}
+    stub = StubVinted(args.pages, args.per_page, args.cookie_prefix, args.latency, args.jitter,
+                      error_rates, args.retry_after, args.seed, args.port, args.max_per_page)
+    print(f"Serving the stand-in Vinted on {stub.url}")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
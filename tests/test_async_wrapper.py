@@ -0,0 +1,90 @@
+import unittest
+from unittest.mock import MagicMock
+from src.vinted_scraper_moneybear import AsyncVintedScraper, AsyncVintedWrapper
+from src.vinted_scraper_moneybear.cookie_pool import CookiePool
+from src.vinted_scraper_moneybear.models import VintedItem
+from src.vinted_scraper_moneybear.retry import RetryEngine
+from tests.stub_server import StubVinted
+
+class TestAsyncVintedWrapper(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.stub = StubVinted(pages=3, per_page=2).start()
+        # No back off between retries and breakers that don't leak between tests
+        self.retry_engine = RetryEngine(base_delay=0, max_delay=0)
+
+    def tearDown(self):
+        self.stub.stop()
+
+    async def test_search(self):
+        """Test if all the pages are fetched, with the cookie fetched on the first request."""
+        async with AsyncVintedWrapper(self.stub.url, retry_engine=self.retry_engine) as wrapper:
+            result = await wrapper.search({"search_text": "game"}, page_limit=5)
+        self.assertEqual([item["id"] for item in result["all_items"]], [1, 2, 3, 4, 5, 6])
+        self.assertEqual(wrapper.session_cookie, "stub-cookie")
+        # The cookie request, three pages and the empty page that ends the search
+        self.assertEqual(len(self.stub.requests), 5)
+
+    async def test_capped_page_size(self):
+        """Test if a planned page size served shorter doesn't end the search before the amount."""
+        self.stub.max_per_page = 1
+        async with AsyncVintedWrapper(self.stub.url, session_cookie="cookie", retry_engine=self.retry_engine) as wrapper:
+            result = await wrapper.search({"search_text": "game"}, page_limit=5, amount=3)
+        self.assertEqual([item["id"] for item in result["all_items"]], [1, 2, 3])
+
+    async def test_search_fields(self):
+        """Test if only the projected fields are kept, by the wrapper and the scraper."""
+        async with AsyncVintedWrapper(self.stub.url, session_cookie="cookie", retry_engine=self.retry_engine) as wrapper:
+            result = await wrapper.search(page_limit=1, fields=["id", "user.login"])
+        self.assertEqual([sorted(item) for item in result["all_items"]], [["id", "user"], ["id", "user"]])
+        self.assertEqual(list(result["all_items"][0]["user"]), ["login"])
+        async with AsyncVintedScraper(self.stub.url, session_cookie="cookie", retry_engine=self.retry_engine) as scraper:
+            items = await scraper.search(page_limit=1, fields=["id", "title"])
+        self.assertIsNotNone(items[0].title)
+        self.assertIsNone(items[0].brand_title)
+
+    async def test_item(self):
+        """Test fetching a single item with the scraper."""
+        async with AsyncVintedScraper(self.stub.url, session_cookie="cookie", retry_engine=self.retry_engine) as scraper:
+            item = await scraper.item("42")
+        self.assertIsInstance(item, VintedItem)
+        self.assertEqual(item.id, "42")
+
+    async def test_cookie_refresh_on_401(self):
+        """Test if a 401 fetches a new cookie and retries the request."""
+        self.stub.statuses = [401]
+        async with AsyncVintedWrapper(self.stub.url, session_cookie="expired", retry_engine=self.retry_engine) as wrapper:
+            result = await wrapper.search(page_limit=1)
+        self.assertEqual(len(result["all_items"]), 2)
+        self.assertEqual(wrapper.session_cookie, "stub-cookie")
+        self.assertEqual(self.stub.requests[1], "/")
+
+    async def test_cookie_pool(self):
+        """Test if the cookies come from the pool, and a rejected one is swapped for the next one."""
+        pool = CookiePool(self.stub.url, size=2, cookie_manager=MagicMock())
+        pool.cookie_manager.get_random_cookie.side_effect = ["cookie-1", "cookie-2"]
+        pool.warm()
+        self.stub.statuses = [401]
+        async with AsyncVintedWrapper(self.stub.url, retry_engine=self.retry_engine, cookie_pool=pool) as wrapper:
+            result = await wrapper.search(page_limit=1)
+        self.assertEqual(len(result["all_items"]), 2)
+        self.assertEqual(wrapper.session_cookie, "cookie-2")
+        self.assertTrue(pool.rejected("cookie-1"))
+        # No homepage request, the cookies come from the pool
+        self.assertNotIn("/", self.stub.requests)
+
+    async def test_all_attempts_failed(self):
+        """Test if an empty result is returned when every attempt fails."""
+        self.stub.statuses = [502, 504, 502]
+        async with AsyncVintedWrapper(self.stub.url, session_cookie="cookie", retry_engine=self.retry_engine) as wrapper:
+            response = await wrapper._curl("/catalog/items", params={"page": 1})
+        self.assertEqual(response, {"items": []})
+
+    async def test_timeout(self):
+        """Test if a request that times out is retried, then given up like a connection error."""
+        self.stub.latency = 0.5
+        async with AsyncVintedWrapper(self.stub.url, session_cookie="cookie", retry_engine=self.retry_engine,
+                                      timeout=0.1) as wrapper:
+            response = await wrapper._curl("/catalog/items", params={"page": 1})
+        self.assertEqual(response, {"items": []})
+        self.assertEqual(len(self.stub.requests), 3)
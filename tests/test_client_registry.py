@@ -0,0 +1,53 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+from src.vinted_scraper_moneybear.client_registry import ClientRegistry
+
+class TestClientRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.factory = MagicMock(side_effect=lambda baseurl, **kwargs: MagicMock(baseurl=baseurl))
+        self.registry = ClientRegistry(factory=self.factory, idle_timeout=60)
+
+    def test_reuses_client(self):
+        """Test if a client is created once per country suffix."""
+        first = self.registry.get("fr")
+        self.assertIs(first, self.registry.get("fr"))
+        self.assertEqual(first.baseurl, "https://www.vinted.fr")
+        self.assertIsNot(first, self.registry.get("de"))
+        self.assertEqual(self.factory.call_count, 2)
+
+    def test_shared_proxy_manager(self):
+        """Test if all the clients share one ProxyManager."""
+        self.registry.get("fr")
+        self.registry.get("de")
+        managers = [call.kwargs["proxy_manager"] for call in self.factory.call_args_list]
+        self.assertIs(managers[0], managers[1])
+
+    def test_invalid_suffix(self):
+        """Test if an invalid suffix falls back to the default one."""
+        self.assertEqual(self.registry.get("<script>").baseurl, "https://www.vinted.com")
+
+    def test_concurrent_get(self):
+        """Test if concurrent requests for a new country create a single client."""
+        threads = [threading.Thread(target=self.registry.get, args=("it",)) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.factory.call_count, 1)
+
+    def test_evict_idle(self):
+        """Test if idle clients are dropped."""
+        with patch("src.vinted_scraper_moneybear.client_registry.time.monotonic", return_value=0):
+            self.registry.get("fr")
+        with patch("src.vinted_scraper_moneybear.client_registry.time.monotonic", return_value=61):
+            self.assertEqual(self.registry.evict_idle(), 1)
+        self.assertEqual(len(self.registry), 0)
+
+    def test_refresh_cookies(self):
+        """Test if the clients get the next cookie of their pool."""
+        client = self.registry.get("fr")
+        client.cookie_pool.get_cookie.return_value = "fresh"
+        self.registry.refresh_cookies()
+        self.assertEqual(client.session_cookie, "fresh")
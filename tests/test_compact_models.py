@@ -0,0 +1,194 @@
+import copy
+import json
+import pickle
+import threading
+import unittest
+
+from src.vinted_scraper_moneybear.models import (
+    StringPool, VintedBrand, VintedImage, VintedItem, VintedUser, decode, decode_many, pack, unpack,
+)
+from src.vinted_scraper_moneybear.models.codec import msgpack
+from tests.stub_server import read_sample
+
+
+class TestCompactModels(unittest.TestCase):
+
+    def setUp(self):
+        self.data = read_sample("item_dummy")["item"]
+        self.item = VintedItem(copy.deepcopy(self.data))
+
+    def test_no_instance_dict(self):
+        """Test if the models store their fields in slots instead of a dict per instance."""
+        self.assertFalse(hasattr(self.item, "__dict__"))
+        self.assertFalse(hasattr(self.item.user, "__dict__"))
+
+    def test_fields(self):
+        """Test if the declared fields are read like before, and the unset ones are None."""
+        self.assertEqual(self.item.title, self.data["title"])
+        self.assertEqual(self.item.user.login, self.data["user"]["login"])
+        self.assertIsNone(VintedUser({"login": "seller"}).email)
+        self.assertIsNone(VintedBrand().title)
+
+    def test_overflow(self):
+        """Test if the unknown keys go to the overflow and stay readable as attributes."""
+        brand = VintedBrand({"title": "brand", "unknown_key": 1})
+        self.assertEqual(brand._extra, {"unknown_key": 1})
+        self.assertEqual(brand.unknown_key, 1)
+        self.assertIsNone(VintedBrand({"title": "brand"})._extra)
+        with self.assertRaises(AttributeError):
+            brand.missing_key
+
+        brand.new_key = 2
+        self.assertEqual(brand.new_key, 2)
+
+    def test_equality(self):
+        """Test if equality still compares the declared fields."""
+        self.assertEqual(self.item, VintedItem(copy.deepcopy(self.data)))
+        self.assertNotEqual(VintedBrand({"title": "a"}), VintedBrand({"title": "b"}))
+        self.assertEqual(VintedBrand({"title": "a"}), VintedBrand({"title": "a", "unknown_key": 1}))
+
+    def test_pickle(self):
+        """Test if the slotted models can be pickled."""
+        self.assertEqual(pickle.loads(pickle.dumps(self.item)), self.item)
+
+
+class TestLazyModels(unittest.TestCase):
+
+    def setUp(self):
+        self.data = read_sample("item_dummy")["item"]
+        self.item = VintedItem(copy.deepcopy(self.data))
+
+    def test_nested_built_on_first_read(self):
+        """Test if the nested models keep their raw data until they are read, and are then cached."""
+        self.assertIs(type(self.item._user), dict)
+        user = self.item.user
+        self.assertIsInstance(user, VintedUser)
+        self.assertIs(self.item.user, user)
+        self.assertEqual(user.login, self.data["user"]["login"])
+
+    def test_nested_lists(self):
+        """Test if the lists of nested models are built like before."""
+        self.assertEqual(len(self.item.photos), len(self.data["photos"]))
+        self.assertEqual(self.item.photos[0].thumbnails[0].url, self.data["photos"][0]["thumbnails"][0]["url"])
+
+    def test_brand(self):
+        """Test if the brand is built from brand_dto, or from brand_title in the search results."""
+        self.assertEqual(self.item.brand.title, self.data["brand_dto"]["title"])
+        search_data = read_sample("search_item_dummy")["items"][0]
+        self.assertEqual(VintedItem(search_data).brand.title, search_data["brand_title"])
+
+    def test_assignment(self):
+        """Test if an assigned value replaces the raw data."""
+        self.item.user = None
+        self.assertIsNone(self.item.user)
+
+
+class TestDecoder(unittest.TestCase):
+
+    def test_price_object(self):
+        """Test if a price object is split into the price and the currency."""
+        item = VintedItem({"price": {"amount": "4.5", "currency_code": "EUR"}, "service_fee": {"amount": "0.93"}})
+        self.assertEqual(item.price, 4.5)
+        self.assertEqual(item.currency, "EUR")
+        self.assertEqual(item.service_fee, 0.93)
+
+    def test_numeric_strings(self):
+        """Test if the numeric strings of the float fields are converted, and other values are kept."""
+        item = VintedItem({"price": "4.5", "total_item_price": "5.43", "discount_price": "n/a", "title": "1.5"})
+        self.assertEqual(item.price, 4.5)
+        self.assertEqual(item.total_item_price, 5.43)
+        self.assertEqual(item.discount_price, "n/a")
+        self.assertEqual(item.title, "1.5")
+
+    def test_decode_from_bytes(self):
+        """Test if a JSON body is decoded straight into models."""
+        body = json.dumps(read_sample("search_item_dummy")).encode()
+        items = decode_many(VintedItem, body)
+        self.assertEqual(len(items), 1)
+        self.assertEqual(items[0], VintedItem(read_sample("search_item_dummy")["items"][0]))
+        item = decode(VintedItem, json.dumps(read_sample("item_dummy")).encode(), key="item")
+        self.assertEqual(item.title, read_sample("item_dummy")["item"]["title"])
+
+
+class TestStringPool(unittest.TestCase):
+
+    def test_shared_values(self):
+        """Test if the low cardinality fields of items decoded apart share their strings."""
+        body = json.dumps({"items": [{
+            "status": "Very good", "city": "Paris", "title": "Shoes",
+            "price": {"amount": "4.5", "currency_code": "EUR"},
+            "item_box": {"first_line": "Nike", "second_line": "Very good"},
+            "user": {"country_title": "France"},
+        }]}).encode()
+        first, second = decode_many(VintedItem, body)[0], decode_many(VintedItem, body)[0]
+        self.assertIs(first.status, second.status)
+        self.assertIs(first.city, second.city)
+        self.assertIs(first.currency, second.currency)
+        self.assertIs(first.item_box["second_line"], second.status)
+        self.assertIs(first.user.country_title, second.user.country_title)
+        self.assertIsNot(first.title, second.title)
+
+    def test_bounded(self):
+        """Test if the pool stops growing at its max size and counts its hits and misses."""
+        pool = StringPool(max_size=2)
+        for value in ["a", "b", "c", "a", "c", 1]:
+            pool.intern("".join(value) if isinstance(value, str) else value)
+        self.assertEqual(len(pool), 2)
+        self.assertEqual(pool.stats(), {"size": 2, "max_size": 2, "hits": 1, "misses": 4, "hit_rate": 0.2})
+        pool.clear()
+        self.assertEqual(pool.stats()["size"], 0)
+        self.assertEqual(pool.stats()["hits"], 0)
+
+
+    def test_thread_safe_stats(self):
+        """Test if the hits and misses of concurrent decodes are all counted."""
+        pool = StringPool()
+        values = [str(index % 50) for index in range(2_000)]
+
+        def work():
+            for value in values:
+                pool.intern("".join(value))
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = pool.stats()
+        self.assertEqual(stats["size"], 50)
+        self.assertEqual(stats["misses"], 50)
+        self.assertEqual(stats["hits"] + stats["misses"], 8 * len(values))
+
+@unittest.skipIf(msgpack is None, "msgpack is not installed")
+class TestCodec(unittest.TestCase):
+
+    def setUp(self):
+        self.data = read_sample("item_dummy")["item"]
+
+    def test_round_trip(self):
+        """Test if an item, its overflow and its nested models survive the binary codec."""
+        item = VintedItem(copy.deepcopy(self.data))
+        item.extra_key = "kept"
+        decoded = unpack(pack(item))
+        self.assertEqual(decoded, item)
+        self.assertEqual(decoded.extra_key, "kept")
+        self.assertEqual(decoded.user, VintedUser(self.data["user"]))
+        self.assertEqual(decoded.photos[0].thumbnails, item.photos[0].thumbnails)
+
+    def test_lazy_fields_stay_lazy(self):
+        """Test if the nested models never read are stored as their JSON data and built on first read."""
+        decoded = unpack(pack(VintedItem(copy.deepcopy(self.data))))
+        self.assertEqual(decoded._user, self.data["user"])
+        self.assertIsInstance(decoded.user, VintedUser)
+
+    def test_containers(self):
+        """Test if lists and dicts of models are encoded, from any buffer."""
+        value = {"items": [VintedItem({"id": 1, "price": 4.5}), None], "image": VintedImage({"url": "a.jpg"})}
+        decoded = unpack(memoryview(pack(value)))
+        self.assertEqual(decoded, value)
+        self.assertIsInstance(decoded["items"][0].price, float)
+
+    def test_unknown_type(self):
+        """Test if objects that are not models are refused."""
+        with self.assertRaises(TypeError):
+            pack(object())
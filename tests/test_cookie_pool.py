@@ -0,0 +1,95 @@
+import itertools
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+from src.vinted_scraper_moneybear import VintedWrapper
+from src.vinted_scraper_moneybear.cookie_pool import CookiePool
+from tests.stub_server import StubVinted
+
+class TestCookiePool(unittest.TestCase):
+
+    def setUp(self):
+        self.cookie_manager = MagicMock()
+        counter = itertools.count(1)
+        self.cookie_manager.get_random_cookie.side_effect = lambda: f"cookie-{next(counter)}"
+        self.pool = CookiePool("https://www.vinted.fr", size=2, max_age=100, refresh_margin=0.2,
+                               cookie_manager=self.cookie_manager)
+
+    def test_round_robin(self):
+        """Test if warm cookies are handed out round-robin."""
+        self.assertEqual(self.pool.warm(), 2)
+        self.assertEqual([self.pool.get_cookie() for _ in range(4)], ["cookie-1", "cookie-2", "cookie-1", "cookie-2"])
+        self.assertEqual(self.cookie_manager.get_random_cookie.call_count, 2)
+
+    def test_fetch_when_empty(self):
+        """Test if an empty pool fetches a cookie on the caller's thread."""
+        self.assertEqual(self.pool.get_cookie(), "cookie-1")
+        self.assertEqual(len(self.pool), 1)
+
+    def test_refresh_before_expiry(self):
+        """Test if cookies close to their expiry are replaced."""
+        with patch("src.vinted_scraper_moneybear.cookie_pool.time.monotonic", return_value=0):
+            self.pool.warm()
+        with patch("src.vinted_scraper_moneybear.cookie_pool.time.monotonic", return_value=85):
+            self.assertEqual(self.pool.refresh(), 2)
+            self.assertEqual(sorted(cookie for cookie, _ in self.pool._cookies), ["cookie-3", "cookie-4"])
+
+    def test_evicts_oldest(self):
+        """Test if a full pool evicts its oldest cookie, not the next one of the round-robin."""
+        for now in (0, 40):
+            with patch("src.vinted_scraper_moneybear.cookie_pool.time.monotonic", return_value=now):
+                self.pool._fetch()
+        with patch("src.vinted_scraper_moneybear.cookie_pool.time.monotonic", return_value=50):
+            # The round-robin moves cookie-2, the newer one, to the front
+            self.assertEqual(self.pool.get_cookie(), "cookie-1")
+            self.pool._fetch()
+            self.assertEqual(sorted(cookie for cookie, _ in self.pool._cookies), ["cookie-2", "cookie-3"])
+
+    def test_invalidate(self):
+        """Test if a rejected cookie is not handed out again."""
+        self.pool.warm()
+        self.pool.invalidate("cookie-1")
+        self.assertEqual({self.pool.get_cookie() for _ in range(3)}, {"cookie-2"})
+
+    def test_rejected_thread_safe(self):
+        """Test if the rejected cookies are read safely while other threads reject cookies."""
+        errors = []
+
+        def reject(offset):
+            for index in range(2_000):
+                self.pool.invalidate(f"rejected-{offset}-{index}")
+
+        def check():
+            try:
+                for index in range(2_000):
+                    self.pool.rejected(f"rejected-0-{index}")
+            except RuntimeError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=reject, args=(offset,)) for offset in range(4)]
+        threads += [threading.Thread(target=check) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        # Only the latest rejected cookies are remembered
+        self.pool.invalidate("cookie-1")
+        self.assertTrue(self.pool.rejected("cookie-1"))
+        self.assertFalse(self.pool.rejected("rejected-0-0"))
+        self.assertFalse(self.pool.rejected(None))
+
+    def test_wrapper_uses_pool(self):
+        """Test if a wrapper takes its cookie from the pool and swaps it after a 401."""
+        self.pool.warm()
+        with StubVinted() as stub:
+            wrapper = VintedWrapper(stub.url, cookie_pool=self.pool)
+            self.assertEqual(wrapper.session_cookie, "cookie-1")
+            stub.statuses = [401]
+            wrapper._curl("/catalog/items", params={"page": 1})
+            # The shared wrapper is not changed, its next requests start with the next cookie of the pool
+            self.assertEqual(wrapper.session_cookie, "cookie-1")
+            self.assertTrue(self.pool.rejected("cookie-1"))
+            self.assertEqual(wrapper._current_cookie(), "cookie-2")
+            # No homepage request, the cookies come from the pool
+            self.assertNotIn("/", stub.requests)
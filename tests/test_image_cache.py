@@ -0,0 +1,172 @@
+import io
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from src.vinted_scraper_moneybear.image_cache import Image, ImageCache, media_type, url_key
+from src.vinted_scraper_moneybear.result_cache import SQLiteCache
+
+
+def response(content, status_code=200):
+    result = MagicMock()
+    result.content = content
+    result.status_code = status_code
+    return result
+
+
+class FakeSessions:
+    """A SessionManager replacement whose session serves `images`, URL -> bytes."""
+
+    def __init__(self, images, delay=0.0):
+        self.images = images
+        self.delay = delay
+        self.calls = []
+        self.session = MagicMock()
+        self.session.get.side_effect = self.get
+
+    def get(self, url, timeout=None):
+        self.calls.append((url, timeout))
+        time.sleep(self.delay)
+        if url not in self.images:
+            return response(b"", 404)
+        return response(self.images[url])
+
+    def get_session(self, baseurl, proxies=None):
+        return self.session
+
+
+class TestImageCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.sessions = FakeSessions({"https://img/a.jpg": b"a" * 10, "https://img/b.jpg": b"b" * 10,
+                                      "https://img/a_copy.jpg": b"a" * 10})
+
+    def cache(self, **kwargs):
+        return ImageCache(self.directory.name, session_manager=self.sessions, **kwargs)
+
+    def test_downloaded_once(self):
+        """Test if an image is downloaded once, with a timeout, and then read from the disk."""
+        cache = self.cache(timeout=5)
+        self.assertEqual(cache.get("https://img/a.jpg"), b"a" * 10)
+        self.assertEqual(cache.get("https://img/a.jpg"), b"a" * 10)
+        self.assertEqual(self.sessions.calls, [("https://img/a.jpg", 5)])
+        self.assertEqual(cache.stats()["hits"], 1)
+        # A new cache, like after a restart, reads the same store
+        self.assertEqual(self.cache().get("https://img/a.jpg"), b"a" * 10)
+        self.assertEqual(len(self.sessions.calls), 1)
+
+    def test_content_addressed(self):
+        """Test if two URLs of the same content share a single stored file."""
+        cache = self.cache()
+        cache.get("https://img/a.jpg")
+        cache.get("https://img/a_copy.jpg")
+        self.assertEqual(cache.stats()["contents"], 1)
+        self.assertEqual(cache.stats()["bytes"], 10)
+
+    def test_expired(self):
+        """Test if an image is downloaded again once its entry is older than the ttl."""
+        cache = self.cache(ttl=0)
+        cache.get("https://img/a.jpg")
+        time.sleep(0.01)
+        cache.get("https://img/a.jpg")
+        self.assertEqual(len(self.sessions.calls), 2)
+
+    def test_byte_budget(self):
+        """Test if the least recently used contents are removed once over the budget."""
+        cache = self.cache(max_bytes=15)
+        cache.get("https://img/a.jpg")
+        cache.get("https://img/b.jpg")
+        self.assertEqual(cache.stats()["bytes"], 10)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        stored = [name for _, _, names in os.walk(os.path.join(self.directory.name, "contents")) for name in names]
+        self.assertEqual(len(stored), 1)
+        # The evicted image is downloaded again
+        cache.get("https://img/a.jpg")
+        self.assertEqual(len(self.sessions.calls), 3)
+
+    def test_shared_budget(self):
+        """Test if the budget holds for the whole directory when two workers store images in it."""
+        first, second = self.cache(max_bytes=15), self.cache(max_bytes=15, scan_interval=0)
+        first.get("https://img/a.jpg")
+        # The second worker only counts the image of the first one on disk
+        second.get("https://img/b.jpg")
+        stored = [name for _, _, names in os.walk(os.path.join(self.directory.name, "contents")) for name in names]
+        self.assertEqual(len(stored), 1)
+        self.assertEqual(second.stats()["bytes"], 10)
+        self.assertEqual(second.stats()["evictions"], 1)
+        # The image the first worker stored is gone for it too
+        first.get("https://img/a.jpg")
+        self.assertEqual(len(self.sessions.calls), 3)
+
+    def test_failed_download(self):
+        """Test if a failed download returns None and is not stored."""
+        cache = self.cache()
+        self.assertIsNone(cache.get("https://img/missing.jpg"))
+        self.assertIsNone(cache.get(""))
+        self.assertEqual(cache.stats()["contents"], 0)
+
+    def test_single_flight(self):
+        """Test if concurrent requests for the same URL share a single download."""
+        self.sessions.delay = 0.1
+        cache = self.cache()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get("https://img/a.jpg"))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [b"a" * 10] * 5)
+        self.assertEqual(len(self.sessions.calls), 1)
+
+    def test_get_many(self):
+        """Test if several images are fetched at once, skipping the duplicates and empty URLs."""
+        cache = self.cache()
+        result = cache.get_many(["https://img/a.jpg", "https://img/b.jpg", "https://img/a.jpg", None])
+        self.assertEqual(result, {"https://img/a.jpg": b"a" * 10, "https://img/b.jpg": b"b" * 10})
+        self.assertEqual(len(self.sessions.calls), 2)
+
+    def test_fetch_key(self):
+        """Test if a registered URL is fetched by its key, with the digest of its content, and others are not."""
+        cache = self.cache()
+        key = cache.register("https://img/a.jpg")
+        self.assertEqual(key, url_key("https://img/a.jpg"))
+        self.assertEqual(self.sessions.calls, [])
+        digest, content = cache.fetch_key(key)
+        self.assertEqual(content, b"a" * 10)
+        self.assertEqual(digest, cache.fetch("https://img/a_copy.jpg")[0])
+        self.assertIsNone(cache.fetch_key(url_key("https://img/b.jpg")))
+        self.assertIsNone(cache.fetch_key("../urls"))
+
+    def test_media_type(self):
+        """Test if the media type is read from the first bytes."""
+        self.assertEqual(media_type(b"\xff\xd8\xff\xe0rest"), "image/jpeg")
+        self.assertEqual(media_type(b"RIFF\x00\x00\x00\x00WEBPVP8 "), "image/webp")
+        self.assertEqual(media_type(b"text"), "application/octet-stream")
+
+    @unittest.skipIf(Image is None, "Pillow is not installed")
+    def test_resized(self):
+        """Test if an image is downscaled to the next width once, and smaller images are kept."""
+        output = io.BytesIO()
+        Image.new("RGB", (600, 800)).save(output, format="JPEG")
+        cache = self.cache()
+        digest, resized = cache.resized("original", output.getvalue(), 200)
+        with Image.open(io.BytesIO(resized)) as image:
+            self.assertEqual((image.width, image.height, image.format), (256, 341, "JPEG"))
+        self.assertEqual(cache.resized("original", output.getvalue(), 250), (digest, resized))
+        self.assertEqual(cache.resized("original", output.getvalue(), 1000), ("original", output.getvalue()))
+
+    def test_shared_index(self):
+        """Test if the caches of two workers sharing an index download and register an image once."""
+        path = os.path.join(self.directory.name, "index.sqlite3")
+        first, second = (self.cache(index=SQLiteCache(max_bytes=100_000, ttl=60, name="images", path=path))
+                         for _ in range(2))
+        key = first.register("https://img/a.jpg")
+        self.assertEqual(first.get("https://img/a.jpg"), b"a" * 10)
+        self.assertEqual(second.fetch_key(key)[1], b"a" * 10)
+        self.assertEqual(len(self.sessions.calls), 1)
+        self.assertFalse(os.path.exists(os.path.join(self.directory.name, "urls")))
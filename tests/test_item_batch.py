@@ -0,0 +1,92 @@
+import unittest
+from unittest.mock import patch
+
+from src.vinted_scraper_moneybear import VintedScraper
+from src.vinted_scraper_moneybear.models import VintedItem, VintedItemBatch
+from src.vinted_scraper_moneybear.models.vintedItemBatch import np
+
+
+def raw_item(item_id, price, brand, favourites):
+    return {
+        "id": item_id,
+        "title": f"item {item_id}",
+        "price": {"amount": str(price), "currency_code": "EUR"},
+        "brand_title": brand,
+        "favourite_count": favourites,
+        "user": {"login": f"user{item_id % 2}", "profile_url": "url"},
+    }
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestVintedItemBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.items = [
+            raw_item(1, 10.5, "Nike", 3),
+            raw_item(2, 4, "Adidas", 10),
+            raw_item(3, 25, "Nike", None),
+            raw_item(4, 7.25, None, 1),
+        ]
+        self.batch = VintedItemBatch.from_items(self.items)
+
+    def test_columns(self):
+        """Test if the scalar fields are stored as arrays and the strings dictionary-encoded."""
+        self.assertEqual(self.batch["id"].tolist(), [1, 2, 3, 4])
+        self.assertEqual(self.batch["price"].tolist(), [10.5, 4.0, 25.0, 7.25])
+        self.assertTrue(np.isnan(self.batch["favourite_count"][2]))
+        self.assertEqual(self.batch["brand"].categories, ("Nike", "Adidas"))
+        self.assertEqual(self.batch["brand"].decode(), ["Nike", "Adidas", "Nike", None])
+        self.assertEqual(self.batch["currency"].decode(), ["EUR"] * 4)
+
+    def test_filter(self):
+        """Test filtering with a vectorised mask."""
+        cheap_nike = self.batch.filter((self.batch["price"] < 20) & (self.batch["brand"] == "Nike"))
+        self.assertEqual(cheap_nike["id"].tolist(), [1])
+        self.assertEqual(self.batch.filter(self.batch["brand"] == "Puma")["id"].tolist(), [])
+        self.assertEqual(self.batch.filter(self.batch["brand"].isin(["Adidas", None]))["id"].tolist(), [2, 4])
+
+    def test_sort_and_top_k(self):
+        """Test sorting and top-k, with the missing values last."""
+        self.assertEqual(self.batch.sort("price")["id"].tolist(), [2, 4, 1, 3])
+        self.assertEqual(self.batch.sort("favourite_count", descending=True)["id"].tolist(), [2, 1, 4, 3])
+        self.assertEqual(self.batch.sort("brand")["id"].tolist(), [2, 1, 3, 4])
+        self.assertEqual(self.batch.top_k("price", 2)["id"].tolist(), [3, 1])
+        self.assertEqual(self.batch.top_k("price", 2, largest=False)["id"].tolist(), [2, 4])
+        for k in (0, -1):
+            top = self.batch.top_k("price", k)
+            self.assertEqual(len(top), 0)
+            self.assertEqual(top["price"].tolist(), [])
+
+    def test_rows_built_on_access(self):
+        """Test if the rows are only built into VintedItems when they are read."""
+        top = self.batch.top_k("price", 1)
+        self.assertIs(type(top._rows[0]), dict)
+        item = top[0]
+        self.assertIsInstance(item, VintedItem)
+        self.assertEqual(item.title, "item 3")
+        self.assertIs(top[0], item)
+        self.assertEqual([item.id for item in self.batch.to_items()], [1, 2, 3, 4])
+
+    def test_from_models(self):
+        """Test if a batch built from VintedItems has the same columns."""
+        batch = VintedItemBatch.from_items([VintedItem(item) for item in self.items])
+        self.assertEqual(batch["price"].tolist(), self.batch["price"].tolist())
+        self.assertEqual(batch["user_login"].decode(), self.batch["user_login"].decode())
+
+    def test_scraper_search(self):
+        """Test if VintedScraper.search can return a batch."""
+        scraper = VintedScraper("https://www.vinted.fr", session_cookie="cookie")
+        pages = {1: {"items": self.items}, 2: {"items": []}}
+        with patch.object(scraper, "_curl", side_effect=lambda endpoint, params: pages[params["page"]]):
+            batch = scraper.search({"search_text": "game"}, page_limit=2, as_batch=True)
+        self.assertIsInstance(batch, VintedItemBatch)
+        self.assertEqual(len(batch), 4)
+
+    def test_scraper_search_error(self):
+        """Test if a failed search returns the batch of the items fetched before the error."""
+        scraper = VintedScraper("https://www.vinted.fr", session_cookie="cookie")
+        with patch.object(scraper, "_curl", side_effect=RuntimeError("connection reset")):
+            batch = scraper.search({"search_text": "game"}, page_limit=2, as_batch=True)
+        self.assertIsInstance(batch, VintedItemBatch)
+        self.assertEqual(len(batch), 0)
+        self.assertEqual(batch["price"].tolist(), [])
@@ -0,0 +1,86 @@
+import unittest
+from unittest.mock import patch
+from src.vinted_scraper_moneybear import VintedScraper, VintedWrapper
+from src.vinted_scraper_moneybear.projection import Projection
+
+BASE_URL = "https://www.vinted.fr"
+
+
+def raw_item(item_id):
+    return {
+        "id": item_id,
+        "title": f"Item {item_id}",
+        "price": {"amount": "4.5", "currency_code": "EUR"},
+        "description": "A long description",
+        "photo": {"url": "photo.jpg", "thumbnails": [{"url": "small.jpg"}, {"url": "big.jpg"}]},
+        "user": {"login": "seller", "profile_url": "https://www.vinted.fr/member/1", "photo": {"url": "me.jpg"}},
+    }
+
+
+class TestProjection(unittest.TestCase):
+
+    def test_apply(self):
+        """Test if only the projected paths are kept, in nested objects too."""
+        projection = Projection(["title", "price", "photo.url", "user.login"])
+        item = raw_item(1)
+        self.assertEqual(projection.apply(item), {
+            "title": "Item 1",
+            "price": {"amount": "4.5", "currency_code": "EUR"},
+            "photo": {"url": "photo.jpg"},
+            "user": {"login": "seller"},
+        })
+        # The raw item is not changed
+        self.assertEqual(item, raw_item(1))
+
+    def test_apply_lists(self):
+        """Test if a path into a list of objects keeps that key of every object."""
+        projection = Projection(["photo.thumbnails.url"])
+        self.assertEqual(projection.apply(raw_item(1)), {"photo": {"thumbnails": [{"url": "small.jpg"}, {"url": "big.jpg"}]}})
+
+    def test_whole_value_wins(self):
+        """Test if a path inside a value that is kept whole doesn't narrow it."""
+        projection = Projection(["user", "user.login"])
+        self.assertEqual(projection.apply(raw_item(1))["user"], raw_item(1)["user"])
+        self.assertIn("user.photo.url", projection)
+        self.assertNotIn("photo.url", projection)
+
+    def test_of(self):
+        """Test if no fields means no projection and a projection is used as is."""
+        projection = Projection(["title"])
+        self.assertIsNone(Projection.of(None))
+        self.assertIs(Projection.of(projection), projection)
+        self.assertEqual(Projection.of(["title"]).fields, ("title",))
+
+
+class TestSearchProjection(unittest.TestCase):
+
+    def setUp(self):
+        self.items = [raw_item(1), raw_item(2)]
+        patcher = patch.object(VintedWrapper, "_curl", return_value={"items": self.items})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_search_fields(self):
+        """Test if the search only keeps the fields and leaves the raw items alone."""
+        items = VintedWrapper(BASE_URL, session_cookie="cookie").search(page_limit=1, fields=["id", "user.login"])["all_items"]
+        self.assertEqual(items, [{"id": 1, "user": {"login": "seller"}}, {"id": 2, "user": {"login": "seller"}}])
+        self.assertNotIn("feedback_url", self.items[0]["user"])
+
+    def test_feedback_url(self):
+        """Test if the feedback URL is only added when it is asked for."""
+        wrapper = VintedWrapper(BASE_URL, session_cookie="cookie")
+        items = wrapper.search(page_limit=1, fields=["user.feedback_url"])["all_items"]
+        self.assertEqual(items[0], {"user": {"feedback_url": "https://www.vinted.fr/member/1?tab=feedback"}})
+        items = wrapper.search(page_limit=1, fields=["user"])["all_items"]
+        self.assertEqual(items[0]["user"]["feedback_url"], "https://www.vinted.fr/member/1?tab=feedback")
+        self.assertNotIn("feedback_url", self.items[0]["user"])
+
+    def test_scraper_fields(self):
+        """Test if the items of the scraper only have the projected fields."""
+        items = VintedScraper(BASE_URL, session_cookie="cookie").search(page_limit=1, fields=["id", "title", "price", "user.login"])
+        self.assertEqual(items[0].title, "Item 1")
+        self.assertEqual(items[0].price, 4.5)
+        self.assertEqual(items[0].currency, "EUR")
+        self.assertEqual(items[0].user.login, "seller")
+        self.assertIsNone(items[0].description)
+        self.assertIsNone(items[0].photos)
@@ -0,0 +1,56 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.vinted_scraper_moneybear.utils import ProxyManager
+
+FAST = {'http': 'http://fast:80', 'https': 'http://fast:80'}
+SLOW = {'http': 'http://slow:80', 'https': 'http://slow:80'}
+
+class TestProxyHealth(unittest.TestCase):
+
+    def setUp(self):
+        # An absolute path is used as is by ProxyManager
+        handle, self.proxies_file = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(handle, "w") as file:
+            json.dump([FAST, SLOW], file)
+        self.manager = ProxyManager(proxies_file=self.proxies_file, failure_threshold=2, quarantine_seconds=60)
+
+    def tearDown(self):
+        os.remove(self.proxies_file)
+
+    def test_weighted_by_score(self):
+        """Test if fast and reliable proxies are picked more often."""
+        for _ in range(5):
+            self.manager.record_success(FAST, 0.1)
+            self.manager.record_success(SLOW, 2.0)
+        self.assertGreater(self.manager.score(FAST), self.manager.score(SLOW))
+        picks = [self.manager.get_random_proxy() for _ in range(200)]
+        self.assertGreater(picks.count(FAST), picks.count(SLOW))
+
+    def test_ewma_latency(self):
+        """Test if the latency is an exponentially weighted moving average."""
+        self.manager.record_success(FAST, 1.0)
+        self.manager.record_success(FAST, 2.0)
+        self.assertAlmostEqual(self.manager.health(FAST).latency, 1.3)
+
+    def test_quarantine(self):
+        """Test if a failing proxy is quarantined and released after the cooldown."""
+        with patch("src.vinted_scraper_moneybear.utils.time.monotonic", return_value=0):
+            self.manager.record_failure(SLOW)
+            self.manager.record_failure(SLOW)
+            self.assertEqual(self.manager.score(SLOW), 0.0)
+            self.assertTrue(all(self.manager.get_random_proxy() == FAST for _ in range(20)))
+        with patch("src.vinted_scraper_moneybear.utils.time.monotonic", return_value=61):
+            self.assertGreater(self.manager.score(SLOW), 0.0)
+
+    def test_probe_releases_recovered_proxy(self):
+        """Test if the prober releases a quarantined proxy that works again."""
+        self.manager.record_failure(SLOW)
+        self.manager.record_failure(SLOW)
+        with patch("src.vinted_scraper_moneybear.utils.requests.get") as mock_get:
+            mock_get.return_value.status_code = 200
+            self.manager.probe("https://www.vinted.com")
+        mock_get.assert_called_once()
+        self.assertGreater(self.manager.score(SLOW), 0.0)
@@ -0,0 +1,54 @@
+import unittest
+from unittest.mock import patch
+from src.vinted_scraper_moneybear.rate_limiter import RateLimiter
+
+class TestRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self.limiter = RateLimiter(rate=2.0, burst=2.0, min_rate=0.5, max_rate=3.0, increase=0.5, decrease=0.5)
+        self.key = RateLimiter.key("https://www.vinted.fr/api/v2/catalog/items", None)
+        self.clock = patch("src.vinted_scraper_moneybear.rate_limiter.time.monotonic", return_value=100.0)
+        self.clock.start()
+
+    def tearDown(self):
+        self.clock.stop()
+
+    def test_key(self):
+        """Test if buckets are scoped per domain and per proxy."""
+        proxies = {'https': 'http://proxy:80'}
+        self.assertEqual(self.key, RateLimiter.key("https://www.vinted.fr", None))
+        self.assertNotEqual(RateLimiter.key("https://www.vinted.fr", proxies), self.key)
+        self.assertNotEqual(RateLimiter.key("https://www.vinted.de", None), self.key)
+
+    def test_reserve(self):
+        """Test if requests beyond the burst have to wait."""
+        self.assertEqual(self.limiter.reserve(self.key), 0.0)
+        self.assertEqual(self.limiter.reserve(self.key), 0.0)
+        self.assertAlmostEqual(self.limiter.reserve(self.key), 0.5)
+        self.assertAlmostEqual(self.limiter.reserve(self.key), 1.0)
+
+    def test_aimd(self):
+        """Test if the rate backs off multiplicatively and probes back up additively."""
+        self.limiter.record(self.key, 429)
+        self.assertEqual(self.limiter.rate(self.key), 1.0)
+        # Throttled responses of the same burst are ignored
+        self.limiter.record(self.key, 403)
+        self.assertEqual(self.limiter.rate(self.key), 1.0)
+        self.limiter.record(self.key, 200)
+        self.assertEqual(self.limiter.rate(self.key), 1.5)
+        for _ in range(10):
+            self.limiter.record(self.key, 200)
+        self.assertEqual(self.limiter.rate(self.key), 3.0)
+
+    def test_evict_idle(self):
+        """Test if the buckets idle for longer than the timeout are dropped, when a new one is needed too."""
+        limiter = RateLimiter(idle_timeout=60)
+        limiter.reserve(self.key)
+        self.assertEqual(limiter.evict_idle(), 0)
+        proxy_key = RateLimiter.key("https://www.vinted.fr", {'https': 'http://proxy:80'})
+        with patch("src.vinted_scraper_moneybear.rate_limiter.time.monotonic", return_value=161.0):
+            limiter.reserve(proxy_key)
+            self.assertEqual(len(limiter), 1)
+        with patch("src.vinted_scraper_moneybear.rate_limiter.time.monotonic", return_value=300.0):
+            self.assertEqual(limiter.evict_idle(), 1)
+            self.assertEqual(len(limiter), 0)
@@ -0,0 +1,242 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from src.vinted_scraper_moneybear.result_cache import MISSING, ResultCache, SQLiteCache, memoize, sizeof
+
+
+class TestResultCache(unittest.TestCase):
+
+    def test_get_set(self):
+        """Test if a value is cached, None included, and the hits and misses are counted."""
+        cache = ResultCache(max_bytes=10_000, ttl=60)
+        self.assertIs(cache.get("key"), MISSING)
+        cache.set("key", None)
+        self.assertIsNone(cache.get("key"))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+        self.assertEqual(cache.stats()["hit_rate"], 0.5)
+
+    def test_byte_budget(self):
+        """Test if the least recently used entries are evicted once over the byte budget."""
+        cache = ResultCache(max_bytes=300, ttl=60, sizeof=lambda value: 50)
+        for key in "abc":
+            cache.set(key, key)
+        cache.get("a")
+        cache.set("d", "d")
+        self.assertEqual(cache.get("b"), MISSING)
+        self.assertEqual(cache.get("a"), "a")
+        self.assertEqual(cache.stats()["bytes"], 300)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_too_large(self):
+        """Test if an entry larger than the budget is not stored."""
+        cache = ResultCache(max_bytes=100, ttl=60)
+        cache.set("key", "x" * 1000)
+        self.assertEqual(len(cache), 0)
+
+    def test_expired(self):
+        """Test if an entry expires after the ttl."""
+        cache = ResultCache(max_bytes=10_000, ttl=0.01)
+        cache.set("key", "value")
+        time.sleep(0.02)
+        self.assertIs(cache.get("key"), MISSING)
+        self.assertEqual(cache.stats()["expirations"], 1)
+        self.assertEqual(cache.stats()["bytes"], 0)
+
+    def test_sizeof(self):
+        """Test if the size of nested values is counted."""
+        self.assertGreater(sizeof([{"photo": "x" * 1000}]), 1000)
+
+    def test_thread_safe(self):
+        """Test if concurrent sets and gets keep the byte count consistent."""
+        cache = ResultCache(max_bytes=2_000, ttl=60, sizeof=lambda value: 10)
+
+        def work(offset):
+            for index in range(500):
+                cache.set(offset + index % 150, index)
+                cache.get(offset + index % 50)
+
+        threads = [threading.Thread(target=work, args=(offset * 1000,)) for offset in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(cache.stats()["bytes"], len(cache) * 20)
+        self.assertLessEqual(cache.stats()["bytes"], 2_000)
+
+
+class TestMemoize(unittest.TestCase):
+
+    def test_memoize(self):
+        """Test if the function is only called once per arguments, with its own cache."""
+        calls = []
+
+        @memoize(ResultCache(max_bytes=10_000, ttl=60, name="double"))
+        def double(value, factor=2):
+            calls.append(value)
+            return value * factor
+
+        self.assertEqual(double(2), 4)
+        self.assertEqual(double(2), 4)
+        self.assertEqual(double(2, factor=3), 6)
+        self.assertEqual(calls, [2, 2])
+        self.assertEqual(double.cache.stats()["hits"], 1)
+        self.assertEqual(double.__name__, "double")
+
+    def test_cache_if(self):
+        """Test if the results refused by cache_if are not cached."""
+        calls = []
+
+        @memoize(ResultCache(max_bytes=10_000, ttl=60), cache_if=bool)
+        def search(query):
+            calls.append(query)
+            return []
+
+        search("shoes")
+        search("shoes")
+        self.assertEqual(calls, ["shoes", "shoes"])
+
+
+class TestStaleWhileRevalidate(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+        self.fail_with = None
+
+        @memoize(ResultCache(max_bytes=10_000, ttl=0.5), stale_after=0.05, cache_if=bool)
+        def search(query):
+            self.release.wait(5)
+            if self.fail_with is not None:
+                raise self.fail_with
+            self.calls.append(query)
+            return [query, len(self.calls)]
+
+        self.search = search
+
+    def wait_for_refresh(self):
+        deadline = time.monotonic() + 5
+        while self.search.refreshes == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_stale_served_and_refreshed_once(self):
+        """Test if a stale result is served right away while a single background call refreshes it."""
+        self.assertEqual(self.search("shoes"), ["shoes", 1])
+        time.sleep(0.06)
+        self.release.clear()
+        started = time.monotonic()
+        results = [self.search("shoes") for _ in range(5)]
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(results, [["shoes", 1]] * 5)
+        self.release.set()
+        self.wait_for_refresh()
+        self.assertEqual(self.calls, ["shoes", "shoes"])
+        self.assertEqual(self.search("shoes"), ["shoes", 2])
+        self.assertEqual(self.search.stale_hits, 5)
+
+    def test_max_staleness(self):
+        """Test if a result older than the ttl of the cache is not served."""
+        self.search("shoes")
+        time.sleep(0.55)
+        self.assertEqual(self.search("shoes"), ["shoes", 2])
+        self.assertEqual(self.search.stale_hits, 0)
+
+    def test_failed_refresh(self):
+        """Test if the stale result is kept when the refresh fails."""
+        self.search("shoes")
+        time.sleep(0.06)
+        self.fail_with = RuntimeError("upstream down")
+        self.assertEqual(self.search("shoes"), ["shoes", 1])
+        time.sleep(0.1)
+        self.assertEqual(self.search.refreshes, 0)
+        self.assertEqual(self.search("shoes"), ["shoes", 1])
+
+
+class TestSQLiteCache(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "cache.sqlite3")
+
+    def test_shared(self):
+        """Test if an entry set through one cache is read through another one on the same file."""
+        writer = SQLiteCache(max_bytes=100_000, ttl=60, name="search", path=self.path)
+        reader = SQLiteCache(max_bytes=100_000, ttl=60, name="search", path=self.path)
+        value = [{"responses_count": 2}, {"title": "Shoes", "price": "4.5", "photo": None}]
+        writer.set(("fr", "shoes", 1, 2), value)
+        self.assertEqual(reader.get(("fr", "shoes", 1, 2)), value)
+        self.assertIs(reader.get(("fr", "boots", 1, 2)), MISSING)
+        self.assertEqual(reader.stats()["hits"], 1)
+        self.assertEqual(reader.stats()["entries"], 1)
+
+    def test_namespaces(self):
+        """Test if caches of different names don't see or clear each other's entries."""
+        first = SQLiteCache(max_bytes=100_000, ttl=60, name="first", path=self.path)
+        second = SQLiteCache(max_bytes=100_000, ttl=60, name="second", path=self.path)
+        first.set("key", 1)
+        self.assertIs(second.get("key"), MISSING)
+        second.set("key", 2)
+        first.clear()
+        self.assertEqual(second.get("key"), 2)
+
+    def test_expired(self):
+        """Test if an entry expires after the ttl."""
+        cache = SQLiteCache(max_bytes=100_000, ttl=0.01, path=self.path)
+        cache.set("key", "value")
+        time.sleep(0.02)
+        self.assertIs(cache.get("key"), MISSING)
+
+    def test_byte_budget(self):
+        """Test if the entries closest to their expiry are evicted once over the budget."""
+        cache = SQLiteCache(max_bytes=250, ttl=60, path=self.path)
+        for key in "abc":
+            cache.set(key, "x" * 100)
+        self.assertIs(cache.get("a"), MISSING)
+        self.assertEqual(cache.get("c"), "x" * 100)
+        self.assertLessEqual(cache.stats()["bytes"], 250)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_memoize(self):
+        """Test if a memoized function reads the results of another process from the file."""
+        calls = []
+
+        def search(query):
+            calls.append(query)
+            return [query]
+
+        first = memoize(SQLiteCache(max_bytes=100_000, ttl=60, name="search", path=self.path))(search)
+        second = memoize(SQLiteCache(max_bytes=100_000, ttl=60, name="search", path=self.path))(search)
+        self.assertEqual(first("shoes"), ["shoes"])
+        self.assertEqual(second("shoes"), ["shoes"])
+        self.assertEqual(calls, ["shoes"])
+
+    def test_single_refresh_per_node(self):
+        """Test if a single worker refreshes a stale entry shared by several of them."""
+        calls = []
+        release = threading.Event()
+
+        def search(query):
+            calls.append(query)
+            if len(calls) > 1:
+                release.wait(5)
+            return [query, len(calls)]
+
+        workers = [memoize(SQLiteCache(max_bytes=100_000, ttl=60, name="search", path=self.path),
+                           stale_after=0.05)(search) for _ in range(3)]
+        self.assertEqual(workers[0]("shoes"), ["shoes", 1])
+        time.sleep(0.06)
+        self.assertEqual([worker("shoes") for worker in workers], [["shoes", 1]] * 3)
+        release.set()
+        deadline = time.monotonic() + 5
+        while sum(worker.refreshes for worker in workers) == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(calls, ["shoes", "shoes"])
+        # The claim is released with the refresh
+        while not workers[0].cache.claim((("shoes",), ()), 1) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertLess(time.monotonic(), deadline)
@@ -0,0 +1,144 @@
+import unittest
+from unittest.mock import patch
+from src.vinted_scraper_moneybear import VintedWrapper
+from src.vinted_scraper_moneybear.retry import CircuitBreaker, RetryBudget, RetryEngine, breaker_keys, parse_retry_after
+from tests.stub_server import StubVinted
+
+class TestRetryEngine(unittest.TestCase):
+
+    def test_parse_retry_after(self):
+        """Test parsing both forms of the Retry-After header."""
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertIsNone(parse_retry_after(None))
+
+    def test_backoff_bounds(self):
+        """Test if the decorrelated jitter stays between the base and the max delay."""
+        engine = RetryEngine(base_delay=0.1, max_delay=1.0)
+        delay = 0.0
+        for _ in range(50):
+            delay = engine.backoff(delay)
+            self.assertGreaterEqual(delay, 0.1)
+            self.assertLessEqual(delay, 1.0)
+
+    def test_retry_after_is_honoured(self):
+        """Test if a Retry-After longer than the back off is waited."""
+        engine = RetryEngine(base_delay=0.1, max_delay=0.2, max_retry_after=5)
+        retry = engine.begin(["vinted.fr"])
+        self.assertEqual(retry.next_delay(), 0.0)
+        retry.failure("3")
+        self.assertEqual(retry.next_delay(), 3.0)
+        # Capped to max_retry_after
+        retry.failure("30")
+        self.assertEqual(retry.next_delay(), 5.0)
+        # Out of attempts
+        self.assertIsNone(retry.next_delay())
+
+    def test_budget(self):
+        """Test if retries stop when the budget is spent."""
+        budget = RetryBudget(ratio=0.5, min_per_second=0, max_tokens=1)
+        self.assertTrue(budget.try_retry())
+        self.assertFalse(budget.try_retry())
+        budget.record_request()
+        budget.record_request()
+        self.assertTrue(budget.try_retry())
+
+    def test_circuit_breaker(self):
+        """Test if the breaker opens after repeated failures and lets a trial through after the timeout."""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+        with patch("src.vinted_scraper_moneybear.retry.time.monotonic", return_value=0):
+            breaker.record_failure()
+            self.assertTrue(breaker.allow())
+            breaker.record_failure()
+            self.assertFalse(breaker.allow())
+        with patch("src.vinted_scraper_moneybear.retry.time.monotonic", return_value=10):
+            self.assertTrue(breaker.allow())
+            breaker.record_success()
+            self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_single_trial(self):
+        """Test if a half-open breaker lets a single trial through until it resolves."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        with patch("src.vinted_scraper_moneybear.retry.time.monotonic", return_value=0):
+            breaker.record_failure()
+        with patch("src.vinted_scraper_moneybear.retry.time.monotonic", return_value=10):
+            self.assertTrue(breaker.available())
+            self.assertTrue(breaker.allow())
+            self.assertFalse(breaker.available())
+            self.assertFalse(breaker.allow())
+            breaker.record_failure()
+            self.assertFalse(breaker.allow())
+        with patch("src.vinted_scraper_moneybear.retry.time.monotonic", return_value=20):
+            self.assertTrue(breaker.allow())
+            self.assertFalse(breaker.allow())
+        # A trial that never resolves is given up after the timeout
+        with patch("src.vinted_scraper_moneybear.retry.time.monotonic", return_value=30):
+            self.assertTrue(breaker.allow())
+            breaker.record_success()
+            self.assertTrue(breaker.allow())
+            self.assertTrue(breaker.allow())
+
+    def test_trial_owner_keeps_retrying(self):
+        """Test if the request owning the trial may retry while other requests are refused."""
+        engine = RetryEngine(base_delay=0, max_delay=0, failure_threshold=1, reset_timeout=10,
+                             budget=RetryBudget(min_per_second=0))
+        with patch("src.vinted_scraper_moneybear.retry.time.monotonic", return_value=0):
+            engine.breaker("vinted.fr").record_failure()
+        with patch("src.vinted_scraper_moneybear.retry.time.monotonic", return_value=10):
+            trial = engine.begin(["vinted.fr"])
+            self.assertEqual(trial.next_delay(), 0.0)
+            self.assertIsNone(engine.begin(["vinted.fr"]).next_delay())
+            # A response that doesn't blame the domain leaves the trial unresolved
+            trial.failure(keys=[])
+            self.assertEqual(trial.next_delay(), 0.0)
+            trial.success()
+            self.assertEqual(engine.begin(["vinted.fr"]).next_delay(), 0.0)
+
+    def test_no_retries(self):
+        """Test if an explicit max_retries of 0 is not replaced by the default."""
+        engine = RetryEngine(max_retries=3)
+        self.assertIsNone(engine.begin(["vinted.fr"], max_retries=0).next_delay())
+        self.assertEqual(engine.begin(["vinted.fr"]).max_retries, 3)
+
+    def test_open_breaker_refuses_requests(self):
+        """Test if a wrapper gives up at once while the breaker of the domain is open."""
+        engine = RetryEngine(base_delay=0, max_delay=0, failure_threshold=2)
+        with StubVinted() as stub:
+            wrapper = VintedWrapper(stub.url, session_cookie="cookie", retry_engine=engine)
+            stub.statuses = [500, 500]
+            self.assertEqual(wrapper._curl("/catalog/items", params={"page": 1}), {"items": []})
+            self.assertEqual(len(stub.requests), 2)
+            self.assertEqual(wrapper._curl("/catalog/items", params={"page": 1}), {"items": []})
+            self.assertEqual(len(stub.requests), 2)
+
+    def test_client_errors_keep_breaker_closed(self):
+        """Test if a 404 is not retried and doesn't count against the breaker of the domain."""
+        engine = RetryEngine(base_delay=0, max_delay=0, failure_threshold=2)
+        with StubVinted() as stub:
+            wrapper = VintedWrapper(stub.url, session_cookie="cookie", retry_engine=engine)
+            stub.statuses = [404, 404, 404]
+            for _ in range(3):
+                self.assertEqual(wrapper.item("removed"), {"items": []})
+            self.assertEqual(len(stub.requests), 3)
+            self.assertTrue(engine.allows(breaker_keys(stub.url)[0]))
+            self.assertEqual(len(wrapper.search(page_limit=1)["all_items"]), 2)
+
+    def test_rotation_keeps_client(self):
+        """Test if the proxy and user agent rotated by a request are not written back on the shared client."""
+        engine = RetryEngine(base_delay=0, max_delay=0, max_retries=2)
+        proxies = {"http": "http://proxy:1", "https": "http://proxy:1"}
+        wrapper = VintedWrapper("https://www.vinted.fr", session_cookie="cookie", proxies=proxies, retry_engine=engine)
+        user_agent = wrapper.user_agent
+        url = "https://www.vinted.fr/api/v2/catalog/items"
+        headers = {"User-Agent": user_agent}
+        retry, request_proxies = wrapper._begin_retry(url, wrapper.proxies)
+        self.assertTrue(retry.next_attempt())
+        request_proxies, _ = wrapper._handle_status(403, headers, retry, url, request_proxies)
+        self.assertTrue(retry.next_attempt())
+        # On the last attempt the request goes without a proxy, the client keeps its own
+        request_proxies, _ = wrapper._handle_status(502, headers, retry, url, request_proxies)
+        self.assertIsNone(request_proxies)
+        self.assertEqual(wrapper.proxies, proxies)
+        self.assertEqual(wrapper.user_agent, user_agent)
+
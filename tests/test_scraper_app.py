@@ -0,0 +1,90 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+# scraper.py imports the package as installed
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+# The caches of the module go in a temporary directory, never in the ones of the workers of the host
+DIRECTORY = tempfile.TemporaryDirectory()
+with patch.dict(os.environ, {"VINTED_SCRAPER_CACHE_PATH": os.path.join(DIRECTORY.name, "cache.sqlite3"),
+                             "VINTED_SCRAPER_IMAGE_DIRECTORY": os.path.join(DIRECTORY.name, "images")}):
+    import scraper  # noqa: E402
+scraper.client_registry.stop()
+
+from vinted_scraper_moneybear.projection import Projection  # noqa: E402
+from vinted_scraper_moneybear.result_cache import ResultCache  # noqa: E402
+from tests.stub_server import read_sample  # noqa: E402
+
+
+def tearDownModule():
+    DIRECTORY.cleanup()
+
+
+class StubClient:
+    def __init__(self, pages):
+        self.pages = pages
+
+    def search(self, params, page_limit, **kwargs):
+        return self.pages.pop(0)
+
+
+class TestCachedMain(unittest.TestCase):
+
+    def setUp(self):
+        cache = ResultCache(max_bytes=1024 * 1024, ttl=scraper.result_ttl + scraper.result_max_stale)
+        patcher = patch.object(scraper.cached_main, "cache", cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def process(self, items, amount, image_mode, image_width):
+        return [{"title": item["title"]} for item in items[:amount]]
+
+    def test_failed_refresh_keeps_stale_result(self):
+        """Test if the empty result of a failed refresh doesn't replace the stale result."""
+        # The wrapper returns no items once it runs out of retries
+        client = StubClient([{"all_items": [{"title": "Shoes"}]}, {"all_items": []}])
+        with patch.object(scraper.client_registry, "get", return_value=client), \
+                patch.object(scraper, "parallel_process_items", self.process):
+            good = scraper.cached_main("fr", "shoes", 1, 1, "url")
+            self.assertEqual(good, [{"responses_count": 1}, {"title": "Shoes"}])
+
+            refreshes = scraper.cached_main.refreshes
+            later = time.time() + scraper.result_ttl + 1
+            with patch("time.time", return_value=later):
+                # Stale: served right away while it is refreshed in the background
+                self.assertEqual(scraper.cached_main("fr", "shoes", 1, 1, "url"), good)
+                deadline = time.monotonic() + 5
+                while scraper.cached_main.refreshes == refreshes and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                self.assertEqual(client.pages, [])
+                self.assertEqual(scraper.cached_main("fr", "shoes", 1, 1, "url"), good)
+
+    def test_no_items(self):
+        """Test if a search without items returns an empty list."""
+        client = StubClient([{"all_items": []}])
+        with patch.object(scraper.client_registry, "get", return_value=client):
+            self.assertEqual(scraper.cached_main("fr", "nothing", 1, 1, "url"), [])
+
+
+class TestProcessItem(unittest.TestCase):
+
+    def test_projected_item(self):
+        """Test if an item projected to ITEM_FIELDS is processed like the full item."""
+        item = read_sample("search_item_dummy")["items"][0]
+        item["price"] = {"amount": "4.5", "currency_code": "EUR"}
+        for thumbnails in (item["photo"]["thumbnails"], []):
+            # Without thumbnails the photo itself is downscaled, from its own width
+            item["photo"]["thumbnails"] = thumbnails
+            projected = Projection(scraper.ITEM_FIELDS).apply(item)
+            for image_width in (None, 50, 300):
+                with self.subTest(thumbnails=len(thumbnails), image_width=image_width):
+                    self.assertEqual(scraper.process_item(projected, "url", image_width),
+                                     scraper.process_item(item, "url", image_width))
+        self.assertTrue(scraper.process_item(projected, "url", 300)["photo"].endswith("?width=300"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+from unittest.mock import patch
+from src.vinted_scraper_moneybear.utils import SessionManager
+
+class TestSessionManager(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = SessionManager(max_sessions=2, idle_timeout=60)
+
+    def tearDown(self):
+        self.manager.close()
+
+    def test_reuses_session(self):
+        """Test if the same (baseurl, proxy) pair gets the same session."""
+        proxies = {'http': 'http://proxy:80', 'https': 'http://proxy:80'}
+        first = self.manager.get_session("https://vinted.com", proxies)
+        second = self.manager.get_session("https://vinted.com", dict(proxies))
+        self.assertIs(first, second)
+        self.assertIsNot(first, self.manager.get_session("https://vinted.com", None))
+
+    def test_max_sessions(self):
+        """Test if the least recently used session is evicted."""
+        first = self.manager.get_session("https://vinted.com")
+        self.manager.get_session("https://vinted.fr")
+        self.manager.get_session("https://vinted.de")
+        self.assertEqual(len(self.manager), 2)
+        self.assertIsNot(first, self.manager.get_session("https://vinted.com"))
+
+    def test_idle_eviction(self):
+        """Test if idle sessions are closed."""
+        with patch("src.vinted_scraper_moneybear.utils.time.monotonic", return_value=0):
+            self.manager.get_session("https://vinted.com")
+        with patch("src.vinted_scraper_moneybear.utils.time.monotonic", return_value=61):
+            self.assertEqual(self.manager.evict_idle(), 1)
+        self.assertEqual(len(self.manager), 0)
@@ -0,0 +1,28 @@
+import time
+import unittest
+
+import requests
+
+from tests.stub_server import StubVinted
+
+
+class TestStubVinted(unittest.TestCase):
+
+    def test_error_rates(self):
+        """Test if the injected faults follow the configured rates."""
+        with StubVinted(error_rates={502: 0.5, 401: 0.25}, seed=1) as stub:
+            statuses = [requests.get(f"{stub.url}/api/v2/catalog/items").status_code for _ in range(200)]
+        self.assertEqual(stub.status_counts[502], statuses.count(502))
+        self.assertTrue(70 < statuses.count(502) < 130)
+        self.assertTrue(25 < statuses.count(401) < 75)
+        self.assertEqual(len(stub.requests), 200)
+
+    def test_latency_and_retry_after(self):
+        """Test if the responses are delayed and 429s carry a Retry-After header."""
+        with StubVinted(latency=0.05, retry_after=2) as stub:
+            stub.statuses = [429]
+            start = time.monotonic()
+            response = requests.get(f"{stub.url}/api/v2/catalog/items")
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers["Retry-After"], "2")
@@ -0,0 +1,26 @@
+import unittest
+from unittest.mock import patch
+from src.vinted_scraper_moneybear import VintedScraper
+from src.vinted_scraper_moneybear.models import VintedItem
+from tests.test_vinted_wrapper import BASE_URL, fake_curl
+
+
+class TestVintedScraperSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.scraper = VintedScraper(BASE_URL, session_cookie="cookie")
+
+    def test_iter_search(self):
+        """Test if the items are yielded as VintedItem instances."""
+        curl, calls = fake_curl(pages=2)
+        with patch.object(self.scraper, "_curl", side_effect=curl):
+            items = list(self.scraper.iter_search({"search_text": "game"}, page_limit=5))
+        self.assertTrue(all(isinstance(item, VintedItem) for item in items))
+        self.assertEqual([item.id for item in items], [10, 11, 20, 21])
+
+    def test_search(self):
+        """Test if search returns the same items as a list."""
+        curl, calls = fake_curl(pages=2)
+        with patch.object(self.scraper, "_curl", side_effect=curl):
+            items = self.scraper.search({"search_text": "game"}, page_limit=1)
+        self.assertEqual([item.id for item in items], [10, 11])
@@ -0,0 +1,117 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from src.vinted_scraper_moneybear import VintedWrapper
+from tests.stub_server import StubVinted
+
+BASE_URL = "https://www.vinted.fr"
+
+
+def fake_curl(pages: int, delay: float = 0.0):
+    """Build a _curl replacement serving `pages` pages of two items each."""
+    calls = []
+    lock = threading.Lock()
+
+    def curl(endpoint, params=None):
+        with lock:
+            calls.append(params['page'])
+        time.sleep(delay)
+        page = params['page']
+        if page > pages:
+            return {"items": []}
+        return {"items": [{"id": page * 10 + i, "user": {"profile_url": "url"}} for i in range(2)]}
+
+    return curl, calls
+
+
+class TestVintedWrapperSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.wrapper = VintedWrapper(BASE_URL, session_cookie="cookie")
+
+    def test_sequential(self):
+        """Test if pages are fetched until the first empty page."""
+        curl, calls = fake_curl(pages=2)
+        with patch.object(self.wrapper, "_curl", side_effect=curl):
+            result = self.wrapper.search({"search_text": "game"}, page_limit=5)
+        self.assertEqual([item["id"] for item in result["all_items"]], [10, 11, 20, 21])
+        self.assertEqual(result["all_items"][0]["user"]["feedback_url"], "url?tab=feedback")
+        self.assertEqual(calls, [1, 2, 3])
+
+    def test_concurrent_keeps_page_order(self):
+        """Test if concurrently fetched pages are returned in page order."""
+        curl, calls = fake_curl(pages=4, delay=0.05)
+        with patch.object(self.wrapper, "_curl", side_effect=curl):
+            start = time.monotonic()
+            result = self.wrapper.search({"search_text": "game"}, page_limit=4, concurrency=4)
+            elapsed = time.monotonic() - start
+        self.assertEqual([item["id"] for item in result["all_items"]], [10, 11, 20, 21, 30, 31, 40, 41])
+        self.assertLess(elapsed, 0.15)
+
+    def test_concurrent_early_stop(self):
+        """Test if the pages after an empty page are discarded."""
+        curl, calls = fake_curl(pages=1)
+        with patch.object(self.wrapper, "_curl", side_effect=curl):
+            result = self.wrapper.search({"search_text": "game"}, page_limit=10, concurrency=3)
+        self.assertEqual([item["id"] for item in result["all_items"]], [10, 11])
+        self.assertLessEqual(len(calls), 4)
+
+    def test_iter_search_stops_early(self):
+        """Test if stopping the iteration stops the pagination."""
+        curl, calls = fake_curl(pages=5)
+        with patch.object(self.wrapper, "_curl", side_effect=curl):
+            items = self.wrapper.iter_search({"search_text": "game"}, page_limit=5)
+            self.assertEqual(next(items)["id"], 10)
+            self.assertEqual(next(items)["id"], 11)
+            self.assertEqual(calls, [1])
+            self.assertEqual(next(items)["id"], 20)
+            self.assertEqual(calls, [1, 2])
+
+
+class TestVintedWrapperAmount(unittest.TestCase):
+
+    def setUp(self):
+        self.stub = StubVinted(pages=10, per_page=2).start()
+        self.wrapper = VintedWrapper(self.stub.url, session_cookie="cookie")
+
+    def tearDown(self):
+        self.stub.stop()
+
+    def test_plan_pages(self):
+        """Test if the fewest pages are planned for an amount."""
+        self.assertEqual(VintedWrapper._plan_pages(10, amount=1), (1, 1))
+        self.assertEqual(VintedWrapper._plan_pages(10, amount=100), (2, 96))
+        self.assertEqual(VintedWrapper._plan_pages(10, amount=30, per_page=10), (3, 10))
+        self.assertEqual(VintedWrapper._plan_pages(2, amount=30, per_page=10), (2, 10))
+        self.assertEqual(VintedWrapper._plan_pages(5), (5, None))
+        self.assertEqual(VintedWrapper._plan_pages(5, amount=0), (0, None))
+
+    def test_amount_single_request(self):
+        """Test if a small amount is fetched with a single request."""
+        result = self.wrapper.search({"search_text": "game"}, page_limit=10, amount=7)
+        self.assertEqual([item["id"] for item in result["all_items"]], list(range(1, 8)))
+        self.assertEqual(len(self.stub.requests), 1)
+        self.assertIn("per_page=7", self.stub.requests[0])
+
+    def test_short_page_is_last(self):
+        """Test if the search stops after a page shorter than per_page."""
+        result = self.wrapper.search({"search_text": "game"}, page_limit=10, per_page=8)
+        self.assertEqual(len(result["all_items"]), 20)
+        self.assertEqual(len(self.stub.requests), 3)
+
+    def test_capped_page_size(self):
+        """Test if a planned page size served shorter doesn't end the search before the amount."""
+        self.stub.max_per_page = 4
+        result = self.wrapper.search({"search_text": "game"}, page_limit=10, amount=10)
+        self.assertEqual([item["id"] for item in result["all_items"]], list(range(1, 11)))
+        self.assertEqual(len(self.stub.requests), 3)
+        self.stub.reset()
+        result = self.wrapper.search({"search_text": "game"}, page_limit=10, concurrency=3, amount=10)
+        self.assertEqual([item["id"] for item in result["all_items"]], list(range(1, 11)))
+
+    def test_amount_concurrent(self):
+        """Test if the amount is respected when fetching the pages concurrently."""
+        result = self.wrapper.search({"search_text": "game"}, page_limit=10, concurrency=3, amount=5, per_page=2)
+        self.assertEqual([item["id"] for item in result["all_items"]], [1, 2, 3, 4, 5])
+        self.assertEqual(len(self.stub.requests), 3)
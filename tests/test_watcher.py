@@ -0,0 +1,93 @@
+import threading
+import unittest
+from unittest.mock import patch
+from src.vinted_scraper_moneybear import VintedScraper, VintedWrapper
+from src.vinted_scraper_moneybear.models import VintedItem
+from src.vinted_scraper_moneybear.seen_ids import SeenIds
+
+BASE_URL = "https://www.vinted.fr"
+
+
+class NewestFirstCatalog:
+    """A _curl replacement serving a catalog newest first, two items per page."""
+
+    def __init__(self, ids):
+        self.ids = list(ids)
+        self.calls = []
+
+    def post(self, *ids):
+        self.ids[:0] = ids
+
+    def __call__(self, endpoint, params=None):
+        self.calls.append(params)
+        page = params["page"]
+        ids = self.ids[(page - 1) * 2:page * 2]
+        return {"items": [{"id": item_id, "user": {"profile_url": "url"}} for item_id in ids]}
+
+
+class TestSeenIds(unittest.TestCase):
+
+    def test_add(self):
+        """Test if only the first add of an id is new, whether it is a string or an int."""
+        seen = SeenIds()
+        self.assertTrue(seen.add("12"))
+        self.assertFalse(seen.add(12))
+        self.assertIn("12", seen)
+
+    def test_bounded(self):
+        """Test if the least recently seen ids are forgotten."""
+        seen = SeenIds(max_size=2)
+        seen.add(1)
+        seen.add(2)
+        seen.add(1)
+        seen.add(3)
+        self.assertEqual(len(seen), 2)
+        self.assertNotIn(2, seen)
+        self.assertIn(1, seen)
+
+
+class TestWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.wrapper = VintedWrapper(BASE_URL, session_cookie="cookie")
+        self.catalog = NewestFirstCatalog(range(10, 0, -1))
+
+    def test_new_items(self):
+        """Test if the first poll emits everything and the next ones only the new items from a single page."""
+        seen = SeenIds()
+        with patch.object(self.wrapper, "_curl", side_effect=self.catalog):
+            first = self.wrapper.new_items({"search_text": "game"}, seen, page_limit=5)
+            self.assertEqual([item["id"] for item in first], list(range(10, 0, -1)))
+            self.assertEqual(self.catalog.calls[0]["order"], "newest_first")
+
+            self.catalog.calls.clear()
+            self.catalog.post(11)
+            second = self.wrapper.new_items({"search_text": "game"}, seen, page_limit=5)
+        self.assertEqual([item["id"] for item in second], [11])
+        self.assertEqual(len(self.catalog.calls), 1)
+
+    def test_new_items_across_pages(self):
+        """Test if the pagination goes on until it reaches an item of the previous poll."""
+        seen = SeenIds()
+        with patch.object(self.wrapper, "_curl", side_effect=self.catalog):
+            self.wrapper.new_items(seen=seen, page_limit=5)
+            self.catalog.calls.clear()
+            self.catalog.post(14, 13, 12, 11)
+            result = self.wrapper.new_items(seen=seen, page_limit=5)
+        self.assertEqual([item["id"] for item in result], [14, 13, 12, 11])
+        self.assertEqual(len(self.catalog.calls), 3)
+
+    def test_watch(self):
+        """Test if watch yields the new items of every poll until it is stopped."""
+        scraper = VintedScraper(BASE_URL, session_cookie="cookie")
+        stop = threading.Event()
+        with patch.object(scraper, "_curl", side_effect=self.catalog):
+            ids = []
+            for item in scraper.watch(interval=0, page_limit=1, stop=stop):
+                self.assertIsInstance(item, VintedItem)
+                ids.append(item.id)
+                if item.id == 9:
+                    self.catalog.post(11)
+                if item.id == 11:
+                    stop.set()
+        self.assertEqual(ids, [10, 9, 11])